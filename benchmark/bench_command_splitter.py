@@ -0,0 +1,86 @@
+import re
+import shlex
+import timeit
+
+from file_history.command_splitter import CommandSplitter
+
+# run with: python -m benchmark.bench_command_splitter
+
+SHORT_CMDS = [
+    "vim main.py",
+    "cat logs/app.log | grep -i error",
+    "sudo rm -rf /tmp/build; mv /dessen/file4 ../",
+    "bash -c 'ls /path/to/file; cat gil | grep foo'",
+]
+LONG_PASTED_CMD = " && ".join("cp -r src/module%d/file%d.py 'build/out dir/module%d' 2>&1" % (i, i, i)
+                              for i in range(200))
+HEREDOC_CMD = "cat > config.yaml <<EOF\n" + "\n".join("key%d: \"value %d\"" % (i, i) for i in range(500)) + "\nEOF"
+CORPUS = {
+    "short": SHORT_CMDS,
+    "long pasted": [LONG_PASTED_CMD],
+    "heredoc": [HEREDOC_CMD],
+}
+REPEAT = 5
+
+
+# the shlex + regex based implementation the tokenizer replaced, kept for comparison
+class ShlexCommandSplitter:
+
+    def split_command(self, cmd):
+        try:
+            cmd_parts = shlex.split(self.ensure_spaces_around_delimiters(cmd, ";"))
+            cmd_parts = self.split_list_by_del(cmd_parts, [";", "|", "&&"])
+            for pos, inner_cmd in enumerate(cmd_parts):
+                subshell_position = CommandSplitter.find_sub_shell_position(inner_cmd)
+                if subshell_position is not None:
+                    cmd_parts[pos] = self.split_command(inner_cmd[subshell_position])
+            if len(cmd_parts) == 1:
+                return cmd_parts[0]
+            return cmd_parts
+        except ValueError:
+            return []
+
+    @staticmethod
+    def ensure_spaces_around_delimiters(input_string, delimiters):
+        pattern = f"({'|'.join(map(re.escape, delimiters))})"
+        result = re.sub(pattern, r' \1 ', input_string)
+        return re.sub(r'\s+', ' ', result).strip()
+
+    @staticmethod
+    def split_list_by_del(input_list, delimiters):
+        result = []
+        current_sublist = []
+        for item in input_list:
+            if item in delimiters:
+                if current_sublist:
+                    result.append(current_sublist)
+                    current_sublist = []
+            else:
+                current_sublist.append(item)
+        if current_sublist:
+            result.append(current_sublist)
+        return result
+
+
+def measure(splitter, cmds):
+    total_chars = sum(len(cmd) for cmd in cmds)
+    number = max(1, 200_000 // total_chars)
+    seconds = min(timeit.repeat(lambda: [splitter.split_command(cmd) for cmd in cmds],
+                                number=number, repeat=REPEAT))
+    return number * len(cmds) / seconds, number * total_chars / seconds
+
+
+def main():
+    splitters = [("shlex", ShlexCommandSplitter()), ("tokenizer", CommandSplitter())]
+    print("%-12s %-10s %14s %14s" % ("corpus", "splitter", "cmds/sec", "chars/sec"))
+    for corpus_name, cmds in CORPUS.items():
+        results = {}
+        for splitter_name, splitter in splitters:
+            cmds_per_sec, chars_per_sec = measure(splitter, cmds)
+            results[splitter_name] = cmds_per_sec
+            print("%-12s %-10s %14.0f %14.0f" % (corpus_name, splitter_name, cmds_per_sec, chars_per_sec))
+        print("%-12s speedup %.1fx" % (corpus_name, results["tokenizer"] / results["shlex"]))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+import os
+import threading
+import time
+
+from file_history.terminal.file_stream_writer import FileStreamWriter
+
+# run with: python -m benchmark.bench_file_stream_writer
+
+LINES = 200_000
+REPEAT = 5
+# lines per second --action=show should write into a pipe
+WRITE_THROUGHPUT_TARGET = 500_000
+FILES = ["/home/user/projects/file-history/file_history/module_%d.py" % i for i in range(LINES)]
+
+
+# how files were shown before, one print and flush per file
+def print_per_file(stream):
+    for file in FILES:
+        print(file, file=stream, flush=True)
+
+
+def write_buffered(stream):
+    writer = FileStreamWriter(stream)
+    for file in FILES:
+        writer.write_file(file)
+    writer.close()
+
+
+# writes into a pipe drained by another thread like the reading end of | grep, returns lines per second
+def lines_per_second(write):
+    read_fd, write_fd = os.pipe()
+    drainer = threading.Thread(target=drain, args=(read_fd,))
+    drainer.start()
+    with os.fdopen(write_fd, "w") as stream:
+        start = time.perf_counter()
+        write(stream)
+        duration = time.perf_counter() - start
+    drainer.join()
+    return LINES / duration
+
+
+def drain(read_fd):
+    with os.fdopen(read_fd, "rb") as pipe:
+        while pipe.read(64 * 1024):
+            pass
+
+
+def main():
+    print("%-16s %14s" % ("writer", "lines/s"))
+    for name, write in [("print per file", print_per_file), ("buffered", write_buffered)]:
+        throughput = max(lines_per_second(write) for _ in range(REPEAT))
+        print("%-16s %14.0f" % (name, throughput))
+    print("target %.0f lines/s" % WRITE_THROUGHPUT_TARGET)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+import re
+import timeit
+
+from file_history.filter_matcher import FilterMatcher
+from test.integration.suite.history_generator import HistoryGenerator
+
+# run with: python -m benchmark.bench_filter_matcher
+
+LINES = 100_000
+FILTERS = {
+    "literal": ("file4242", False),
+    "literals": ("file4242|file777", False),
+    "regex": ("file42[0-9]2$", False),
+    "smart case": ("file4242", True),
+}
+REPEAT = 5
+
+
+# how filters were matched before they were classified, the pattern goes through the re cache per line
+def match_re_search(filter, lines):
+    for line in lines:
+        re.search(filter, line)
+
+
+def match_matcher(matcher, lines):
+    for line in lines:
+        matcher.matches(line)
+
+
+# like the history reader does for whole blocks, returns the amount of matches
+def find_in_block(matcher, text):
+    pos = 0
+    found = 0
+    while True:
+        pos = matcher.find(text, pos)
+        if pos == -1:
+            return found
+        found += 1
+        pos = text.find('\n', pos) + 1 or len(text) + 1
+
+
+def per_line_ns(function):
+    return min(timeit.repeat(function, number=1, repeat=REPEAT)) / LINES * 1e9
+
+
+def main():
+    history, _ = HistoryGenerator(LINES).create()
+    lines = history.split('\n')
+    print("%-12s %14s %14s %14s" % ("filter", "re.search ns", "matches ns", "block find ns"))
+    for name, (filter, smart_case) in FILTERS.items():
+        matcher = FilterMatcher(filter, smart_case)
+        # the old code had no smart case, ignoring case took an inline flag
+        old_filter = "(?i)" + filter if smart_case else filter
+        print("%-12s %14.0f %14.0f %14.0f" % (name,
+                                              per_line_ns(lambda: match_re_search(old_filter, lines)),
+                                              per_line_ns(lambda: match_matcher(matcher, lines)),
+                                              per_line_ns(lambda: find_in_block(matcher, history))))
+
+
+if __name__ == "__main__":
+    main()
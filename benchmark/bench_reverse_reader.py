@@ -0,0 +1,83 @@
+import os
+import sys
+import tempfile
+import time
+
+from file_history.reverse_line_reader import ReverseLineReader
+
+# run with: python -m benchmark.bench_reverse_reader [size in MiB ...]
+# needs file-read-backwards for the comparison, the history reader used it before
+
+DEFAULT_SIZES_MIB = [10, 1024]
+# history lines are written in blocks of this many
+BLOCK_LINES = 10_000
+
+
+def create_history(path, size):
+    with open(path, 'wb') as file:
+        written = 0
+        offset = 0
+        while written < size:
+            block = "".join("/home/user/projects/project%d/src/module%d/file%d.py\n" % (i % 97, i % 13, i)
+                            for i in range(offset, offset + BLOCK_LINES)).encode()
+            file.write(block)
+            written += len(block)
+            offset += BLOCK_LINES
+
+
+# reads every line like the history reader did, returns None if it takes longer than max_seconds
+def read_file_read_backwards(path, max_seconds):
+    from file_read_backwards import FileReadBackwards
+    start = time.perf_counter()
+    lines = 0
+    with FileReadBackwards(path) as file:
+        while True:
+            line = file.readline()
+            if line == "":
+                break
+            if line.strip():
+                lines += 1
+            if lines % 10_000 == 0 and time.perf_counter() - start > max_seconds:
+                return None
+    return lines
+
+
+def read_reverse_line_reader(path, max_seconds):
+    start = time.perf_counter()
+    lines = 0
+    with ReverseLineReader(path) as reader:
+        for line in reader.lines():
+            line = line.strip()
+            if line:
+                line.decode('utf-8', 'surrogateescape')
+                lines += 1
+            if lines % 10_000 == 0 and time.perf_counter() - start > max_seconds:
+                return None
+    return lines
+
+
+def main():
+    sizes = [int(size) for size in sys.argv[1:]] or DEFAULT_SIZES_MIB
+    readers = [("mmap", read_reverse_line_reader)]
+    try:
+        import file_read_backwards  # noqa: F401
+        readers.insert(0, ("frb", read_file_read_backwards))
+    except ImportError:
+        print("file-read-backwards is not installed, only timing the mmap reader")
+    print("%-10s %-8s %12s %14s" % ("MiB", "reader", "seconds", "lines/sec"))
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = os.path.join(tmp_dir, "history")
+        for size in sizes:
+            create_history(path, size * 2 ** 20)
+            for name, read in readers:
+                start = time.perf_counter()
+                lines = read(path, max_seconds=120)
+                seconds = time.perf_counter() - start
+                if lines is None:
+                    print("%-10d %-8s %12s %14s" % (size, name, "> 120s", "-"))
+                    continue
+                print("%-10d %-8s %12.2f %14.0f" % (size, name, seconds, lines / seconds))
+
+
+if __name__ == "__main__":
+    main()
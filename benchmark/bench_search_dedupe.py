@@ -0,0 +1,101 @@
+import time
+import tracemalloc
+from unittest.mock import patch
+
+from file_history.bloom_filter import BloomFilter
+from file_history.file_checker import FileChecker
+from file_history.file_filter import FileFilter
+from file_history.search_results import SearchResults
+from test.integration.suite.history_generator import HistoryGenerator
+
+# run with: python -m benchmark.bench_search_dedupe
+
+HISTORY_SIZES = [10_000, 50_000, 200_000]
+# every path shows up this often, like files that are edited again and again
+REPEATS = 3
+
+
+# the list based dedupe the shared search results replaced, kept for comparison
+# search, filter and ui each kept their own list of paths
+class ListDedupe:
+
+    def __init__(self):
+        self.file_checker = FileChecker()
+        self.filter_files_read = []
+        self.search_files_read = []
+        self.ui_files = []
+
+    def accept(self, file):
+        if file in self.filter_files_read:
+            return False
+        self.filter_files_read.append(file)
+        if not self.file_checker.isfile(file):
+            return False
+        self.search_files_read.append(file)
+        self.ui_files.append(file)
+        return True
+
+
+class SharedDedupe:
+
+    def __init__(self, results):
+        self.results = results
+        self.filter = FileFilter(None, results)
+
+    def accept(self, file):
+        if not self.filter.accept(file):
+            return False
+        self.results.add(file)
+        return True
+
+
+def create_lines(size):
+    history, _ = HistoryGenerator(size // REPEATS).create()
+    lines = history.split('\n')
+    # copies, so equal paths are not the same string objects, like lines read from the history file
+    return [line.encode().decode() for _ in range(REPEATS) for line in lines]
+
+
+def run(create_dedupe, lines, max_seconds):
+    dedupe = create_dedupe()
+    start = time.perf_counter()
+    for i, line in enumerate(lines):
+        dedupe.accept(line)
+        if i % 1000 == 0 and time.perf_counter() - start > max_seconds:
+            return None
+    return time.perf_counter() - start
+
+
+# tracing allocations slows down the run, so time and memory are measured in separate runs
+def measure(create_dedupe, lines, max_seconds):
+    seconds = run(create_dedupe, lines, max_seconds)
+    if seconds is None:
+        return None, None
+    tracemalloc.start()
+    run(create_dedupe, lines, max_seconds=float("inf"))
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return len(lines) / seconds, peak
+
+
+def main():
+    dedupes = [
+        ("list", ListDedupe),
+        ("set", lambda: SharedDedupe(SearchResults())),
+        ("bloom", lambda: SharedDedupe(SearchResults(seen=BloomFilter(), keep_files=False))),
+    ]
+    print("%-10s %-8s %14s %12s" % ("lines", "dedupe", "lines/sec", "peak MiB"))
+    # generated paths do not exist, a plain function keeps the mock from recording every call
+    with patch('file_history.file_checker.FileChecker.isfile', new=lambda self, path: True):
+        for size in HISTORY_SIZES:
+            lines = create_lines(size)
+            for name, create_dedupe in dedupes:
+                lines_per_second, peak = measure(create_dedupe, lines, max_seconds=30)
+                if lines_per_second is None:
+                    print("%-10d %-8s %14s %12s" % (len(lines), name, "> 30s", "-"))
+                    continue
+                print("%-10d %-8s %14.0f %12.2f" % (len(lines), name, lines_per_second, peak / 2 ** 20))
+
+
+if __name__ == "__main__":
+    main()
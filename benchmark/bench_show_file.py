@@ -0,0 +1,35 @@
+from benchmark.bench_file_stream_writer import FILES, LINES, REPEAT, WRITE_THROUGHPUT_TARGET, lines_per_second
+from file_history.terminal.file_stream_writer import FileStreamWriter
+from file_history.terminal.terminal_ui import TerminalUi
+
+# run with: python -m benchmark.bench_show_file
+# times everything a found file goes through for --action=show once the search hands it over:
+# TerminalUi.show_file, print_file and the writer, not just the writer on its own
+
+
+# how files were shown before, TerminalUi printing and flushing each file itself
+def show_printed(stream):
+    ui = TerminalUi(print_file_stream=stream, print_numbers=False)
+    for file in FILES:
+        ui.show_file(file)
+        stream.flush()
+
+
+def show_buffered(stream):
+    writer = FileStreamWriter(stream)
+    ui = TerminalUi(print_file_stream=stream, print_numbers=False, file_writer=writer)
+    for file in FILES:
+        ui.show_file(file)
+    writer.close()
+
+
+def main():
+    print("%-16s %14s" % ("show_file", "lines/s"))
+    for name, show in [("printed", show_printed), ("buffered", show_buffered)]:
+        throughput = max(lines_per_second(show) for _ in range(REPEAT))
+        print("%-16s %14.0f" % (name, throughput))
+    print("target %.0f lines/s for %d lines" % (WRITE_THROUGHPUT_TARGET, LINES))
+
+
+if __name__ == "__main__":
+    main()
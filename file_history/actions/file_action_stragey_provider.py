@@ -1,12 +1,13 @@
 from file_history.action import Action
-from file_history.actions.editor_strategy import EditorStrategy
-from file_history.actions.clip_strategy import ClipStrategy
 
 
+# strategies are imported on demand, clipping loads pyperclip and editing loads subprocess
 def provide_file_action_strategy(options):
     if options.action == Action.EDIT:
+        from file_history.actions.editor_strategy import EditorStrategy
         return EditorStrategy(options)
     elif options.action == Action.CLIP:
+        from file_history.actions.clip_strategy import ClipStrategy
         return ClipStrategy(options)
     else:
         return None
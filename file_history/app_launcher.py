@@ -2,11 +2,10 @@ import signal
 import sys
 
 from file_history import config
-from file_history.gui.gui_app import GuiApp
+from file_history.action import Action
 from file_history.interface_mode import InterfaceMode
 from file_history.logging_config import configure_logger
 from file_history.options_factory import OptionsFactory
-from file_history.terminal.terminal_app import TerminalApp
 
 
 # launches app in default mode
@@ -45,10 +44,17 @@ class DefaultAppLauncher:
         if self.app:
             self.app.close_program()
 
+    # only import the ui that is used, tkinter is expensive to load
     def create_app(self, options):
         if options.mode == InterfaceMode.GUI:
+            from file_history.gui.gui_app import GuiApp
             return GuiApp(options, delay_start=self.delay_start)
+        elif options.mode == InterfaceMode.TUI and options.action != Action.SHOW:
+            # shown files are printed to stdout, there is nothing to select in a full screen interface
+            from file_history.tui.tui_app import TuiApp
+            return TuiApp(options, delay_start=self.delay_start)
         else:
+            from file_history.terminal.terminal_app import TerminalApp
             return TerminalApp(options, delay_start=self.delay_start)
 
     def start(self):
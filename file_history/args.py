@@ -9,6 +9,23 @@ DEFAULT_ACTION = Action.EDIT
 DEFAULT_MAX_RESULTS = 35
 DEFAULT_MAX_SCANNED_FILES = -1
 DEFAULT_EDITOR = 'nano'
+DEFAULT_CMD_CACHE_SIZE = 256
+# seconds
+DEFAULT_FULL_SWEEP_INTERVAL = 24 * 60 * 60
+DEFAULT_CLEAN_GROWTH_BYTES = 16 * 1024
+DEFAULT_CLEAN_GROWTH_PERCENT = 5
+# seconds
+DEFAULT_CLEAN_INTERVAL = 60
+DEFAULT_CHECK_WORKERS = 8
+# seconds
+DEFAULT_CACHE_TTL = 60
+DEFAULT_CACHE_NEGATIVE_TTL = 60 * 60
+# files listed to select from, a deleted file is listed for this long at most
+DEFAULT_CACHE_SELECT_TTL = 2
+# characters of shown files written at once, about a pipe buffer
+DEFAULT_FLUSH_SIZE = 64 * 1024
+# seconds
+DEFAULT_FLUSH_INTERVAL = 0.05
 
 # args
 MAX_SCANNED_FILES_ARG = "--max-scanned"
@@ -16,6 +33,14 @@ MAX_RESULT_FILES_ARG = "--results"
 ACTION_ARG = "--action"
 FILTER_ARG = "--filter"
 MODE_ARG = "--mode"
+FULL_SWEEP_ARG = "--full"
+SCHEDULED_CLEAN_ARG = "--scheduled"
+BLOOM_ARG = "--bloom"
+NO_CACHE_ARG = "--no-cache"
+SMART_CASE_ARG = "--smart-case"
+FUZZY_ARG = "--fuzzy"
+NULL_ARG = "-0"
+NULL_LONG_ARG = "--null"
 
 # env vars
 HISTORY_FILE_ENV = "FILE_HIST_FILE"
@@ -23,3 +48,17 @@ MAX_RESULTS_ENV = "FILE_HIST_RESULTS"
 MAX_SCANNED_ENV = "FILE_HIST_MAX_SCANNED"
 MODE_ENV = "FILE_HIST_MODE"
 EDITOR_ENV = "FILE_HIST_EDITOR"
+TRACK_SOCKET_ENV = "FILE_HIST_SOCKET"
+QUERY_SOCKET_ENV = "FILE_HIST_QUERY_SOCKET"
+CMD_CACHE_SIZE_ENV = "FILE_HIST_CMD_CACHE_SIZE"
+FULL_SWEEP_INTERVAL_ENV = "FILE_HIST_FULL_SWEEP_INTERVAL"
+CLEAN_GROWTH_BYTES_ENV = "FILE_HIST_CLEAN_GROWTH_BYTES"
+CLEAN_GROWTH_PERCENT_ENV = "FILE_HIST_CLEAN_GROWTH_PERCENT"
+CLEAN_INTERVAL_ENV = "FILE_HIST_CLEAN_INTERVAL"
+CHECK_WORKERS_ENV = "FILE_HIST_CHECK_WORKERS"
+CACHE_TTL_ENV = "FILE_HIST_CACHE_TTL"
+CACHE_NEGATIVE_TTL_ENV = "FILE_HIST_CACHE_NEGATIVE_TTL"
+CACHE_SELECT_TTL_ENV = "FILE_HIST_CACHE_SELECT_TTL"
+NO_CACHE_ENV = "FILE_HIST_NO_CACHE"
+FLUSH_SIZE_ENV = "FILE_HIST_FLUSH_SIZE"
+FLUSH_INTERVAL_ENV = "FILE_HIST_FLUSH_INTERVAL"
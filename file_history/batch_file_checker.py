@@ -0,0 +1,61 @@
+import os
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+
+from file_history.args import CHECK_WORKERS_ENV, DEFAULT_CHECK_WORKERS
+from file_history.logging_config import configure_logger
+
+# a check taking longer than this means the files live on a network file system
+SLOW_CHECK_SECONDS = 0.002
+# check_all submits this many checks at once
+CHUNK_SIZE = 256
+
+
+# checks whether files exist, in parallel once single checks turn out to be slow
+# on local disks a check takes microseconds and handing it to a thread would cost more than it saves,
+# so files are checked inline until one check takes longer than SLOW_CHECK_SECONDS
+class BatchFileChecker:
+
+    def __init__(self, file_checker, max_workers=DEFAULT_CHECK_WORKERS):
+        self.logger = configure_logger(self.__class__.__name__)
+        self.file_checker = file_checker
+        self.max_workers = max_workers
+        self.executor = None
+
+    def is_parallel(self):
+        return self.executor is not None
+
+    # returns a future resolving to whether the file exists
+    def submit(self, path):
+        if self.executor is not None:
+            return self.executor.submit(self.file_checker.isfile, path)
+        future = Future()
+        start = time.perf_counter()
+        try:
+            future.set_result(self.file_checker.isfile(path))
+        except Exception as e:
+            future.set_exception(e)
+        if self.max_workers > 0 and time.perf_counter() - start > SLOW_CHECK_SECONDS:
+            self.logger.debug("checking %s was slow, checking files with %d threads from now on"
+                              % (path, self.max_workers))
+            self.executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="file-check")
+        return future
+
+    # returns whether each file exists, in the order of paths
+    def check_all(self, paths):
+        exists = []
+        for start in range(0, len(paths), CHUNK_SIZE):
+            futures = [self.submit(path) for path in paths[start:start + CHUNK_SIZE]]
+            exists.extend(future.result() for future in futures)
+        return exists
+
+    # checks not yet started are dropped
+    def shutdown(self):
+        if self.executor is not None:
+            self.executor.shutdown(wait=False, cancel_futures=True)
+            self.executor = None
+
+
+# thread count is configurable via env var, 0 always checks inline
+def provide_batch_file_checker(file_checker):
+    return BatchFileChecker(file_checker, int(os.getenv(CHECK_WORKERS_ENV, DEFAULT_CHECK_WORKERS)))
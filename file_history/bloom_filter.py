@@ -0,0 +1,41 @@
+import hashlib
+import math
+import struct
+
+DEFAULT_CAPACITY = 1_000_000
+DEFAULT_ERROR_RATE = 0.0001
+DIGEST_FORMAT = struct.Struct("<16I")
+MAX_HASH_COUNT = 16
+
+
+# set replacement with constant memory, about 2.4MB for the defaults
+# membership tests may return false positives, but never false negatives
+class BloomFilter:
+
+    def __init__(self, capacity=DEFAULT_CAPACITY, error_rate=DEFAULT_ERROR_RATE):
+        self.size = max(8, int(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hash_count = min(MAX_HASH_COUNT, max(1, round(self.size / capacity * math.log(2))))
+        self.bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    # all bit positions are cut from a single 64 byte digest
+    def positions(self, item):
+        digest = hashlib.blake2b(item.encode('utf-8', 'surrogateescape')).digest()
+        return [value % self.size for value in DIGEST_FORMAT.unpack(digest)[:self.hash_count]]
+
+    def __contains__(self, item):
+        return all(self.bits[position >> 3] & (1 << (position & 7)) for position in self.positions(item))
+
+    # like set.add, len() grows only if the item was not contained before
+    def add(self, item):
+        added = False
+        for position in self.positions(item):
+            mask = 1 << (position & 7)
+            if not self.bits[position >> 3] & mask:
+                self.bits[position >> 3] |= mask
+                added = True
+        if added:
+            self.count += 1
+
+    def __len__(self):
+        return self.count
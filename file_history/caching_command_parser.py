@@ -0,0 +1,26 @@
+import os
+
+from file_history.logging_config import configure_logger
+
+
+# command parser answering repeated commands from a CommandCache
+# same interface as CommandParser, so it can be used wherever a command parser is expected
+class CachingCommandParser:
+
+    def __init__(self, command_parser, command_cache):
+        self.logger = configure_logger(self.__class__.__name__)
+        self.command_parser = command_parser
+        self.command_cache = command_cache
+
+    def find_files_in_command(self, cmd, recent_dirs):
+        files = self.command_cache.lookup(cmd, recent_dirs)
+        if files is not None:
+            return files
+        candidates = self.command_parser.find_file_candidates(cmd, recent_dirs)
+        dirs = {os.path.dirname(candidate) for candidate in candidates}
+        mtimes = self.command_cache.read_mtimes(dirs)
+        files = []
+        for candidate in candidates:
+            self.command_parser.add_if_exists(files, candidate)
+        self.command_cache.store(cmd, recent_dirs, files, mtimes)
+        return files
@@ -1,8 +1,8 @@
-import os
+import sys
 
-
-from file_history.args import HISTORY_FILE_ENV
-from file_history.clean.file_history_cleaner import FileHistoryCleaner
+from file_history.args import FULL_SWEEP_ARG, HISTORY_FILE_ENV, SCHEDULED_CLEAN_ARG
+from file_history.clean.clean_scheduler import provide_clean_scheduler
+from file_history.clean.file_history_cleaner import provide_cleaner
 from file_history.env_var_file_validator import get_file_from_env_var
 
 
@@ -14,8 +14,18 @@ class CleanApp:
     def start(self):
         try:
             file = get_file_from_env_var(HISTORY_FILE_ENV)
-            cleaner = FileHistoryCleaner(file)
-            cleaner.clean()
+            args = sys.argv[2:]
+            scheduler = provide_clean_scheduler(file)
+            # scheduled cleans only run if enough was appended since the last clean
+            if not scheduler.acquire(scheduled=SCHEDULED_CLEAN_ARG in args):
+                return
+            try:
+                cleaner = provide_cleaner(file)
+                # only lines appended since the last clean are checked, unless a full sweep is requested
+                cleaner.clean(full_sweep=FULL_SWEEP_ARG in args)
+                scheduler.mark_cleaned()
+            finally:
+                scheduler.release()
         except Exception as e:
             print(e)
             self.exit(1)
@@ -0,0 +1,101 @@
+import fcntl
+import json
+import os
+import time
+
+from file_history.args import CLEAN_GROWTH_BYTES_ENV, CLEAN_GROWTH_PERCENT_ENV, CLEAN_INTERVAL_ENV, \
+    DEFAULT_CLEAN_GROWTH_BYTES, DEFAULT_CLEAN_GROWTH_PERCENT, DEFAULT_CLEAN_INTERVAL
+from file_history.logging_config import configure_logger
+
+STAMP_FILE_SUFFIX = ".clean-stamp"
+
+
+# decides whether a clean is worth it, so a burst of commands does not clean the history after each of them
+# a clean is due once the history grew by growth_bytes or growth_percent since the last clean,
+# or if it grew at all and the last clean is interval seconds ago
+# the <history>.clean-stamp file remembers size and time of the last clean, its lock elects a single cleaner
+class CleanScheduler:
+
+    def __init__(self, hist_file, growth_bytes=DEFAULT_CLEAN_GROWTH_BYTES,
+                 growth_percent=DEFAULT_CLEAN_GROWTH_PERCENT, interval=DEFAULT_CLEAN_INTERVAL):
+        self.logger = configure_logger(self.__class__.__name__)
+        self.hist_file = hist_file
+        self.stamp_file = hist_file + STAMP_FILE_SUFFIX
+        self.growth_bytes = growth_bytes
+        self.growth_percent = growth_percent
+        self.interval = interval
+        self.fd = None
+
+    # returns True if the caller should clean now, it then holds the election until release() is called
+    # unscheduled cleans always run, but still wait for a concurrent clean to finish
+    def acquire(self, scheduled=True):
+        try:
+            self.fd = os.open(self.stamp_file, os.O_RDWR | os.O_CREAT, 0o666)
+        except OSError as e:
+            self.logger.debug("cannot open %s, cleaning unconditionally: %s" % (self.stamp_file, e))
+            return True
+        try:
+            fcntl.flock(self.fd, fcntl.LOCK_EX | (fcntl.LOCK_NB if scheduled else 0))
+        except BlockingIOError:
+            self.logger.debug("skipping clean, another process is cleaning %s" % self.hist_file)
+            self.release()
+            return False
+        if scheduled and not self.is_due():
+            self.release()
+            return False
+        return True
+
+    def release(self):
+        if self.fd is not None:
+            os.close(self.fd)
+            self.fd = None
+
+    def is_due(self):
+        stamp = self.read_stamp()
+        if stamp is None:
+            self.logger.debug("clean due, %s was never cleaned" % self.hist_file)
+            return True
+        size = os.stat(self.hist_file).st_size
+        growth = size - stamp["size"]
+        elapsed = time.time() - stamp["time"]
+        if growth < 0:
+            self.logger.debug("clean due, %s shrank by %d bytes" % (self.hist_file, -growth))
+            return True
+        if growth == 0:
+            self.logger.debug("skipping clean, %s did not grow" % self.hist_file)
+            return False
+        if growth >= self.growth_bytes or growth * 100 >= self.growth_percent * stamp["size"]:
+            self.logger.debug("clean due, %s grew by %d bytes" % (self.hist_file, growth))
+            return True
+        if elapsed >= self.interval:
+            self.logger.debug("clean due, last clean of %s is %ds ago" % (self.hist_file, elapsed))
+            return True
+        self.logger.debug("skipping clean, %s grew by %d bytes, last clean %ds ago"
+                          % (self.hist_file, growth, elapsed))
+        return False
+
+    def read_stamp(self):
+        try:
+            stamp = json.loads(os.pread(self.fd, 4096, 0))
+            return {"size": int(stamp["size"]), "time": float(stamp["time"])}
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+
+    # must be called while elected, right after cleaning
+    def mark_cleaned(self):
+        if self.fd is None:
+            return
+        stamp = json.dumps({"size": os.stat(self.hist_file).st_size, "time": time.time()}).encode()
+        try:
+            os.ftruncate(self.fd, 0)
+            os.pwrite(self.fd, stamp, 0)
+        except OSError as e:
+            self.logger.debug("could not write %s: %s" % (self.stamp_file, e))
+
+
+# thresholds are configurable via env vars
+def provide_clean_scheduler(hist_file):
+    return CleanScheduler(hist_file,
+                          int(os.getenv(CLEAN_GROWTH_BYTES_ENV, DEFAULT_CLEAN_GROWTH_BYTES)),
+                          float(os.getenv(CLEAN_GROWTH_PERCENT_ENV, DEFAULT_CLEAN_GROWTH_PERCENT)),
+                          float(os.getenv(CLEAN_INTERVAL_ENV, DEFAULT_CLEAN_INTERVAL)))
@@ -0,0 +1,114 @@
+import hashlib
+import json
+
+from file_history.logging_config import configure_logger
+
+STATE_FILE_SUFFIX = ".clean-state"
+DIGEST_SIZE = 8
+# the bytes right before the watermark must still be the same, otherwise the history was rewritten behind our back
+FINGERPRINT_SIZE = 4096
+
+
+# checkpoint of the last clean, stored next to the history file
+# offset: the history up to this byte is known to be clean
+# digests: sorted, packed 8 byte hashes of all paths up to offset, used to find duplicates in appended lines
+# file layout: one json header line followed by the packed digests
+class CleanState:
+
+    def __init__(self, offset=0, inode=None, device=None, fingerprint=None, last_full_sweep=0.0, digests=b""):
+        self.logger = configure_logger(self.__class__.__name__)
+        self.offset = offset
+        self.inode = inode
+        self.device = device
+        self.fingerprint = fingerprint
+        self.last_full_sweep = last_full_sweep
+        self.digests = digests
+
+    @staticmethod
+    def digest(path):
+        return hashlib.blake2b(path.encode('utf-8', 'surrogateescape'), digest_size=DIGEST_SIZE).digest()
+
+    @staticmethod
+    def create_fingerprint(data):
+        return hashlib.blake2b(data[-FINGERPRINT_SIZE:], digest_size=16).hexdigest()
+
+    @staticmethod
+    def from_paths(paths, last_full_sweep):
+        return CleanState(last_full_sweep=last_full_sweep,
+                          digests=b"".join(sorted({CleanState.digest(path) for path in paths})))
+
+    # binary search on the packed digests, returns (found, index)
+    def find(self, digest):
+        low, high = 0, len(self.digests) // DIGEST_SIZE
+        while low < high:
+            mid = (low + high) // 2
+            candidate = self.digests[mid * DIGEST_SIZE:(mid + 1) * DIGEST_SIZE]
+            if candidate < digest:
+                low = mid + 1
+            elif candidate > digest:
+                high = mid
+            else:
+                return True, mid
+        return False, low
+
+    def contains(self, path):
+        return self.find(self.digest(path))[0]
+
+    def add_all(self, paths):
+        for path in paths:
+            digest = self.digest(path)
+            found, index = self.find(digest)
+            if not found:
+                position = index * DIGEST_SIZE
+                self.digests = self.digests[:position] + digest + self.digests[position:]
+
+    def size(self):
+        return len(self.digests) // DIGEST_SIZE
+
+    # the watermark is only valid for the same file with the same bytes before it
+    def matches(self, hist_stat, head):
+        return (self.inode == hist_stat.st_ino
+                and self.device == hist_stat.st_dev
+                and self.offset <= hist_stat.st_size
+                and self.fingerprint == self.create_fingerprint(head))
+
+    # data must end at offset
+    def mark_clean(self, hist_stat, offset, data):
+        self.offset = offset
+        self.inode = hist_stat.st_ino
+        self.device = hist_stat.st_dev
+        self.fingerprint = self.create_fingerprint(data)
+
+    # returns None if there is no usable state
+    @staticmethod
+    def load(path):
+        try:
+            with open(path, 'rb') as file:
+                header = json.loads(file.readline())
+                digests = file.read()
+            if len(digests) != header["count"] * DIGEST_SIZE:
+                raise ValueError("expected %d digests" % header["count"])
+            return CleanState(header["offset"], header["inode"], header["device"], header["fingerprint"],
+                              header["last_full_sweep"], digests)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            # broken state only costs a full sweep
+            configure_logger(CleanState.__name__).debug("ignoring unreadable clean state %s: %s" % (path, e))
+            return None
+
+    # must be called while holding the history lock, concurrent cleaners would overwrite each other otherwise
+    def save(self, path):
+        header = {
+            "offset": self.offset,
+            "inode": self.inode,
+            "device": self.device,
+            "fingerprint": self.fingerprint,
+            "last_full_sweep": self.last_full_sweep,
+            "count": self.size(),
+        }
+        try:
+            with open(path, 'wb') as file:
+                file.write(json.dumps(header).encode() + b'\n' + self.digests)
+        except OSError as e:
+            self.logger.debug("could not save clean state %s: %s" % (path, e))
@@ -1,41 +1,226 @@
+import os
+import stat
+import tempfile
+import time
+
+from file_history.args import DEFAULT_FULL_SWEEP_INTERVAL, FULL_SWEEP_INTERVAL_ENV
+from file_history.batch_file_checker import provide_batch_file_checker
+from file_history.clean.clean_state import CleanState, FINGERPRINT_SIZE, STATE_FILE_SUFFIX
+from file_history.dir_changes import DIR_CHANGES_FILE_SUFFIX, DirChanges
+from file_history.existence_cache import provide_existence_cache
 from file_history.file_checker import FileChecker
-from file_read_backwards import FileReadBackwards
+from file_history.history_lock import HistoryLock
+from file_history.logging_config import configure_logger
+from file_history.missing_dir_trie import MissingDirTrie
 
 
+# removes missing files and duplicates from the history, keeping the most recent occurrence
+# the history is read without holding the lock, only swapping in the cleaned version is done under the lock,
+# lines appended in the meantime are carried over to the cleaned history
+# usually only lines appended since the last clean are checked, everything before the persisted watermark
+# is known to be clean except for files removed since, those are dropped by a periodic full sweep
 class FileHistoryCleaner:
 
-    def __init__(self, hist_file):
+    def __init__(self, hist_file, full_sweep_interval=DEFAULT_FULL_SWEEP_INTERVAL, existence_cache=None):
+        self.logger = configure_logger(self.__class__.__name__)
         self.hist_file = hist_file
+        self.state_file = hist_file + STATE_FILE_SUFFIX
+        self.hist_dir = os.path.dirname(os.path.abspath(hist_file))
+        # creating and renaming the temp file changes the history dir, the command cache is told about it
+        self.dir_changes = DirChanges(hist_file + DIR_CHANGES_FILE_SUFFIX)
+        self.full_sweep_interval = full_sweep_interval
+        self.cleaned_lines = []
+        self.existence_cache = existence_cache
+        # a stale entry must only cost a search a stat, files that exist again but were not tracked again
+        # would be dropped from the history for good
+        self.file_checker = FileChecker(existence_cache, MissingDirTrie(), trust_missing=False)
+        self.batch_checker = provide_batch_file_checker(self.file_checker)
+
+    def clean(self, full_sweep=False):
+        # cleaner may be reused by the track daemon
         self.cleaned_lines = []
-        self.file_checker = FileChecker()
-
-    def clean(self):
-        with FileReadBackwards(self.hist_file) as file:
-            while True:
-                dir = file.readline()
-                if dir == "":  # EOF
-                    break
-                dir = dir.strip()
-                if not dir:
-                    continue
-                if not self.accept(dir):
-                    continue
-                self.cleaned_lines.append(dir)
-            self.write_lines_to_file()
-            file.close()
-
-    def write_lines_to_file(self):
+        self.file_checker.cache_ttl = None
+        if self.existence_cache:
+            # pick up what searches found out since the last clean
+            self.existence_cache.load()
+        # dirs may have come back since the last clean
+        self.file_checker.forget_dirs()
+        # created ahead of any clean that swaps in a cleaned history, creating it then would not be recorded
+        self.dir_changes.create_if_missing()
+        with open(self.hist_file, 'rb') as file:
+            # only the size is taken under the lock, appenders finish their records while holding it,
+            # so the first size bytes are complete and do not change until the cleaned history is swapped in
+            with HistoryLock(self.hist_file):
+                snapshot_stat = os.fstat(file.fileno())
+                state = CleanState.load(self.state_file)
+            if full_sweep or self.is_full_sweep_due(state):
+                self.clean_all(file, snapshot_stat)
+            else:
+                self.clean_tail(file, snapshot_stat, state)
+        if self.existence_cache:
+            self.existence_cache.save()
+
+    def is_full_sweep_due(self, state):
+        return state is None or time.time() - state.last_full_sweep >= self.full_sweep_interval
+
+    # the existence cache is not trusted, a file deleted after a search found it would stay until the next sweep
+    # what the sweep finds out is still stored in the cache
+    def clean_all(self, file, snapshot_stat):
+        self.logger.debug("sweeping all of %s" % self.hist_file)
+        self.file_checker.cache_ttl = 0
+        file.seek(0)
+        snapshot = file.read(snapshot_stat.st_size)
+        seen = set()
+        candidates = []
+        for dir in reversed(self.decode_lines(snapshot)):
+            if dir in seen:
+                continue
+            seen.add(dir)
+            candidates.append(dir)
+        exists = self.batch_checker.check_all(candidates)
+        self.cleaned_lines = [dir for dir, dir_exists in zip(candidates, exists) if dir_exists]
         self.cleaned_lines.reverse()
-        if len(self.cleaned_lines) == 0:
-            content = ""
+        state = CleanState.from_paths(self.cleaned_lines, time.time())
+        content = self.encode_lines(self.cleaned_lines)
+        if content == snapshot:
+            self.save_state(snapshot_stat, len(snapshot), snapshot, state)
         else:
-            content = '\n'.join(self.cleaned_lines)+'\n'
-        with open(self.hist_file, 'w') as file:
-            file.write(content)
+            self.write_lines_to_file(snapshot_stat, len(snapshot), content, state)
 
-    def accept(self, dir):
-        if not self.file_checker.isfile(dir):
-            return False
-        if dir in self.cleaned_lines:
+    # checks the lines appended since the last clean, the history is only rewritten if one of them
+    # is missing, appears twice or replaces an older occurrence
+    def clean_tail(self, file, snapshot_stat, state):
+        head_start = max(0, min(state.offset, snapshot_stat.st_size) - FINGERPRINT_SIZE)
+        file.seek(head_start)
+        data = file.read(snapshot_stat.st_size - head_start)
+        if not state.matches(snapshot_stat, data[:state.offset - head_start]):
+            self.logger.debug("%s changed since the last clean" % self.hist_file)
+            self.clean_all(file, snapshot_stat)
+            return
+        tail_paths = set()
+        candidates = []
+        needs_rewrite = False
+        for dir in reversed(self.decode_lines(data[state.offset - head_start:])):
+            if dir in tail_paths:
+                needs_rewrite = True
+                continue
+            tail_paths.add(dir)
+            candidates.append(dir)
+        for dir, dir_exists in zip(candidates, self.batch_checker.check_all(candidates)):
+            if not dir_exists:
+                needs_rewrite = True
+                continue
+            if state.contains(dir):
+                needs_rewrite = True
+            self.cleaned_lines.append(dir)
+        self.cleaned_lines.reverse()
+        state.add_all(self.cleaned_lines)
+        if not needs_rewrite:
+            self.save_state(snapshot_stat, snapshot_stat.st_size, data, state)
+            return
+        self.logger.debug("rewriting %s, appended lines contain duplicates or missing files" % self.hist_file)
+        file.seek(0)
+        head = file.read(state.offset)
+        self.cleaned_lines = [dir for dir in self.decode_lines(head) if dir not in tail_paths] + self.cleaned_lines
+        self.write_lines_to_file(snapshot_stat, snapshot_stat.st_size, self.encode_lines(self.cleaned_lines), state)
+
+    @staticmethod
+    def decode_lines(data):
+        lines = (line.strip() for line in data.decode('utf-8', 'surrogateescape').split('\n'))
+        return [line for line in lines if line]
+
+    @staticmethod
+    def encode_lines(lines):
+        if len(lines) == 0:
+            return b""
+        return ('\n'.join(lines) + '\n').encode('utf-8', 'surrogateescape')
+
+    # history stays as it is, only the watermark moves
+    def save_state(self, snapshot_stat, snapshot_size, data, state):
+        with HistoryLock(self.hist_file):
+            if not self.is_unchanged_since_snapshot(snapshot_stat, snapshot_size):
+                return
+            state.mark_clean(snapshot_stat, snapshot_size, data)
+            state.save(self.state_file)
+
+    def write_lines_to_file(self, snapshot_stat, snapshot_size, content, state):
+        try:
+            self.swap_in_lines(snapshot_stat, snapshot_size, content, state)
+        finally:
+            self.dir_changes.save()
+
+    def swap_in_lines(self, snapshot_stat, snapshot_size, content, state):
+        tmp_path = self.create_tmp_file(content, snapshot_stat)
+        try:
+            with HistoryLock(self.hist_file) as lock:
+                if not self.is_unchanged_since_snapshot(snapshot_stat, snapshot_size):
+                    self.logger.debug("history file %s was replaced during clean, skipping" % self.hist_file)
+                    return
+                if tmp_path is None or lock.locks_history_file:
+                    self.rewrite_in_place(content, snapshot_size)
+                else:
+                    self.replace(tmp_path, snapshot_size)
+                    tmp_path = None
+                state.mark_clean(os.stat(self.hist_file), len(content), content)
+                state.save(self.state_file)
+        finally:
+            if tmp_path is not None:
+                self.dir_changes.record(self.hist_dir, lambda: os.remove(tmp_path))
+
+    # temp file lives next to the history, so it can be renamed over it
+    # returns None if the history dir is not writable, i.e. for system wide installations
+    def create_tmp_file(self, content, snapshot_stat):
+        hist_name = os.path.basename(self.hist_file)
+        try:
+            fd, tmp_path = self.dir_changes.record(
+                self.hist_dir, lambda: tempfile.mkstemp(prefix=hist_name + ".", suffix=".tmp", dir=self.hist_dir))
+        except OSError:
+            return None
+        try:
+            os.fchmod(fd, stat.S_IMODE(snapshot_stat.st_mode))
+            os.write(fd, content)
+            os.fsync(fd)
+        except OSError:
+            os.close(fd)
+            self.dir_changes.record(self.hist_dir, lambda: os.remove(tmp_path))
+            raise
+        os.close(fd)
+        return tmp_path
+
+    # another cleaner may have replaced or rewritten the history since it was read
+    def is_unchanged_since_snapshot(self, snapshot_stat, snapshot_size):
+        try:
+            current_stat = os.stat(self.hist_file)
+        except FileNotFoundError:
             return False
-        return True
+        return (current_stat.st_ino == snapshot_stat.st_ino
+                and current_stat.st_dev == snapshot_stat.st_dev
+                and current_stat.st_size >= snapshot_size)
+
+    def replace(self, tmp_path, snapshot_size):
+        tail = self.read_tail(snapshot_size)
+        if tail:
+            with open(tmp_path, 'ab') as file:
+                file.write(tail)
+                file.flush()
+                os.fsync(file.fileno())
+        self.dir_changes.record(self.hist_dir, lambda: os.replace(tmp_path, self.hist_file))
+
+    def rewrite_in_place(self, content, snapshot_size):
+        with open(self.hist_file, 'r+b') as file:
+            file.seek(snapshot_size)
+            tail = file.read()
+            file.seek(0)
+            file.write(content + tail)
+            file.truncate()
+
+    def read_tail(self, snapshot_size):
+        with open(self.hist_file, 'rb') as file:
+            file.seek(snapshot_size)
+            return file.read()
+
+
+# full sweep interval in seconds is configurable via env var
+def provide_cleaner(hist_file):
+    return FileHistoryCleaner(hist_file, float(os.getenv(FULL_SWEEP_INTERVAL_ENV, DEFAULT_FULL_SWEEP_INTERVAL)),
+                              provide_existence_cache(hist_file))
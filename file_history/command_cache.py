@@ -0,0 +1,149 @@
+import fcntl
+import json
+import os
+import time
+from collections import OrderedDict
+
+from file_history.args import CMD_CACHE_SIZE_ENV, DEFAULT_CMD_CACHE_SIZE
+from file_history.dir_changes import DIR_CHANGES_FILE_SUFFIX, DirChanges
+from file_history.logging_config import configure_logger
+
+# dirs modified this recently may still change within the same mtime tick, results depending on them are not cached
+RACY_MTIME_NS = 2 * 10 ** 9
+
+
+# size bounded lru cache of command analysis results, keyed by (home, recent_dirs, cmd)
+# ~ in commands is resolved against HOME and the cache of a system wide history is shared by all users
+# each entry remembers the mtimes of all dirs its file candidates live in: creating, deleting or renaming
+# a file changes the mtime of its dir, so an entry stays valid as long as none of those mtimes changed
+# commands without any files are cached as well, so 'git status' or 'make test' short circuit the same way
+# changes the cleaner made to the history dir by swapping in the cleaned history are followed via dir_changes
+# optionally persisted as json at path, so short lived track processes can share it
+class CommandCache:
+
+    def __init__(self, path=None, max_entries=DEFAULT_CMD_CACHE_SIZE, dir_changes=None):
+        self.logger = configure_logger(self.__class__.__name__)
+        self.path = path
+        self.max_entries = max_entries
+        # optional DirChanges, only loaded once an entry looks invalid
+        self.dir_changes = dir_changes
+        self.dir_changes_loaded = False
+        # key -> (files, {dir: mtime_ns or None if dir is missing})
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def create_key(cmd, recent_dirs):
+        return os.getenv("HOME", "") + "\n" + "\0".join(recent_dirs) + "\n" + cmd
+
+    @staticmethod
+    def read_mtime(dir):
+        try:
+            return os.stat(dir).st_mtime_ns
+        except OSError:
+            return None
+
+    @staticmethod
+    def read_mtimes(dirs):
+        return {dir: CommandCache.read_mtime(dir) for dir in dirs}
+
+    # returns cached files or None if there is no valid entry
+    def lookup(self, cmd, recent_dirs):
+        key = self.create_key(cmd, recent_dirs)
+        entry = self.entries.get(key)
+        if entry is not None:
+            files, mtimes = entry
+            if self.is_valid(mtimes):
+                self.entries.move_to_end(key)
+                self.hits += 1
+                self.logger.debug("cache hit (hits=%d, misses=%d): %s" % (self.hits, self.misses, cmd))
+                return list(files)
+            del self.entries[key]
+        self.misses += 1
+        self.logger.debug("cache miss (hits=%d, misses=%d): %s" % (self.hits, self.misses, cmd))
+        return None
+
+    # mtimes changed by the cleaner only are updated in place
+    def is_valid(self, mtimes):
+        current_mtimes = self.read_mtimes(mtimes)
+        for dir, mtime in mtimes.items():
+            current = current_mtimes[dir]
+            if current == mtime:
+                continue
+            if mtime is None or current is None or self.follow_dir_changes(dir, mtime) != current:
+                return False
+        mtimes.update(current_mtimes)
+        return True
+
+    def follow_dir_changes(self, dir, mtime):
+        if self.dir_changes is None:
+            return mtime
+        if not self.dir_changes_loaded:
+            self.dir_changes.load()
+            self.dir_changes_loaded = True
+        return self.dir_changes.follow(dir, mtime)
+
+    # mtimes must be read before the files were checked, so changes during the check invalidate the entry
+    def store(self, cmd, recent_dirs, files, mtimes):
+        now = time.time_ns()
+        if any(mtime is not None and now - mtime < RACY_MTIME_NS for mtime in mtimes.values()):
+            self.logger.debug("dirs modified too recently, not caching: %s" % cmd)
+            return
+        key = self.create_key(cmd, recent_dirs)
+        self.entries[key] = (list(files), mtimes)
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+    def stats(self):
+        return {"hits": self.hits, "misses": self.misses, "entries": len(self.entries)}
+
+    def load(self):
+        if not self.path:
+            return
+        try:
+            with open(self.path, 'r') as file:
+                fcntl.flock(file, fcntl.LOCK_SH)
+                data = json.load(file)
+            self.hits = data["hits"]
+            self.misses = data["misses"]
+            for key, files, mtimes in data["entries"][-self.max_entries:]:
+                self.entries[key] = (files, mtimes)
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            # broken cache is no reason to fail, start over
+            self.logger.debug("ignoring unreadable command cache %s: %s" % (self.path, e))
+            self.entries.clear()
+
+    # rewrites the file in place instead of renaming a temp file over it:
+    # creating or renaming files would change the mtime of the history files dir and invalidate its entries
+    # concurrent track processes may overwrite each others entries, which is fine for a cache
+    def save(self):
+        if not self.path:
+            return
+        data = {
+            "hits": self.hits,
+            "misses": self.misses,
+            "entries": [[key, files, mtimes] for key, (files, mtimes) in self.entries.items()],
+        }
+        try:
+            fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o600)
+            with open(fd, 'w') as file:
+                fcntl.flock(file, fcntl.LOCK_EX)
+                file.truncate(0)
+                json.dump(data, file)
+        except OSError as e:
+            self.logger.debug("could not save command cache %s: %s" % (self.path, e))
+
+
+# persistent cache stored next to the history file, None if disabled via env var
+def provide_command_cache(history_file):
+    max_entries = int(os.getenv(CMD_CACHE_SIZE_ENV, DEFAULT_CMD_CACHE_SIZE))
+    if max_entries <= 0:
+        return None
+    cache = CommandCache(history_file + ".cmd-cache", max_entries,
+                         DirChanges(history_file + DIR_CHANGES_FILE_SUFFIX))
+    cache.load()
+    return cache
@@ -14,9 +14,16 @@ class CommandParser:
         self.command_splitter = CommandSplitter()
 
     def find_files_in_command(self, cmd, recent_dirs):
+        files = []
+        for file_candidate in self.find_file_candidates(cmd, recent_dirs):
+            self.add_if_exists(files, file_candidate)
+        return files
+
+    # all paths the command could refer to, existing or not
+    def find_file_candidates(self, cmd, recent_dirs):
         self.logger.debug("checking cmd for files: '%s'" % cmd.rstrip())
 
-        files = []
+        candidates = []
         cmd_parts = self.command_splitter.split_command(cmd)
         # single word commands cannot contain file
         if len(cmd_parts) <= 1:
@@ -36,14 +43,14 @@ class CommandParser:
                 if _file_candidate.isspace() or _file_candidate.strip() == "":
                     continue
                 if _file_candidate.startswith("/"):
-                    self.logger.debug("checking potential abs file: %s" % _file_candidate)
-                    self.add_if_exists(files, _file_candidate)
+                    self.logger.debug("potential abs file: %s" % _file_candidate)
+                    candidates.append(_file_candidate)
                     continue
                 for recent_dir in _recent_dirs:
                     rel_file = recent_dir + "/" + _file_candidate
-                    self.logger.debug("checking potential recent_dir/file combination: %s" % rel_file)
-                    self.add_if_exists(files, rel_file)
-        return files
+                    self.logger.debug("potential recent_dir/file combination: %s" % rel_file)
+                    candidates.append(rel_file)
+        return candidates
 
     # checks if command like ["echo", "gil"] can even contain a file
     # if its not possible return true -> dont further scan cmd
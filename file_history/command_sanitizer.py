@@ -1,6 +1,6 @@
 
 
-BASH_SYMBOLS = [">", ">>", "<", "<<"]
+BASH_SYMBOLS = [">", ">>", "<", "<<", "<<<"]
 
 
 # removes everything from command that for sure is not a file
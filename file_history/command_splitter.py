@@ -1,5 +1,5 @@
 import re
-import shlex
+
 from file_history.logging_config import configure_logger
 
 # Known commands and their options that indicate a subshell
@@ -15,13 +15,37 @@ subshell_indicators = {
     "sudo": "-c",
 }
 
-new_cmd_delimiter = [";", "|", "&&"]
+# everything that can be taken over into a word as is
+PLAIN_RUN = re.compile(r"""[^\s'"\\;|&<>#]+""")
+DOUBLE_QUOTED_RUN = re.compile(r'[^"\\]+')
+# chars that keep their backslash in double quotes
+DOUBLE_QUOTED_ESCAPABLE = '\\"$`\n'
+WORD_END = " \t\r"
+# redirect operators and the symbol they are emitted as, longest first
+REDIRECTS = [
+    ("<<<", "<<<"),
+    ("<<-", "<<"),
+    (">>", ">>"),
+    (">|", ">"),
+    ("<<", "<<"),
+    ("<>", "<"),
+    (">", ">"),
+    ("<", "<"),
+]
+# duplicating fds like 2>&1 or <&0 does not involve a file
+FD_DUPLICATION = re.compile(r"[<>]&(?:\d+|-)(?![^\s;|&<>])")
+# redirect targets like /dev/null are devices, never files worth tracking
+DEVICE_DIR = "/dev/"
+REDIRECT_SYMBOLS = {symbol for _, symbol in REDIRECTS}
 
 
 # split command into list of subcommands
 # each subcommand is a list of cmd_parts like [ls, foo.txt]
-# supports subshells and command chains with ; or | or &&
+# supports subshells and command chains with ; or | or && or || or & or newlines
 # -> "ls foo | grep bar" becomes [[ls,foo],[grep, bar]]
+# redirects become separate parts, fd duplications like 2>&1 and redirects to devices are dropped
+# -> "echo foo>bar 2>&1" becomes [echo, foo, >, bar]
+# -> "make 2>/dev/null" becomes [make]
 # swallows subshell prefixes
 # -> "bash -c 'ls foo.txt'" becomes [ls, foo.txt]
 class CommandSplitter:
@@ -31,64 +55,143 @@ class CommandSplitter:
 
     def split_command(self, cmd):
         try:
-            cmd_parts = CommandSplitter.shlex_split(cmd)
-            # split [cd, foo, ;, cd, bar] into [cd, foo], [cd, bar]
-            cmd_parts = CommandSplitter.split_list_by_del(cmd_parts, new_cmd_delimiter)
-
-            # find subshell parts, those need to be removed from cmd_parts and split separately
-            pos = 0
-            for inner_cmd in cmd_parts:
-                subshell_position = CommandSplitter.find_sub_shell_position(inner_cmd)
-                if subshell_position is not None:
-                    subshell = self.split_command(inner_cmd[subshell_position])
-                    cmd_parts[pos] = subshell
-                pos += 1
-
-            # remove unnecessary list levels
-            # if [[ls,foo]] return [ls,foo]
-            if len(cmd_parts) == 1:
-                return cmd_parts[0]
-            return cmd_parts
-
+            cmd_parts = CommandSplitter.tokenize(cmd)
         except ValueError as e:
             self.logger.debug(f"Error splitting command: {e}")
             return []
 
+        # replace commands running a subshell with the split subshell
+        for pos, inner_cmd in enumerate(cmd_parts):
+            subshell_position = CommandSplitter.find_sub_shell_position(inner_cmd)
+            if subshell_position is not None:
+                cmd_parts[pos] = self.split_command(inner_cmd[subshell_position])
+
+        # remove unnecessary list levels
+        # if [[ls,foo]] return [ls,foo]
+        if len(cmd_parts) == 1:
+            return cmd_parts[0]
+        return cmd_parts
+
+    # single pass over cmd, following the bash quoting rules
+    # returns list of sub commands, each a list of words
+    # raises ValueError on unbalanced quotes or trailing escape char
     @staticmethod
-    def shlex_split(cmd):
-        _cmd = CommandSplitter.ensure_spaces_around_delimiters(cmd, ";")
-        return shlex.split(_cmd)
-
+    def tokenize(cmd):
+        sub_cmds = []
+        words = []
+        pieces = []
+        in_word = False
+        pos = 0
+        length = len(cmd)
+        while pos < length:
+            match = PLAIN_RUN.match(cmd, pos)
+            if match:
+                pieces.append(match.group())
+                in_word = True
+                pos = match.end()
+                continue
+            char = cmd[pos]
+
+            if char == "'":
+                end = cmd.find("'", pos + 1)
+                if end == -1:
+                    raise ValueError("No closing quotation")
+                pieces.append(cmd[pos + 1:end])
+                in_word = True
+                pos = end + 1
+            elif char == '"':
+                pos = CommandSplitter.read_double_quoted(cmd, pos + 1, pieces)
+                in_word = True
+            elif char == "\\":
+                if pos + 1 >= length:
+                    raise ValueError("No escaped character")
+                # escaped newline just continues the line
+                if cmd[pos + 1] != "\n":
+                    pieces.append(cmd[pos + 1])
+                    in_word = True
+                pos += 2
+            elif char == "#" and in_word:
+                pieces.append(char)
+                pos += 1
+            elif char == "#":
+                # comment until end of line
+                end = cmd.find("\n", pos)
+                pos = length if end == -1 else end
+            else:
+                # everything else ends the current word,
+                # unless it consists of digits directly in front of a redirect, like the fd in 2>
+                is_fd = char in "<>" and "".join(pieces).isdigit()
+                if in_word and not is_fd:
+                    CommandSplitter.add_word(words, "".join(pieces))
+                pieces = []
+                in_word = False
+
+                if char in WORD_END:
+                    pos += 1
+                elif char in "<>":
+                    pos = CommandSplitter.read_redirect(cmd, pos, words)
+                elif cmd.startswith("&>", pos):
+                    # &> and &>> redirect stdout and stderr
+                    pos = CommandSplitter.read_redirect(cmd, pos + 1, words)
+                else:
+                    # ; | & && || |& and newlines end the sub command
+                    if words:
+                        sub_cmds.append(words)
+                        words = []
+                    pos += 2 if cmd.startswith(("&&", "||", "|&"), pos) else 1
+
+        if in_word:
+            CommandSplitter.add_word(words, "".join(pieces))
+        if words:
+            sub_cmds.append(words)
+        return sub_cmds
+
+    # a device as redirect target takes its redirect symbol with it
     @staticmethod
-    def ensure_spaces_around_delimiters(input_string, delimiters):
-        # Create a regular expression pattern that matches any of the delimiters
-        pattern = f"({'|'.join(map(re.escape, delimiters))})"
-
-        # Use the re.sub function to add spaces around the delimiters
-        result = re.sub(pattern, r' \1 ', input_string)
-
-        # Remove any extra spaces (e.g., if there were already spaces around the delimiters)
-        result = re.sub(r'\s+', ' ', result).strip()
-
-        return result
+    def add_word(words, word):
+        if word.startswith(DEVICE_DIR) and words and words[-1] in REDIRECT_SYMBOLS:
+            words.pop()
+            return
+        words.append(word)
 
+    # reads until closing double quote, returns position after it
     @staticmethod
-    def split_list_by_del(input_list, delimiters):
-        result = []
-        current_sublist = []
-
-        for item in input_list:
-            if item in delimiters:
-                if current_sublist:
-                    result.append(current_sublist)
-                    current_sublist = []
-            else:
-                current_sublist.append(item)
-
-        if current_sublist:
-            result.append(current_sublist)
-
-        return result
+    def read_double_quoted(cmd, pos, pieces):
+        length = len(cmd)
+        while pos < length:
+            match = DOUBLE_QUOTED_RUN.match(cmd, pos)
+            if match:
+                pieces.append(match.group())
+                pos = match.end()
+                continue
+            if cmd[pos] == '"':
+                return pos + 1
+            # backslash
+            if pos + 1 >= length:
+                break
+            escaped = cmd[pos + 1]
+            if escaped not in DOUBLE_QUOTED_ESCAPABLE:
+                pieces.append("\\")
+            if escaped != "\n":
+                pieces.append(escaped)
+            pos += 2
+        raise ValueError("No closing quotation")
+
+    # adds redirect symbol to words, returns position after the operator
+    @staticmethod
+    def read_redirect(cmd, pos, words):
+        duplication = FD_DUPLICATION.match(cmd, pos)
+        if duplication:
+            return duplication.end()
+        for operator, symbol in REDIRECTS:
+            if cmd.startswith(operator, pos):
+                words.append(symbol)
+                pos += len(operator)
+                # >&file is the same as &>file
+                if cmd.startswith("&", pos):
+                    pos += 1
+                return pos
+        return pos + 1
 
     # find pos in cmd_parts where a subshell is located
     @staticmethod
@@ -116,4 +219,3 @@ class CommandSplitter:
             return None
         else:
             return sub_shell_positions[0]
-
@@ -0,0 +1,27 @@
+import signal
+import sys
+
+from file_history.daemon.track_daemon import TrackDaemon
+from file_history.daemon.track_protocol import resolve_track_socket_path
+
+
+class DaemonApp:
+
+    def __init__(self):
+        self.daemon = None
+
+    def exit(self, code):
+        exit(code)
+
+    def on_signal(self, signum, frame):
+        self.daemon.stop()
+
+    def start(self):
+        try:
+            self.daemon = TrackDaemon(resolve_track_socket_path())
+            signal.signal(signal.SIGTERM, self.on_signal)
+            signal.signal(signal.SIGINT, self.on_signal)
+            self.daemon.serve_forever()
+        except Exception as e:
+            print(e, file=sys.stderr)
+            self.exit(1)
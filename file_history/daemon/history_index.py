@@ -0,0 +1,118 @@
+import os
+
+from file_history.batch_file_checker import provide_batch_file_checker
+from file_history.file_checker import FileChecker
+from file_history.filter_matcher import FilterMatcher
+from file_history.history_lock import HistoryLock
+from file_history.logging_config import configure_logger
+from file_history.missing_dir_trie import MissingDirTrie
+
+# bytes before the read offset that must still be the same, otherwise the history was rewritten in place
+TAIL_CHECK_SIZE = 256
+
+
+# deduplicated files of a history in memory, ordered from least to most recent
+# before each query only what was appended since the last one is read,
+# the history is read from scratch once a cleaner replaced or rewrote it
+# existence checks go through a resident FileChecker, so recently found files are not checked again
+class HistoryIndex:
+
+    # select_ttl: seconds existing files are trusted by the existence cache, when the user selects one of them
+    def __init__(self, hist_file, existence_cache=None, select_ttl=None):
+        self.logger = configure_logger(self.__class__.__name__)
+        self.hist_file = hist_file
+        self.existence_cache = existence_cache
+        self.select_ttl = select_ttl
+        self.file_checker = FileChecker(existence_cache, MissingDirTrie())
+        self.batch_checker = provide_batch_file_checker(self.file_checker)
+        # file -> None, a dict keeps the order files were added in, a file added again is moved to the end
+        self.files = {}
+        self.inode = None
+        self.device = None
+        # the history is read up to here, always the end of a line
+        self.offset = 0
+        self.tail = b""
+
+    # returns the max_results most recent files matching filter, that still exist
+    # select: the user selects one of the files, a file deleted shortly before must not be offered
+    # queries are answered one after another, so the file checker can be switched per query
+    def query(self, filter, max_results, smart_case=False, select=False):
+        self.file_checker.cache_ttl = self.select_ttl if select else None
+        self.refresh()
+        # dirs may have come back since the last query
+        self.file_checker.forget_dirs()
+        matcher = FilterMatcher(filter, smart_case) if filter else None
+        found = []
+        candidates = []
+        for file in reversed(self.files):
+            if matcher is not None and not matcher.matches(file):
+                continue
+            candidates.append(file)
+            # no more checks than files still needed
+            if len(candidates) >= max_results - len(found):
+                found += self.check(candidates)
+                candidates = []
+                if len(found) >= max_results:
+                    break
+        found += self.check(candidates)
+        if self.existence_cache:
+            self.existence_cache.save()
+        return found[:max_results]
+
+    def check(self, candidates):
+        return [file for file, exists in zip(candidates, self.batch_checker.check_all(candidates)) if exists]
+
+    # reads what was appended since the last refresh
+    def refresh(self):
+        try:
+            fd = os.open(self.hist_file, os.O_RDONLY)
+        except FileNotFoundError:
+            self.reset(None)
+            return
+        try:
+            # appenders finish their records while holding the lock
+            with HistoryLock(self.hist_file, shared=True):
+                hist_stat = os.fstat(fd)
+            if not self.is_appended_to(fd, hist_stat):
+                self.logger.debug("%s was rewritten, reading it again" % self.hist_file)
+                self.reset(hist_stat)
+            if hist_stat.st_size > self.offset:
+                appended = self.offset > 0
+                files = self.add(os.pread(fd, hist_stat.st_size - self.offset, self.offset))
+                if appended and self.existence_cache:
+                    # tracked again, they may have been created since they were found missing,
+                    # the tombstones the appender writes to the cache file are never read again here
+                    self.existence_cache.forget(files)
+        finally:
+            os.close(fd)
+
+    def is_appended_to(self, fd, hist_stat):
+        return (hist_stat.st_ino == self.inode
+                and hist_stat.st_dev == self.device
+                and hist_stat.st_size >= self.offset
+                and os.pread(fd, len(self.tail), self.offset - len(self.tail)) == self.tail)
+
+    def reset(self, hist_stat):
+        self.files = {}
+        self.inode = hist_stat.st_ino if hist_stat else None
+        self.device = hist_stat.st_dev if hist_stat else None
+        self.offset = 0
+        self.tail = b""
+
+    # only complete lines are added, the rest is read again on the next refresh
+    # returns the added files
+    def add(self, data):
+        end = data.rfind(b'\n') + 1
+        if end == 0:
+            return []
+        added = []
+        for line in data[:end].decode('utf-8', 'surrogateescape').split('\n'):
+            file = line.strip()
+            if not file:
+                continue
+            self.files.pop(file, None)
+            self.files[file] = None
+            added.append(file)
+        self.offset += end
+        self.tail = (self.tail + data[max(0, end - TAIL_CHECK_SIZE):end])[-TAIL_CHECK_SIZE:]
+        return added
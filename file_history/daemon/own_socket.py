@@ -0,0 +1,24 @@
+import os
+import stat
+
+
+# whether path is a socket of the current user
+# without XDG_RUNTIME_DIR sockets live in /tmp, where another user could bind the path first and read
+# every command or answer queries with paths of their choosing. the sticky bit of /tmp keeps them from
+# replacing a socket of ours once it was checked
+def is_own_socket(path):
+    try:
+        socket_stat = os.lstat(path)
+    except OSError:
+        return False
+    return stat.S_ISSOCK(socket_stat.st_mode) and socket_stat.st_uid == os.getuid()
+
+
+# binds sock to path, readable and writable by the current user only
+# the umask applies from the start, a chmod after binding would leave the socket open to others until then
+def bind_own_socket(sock, path):
+    previous_umask = os.umask(0o177)
+    try:
+        sock.bind(path)
+    finally:
+        os.umask(previous_umask)
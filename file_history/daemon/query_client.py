@@ -0,0 +1,56 @@
+import os
+import socket
+
+from file_history.daemon.own_socket import is_own_socket
+from file_history.daemon.query_protocol import decode_files, encode_query, resolve_query_socket_path
+from file_history.logging_config import configure_logger
+
+# seconds to wait for an answer, searching without the server is the better option after that
+QUERY_TIMEOUT = 0.5
+
+
+# asks a running QueryServer for the files of a search
+# if the server is not running, busy or fails, the caller needs to search itself
+class QueryClient:
+
+    def __init__(self, socket_path, timeout=QUERY_TIMEOUT):
+        self.logger = configure_logger(self.__class__.__name__)
+        self.socket_path = socket_path
+        self.timeout = timeout
+
+    # returns the found files, most recent first, or None if the server did not answer
+    # select: the user selects one of the files, so the server checks files it found a while ago again
+    def query(self, history_file, filter, max_results, smart_case=False, select=False):
+        if not is_own_socket(self.socket_path):
+            self.logger.debug("no query server of this user at %s" % self.socket_path)
+            return None
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            sock.settimeout(self.timeout)
+            sock.connect(self.socket_path)
+            sock.sendall(encode_query(os.path.abspath(history_file), filter, max_results, smart_case, select))
+            sock.shutdown(socket.SHUT_WR)
+            chunks = []
+            while True:
+                chunk = sock.recv(64 * 1024)
+                if not chunk:
+                    break
+                chunks.append(chunk)
+        except OSError as e:
+            # no socket, stale socket or timeout
+            self.logger.debug("query server not reachable at %s: %s" % (self.socket_path, e))
+            return None
+        finally:
+            sock.close()
+        return decode_files(b"".join(chunks))
+
+
+# only plain searches of the whole history are answered by the server
+# --no-cache asks for files to be checked right now, the server may answer from its existence cache
+def provide_query_client(options):
+    if options.fuzzy or options.no_cache or options.max_scanned != -1:
+        return None
+    socket_path = resolve_query_socket_path()
+    if not is_own_socket(socket_path):
+        return None
+    return QueryClient(socket_path)
@@ -0,0 +1,54 @@
+import os
+
+from file_history.args import QUERY_SOCKET_ENV
+
+# history file, max results, smart case, select and filter are sent as one request, separated by NUL bytes,
+# the client then shuts down its sending side
+# select: the user selects one of the files, existing files are only trusted briefly then
+FIELD_SEPARATOR = b"\0"
+# requests longer than this are dropped
+MAX_REQUEST_SIZE = 64 * 1024
+# an answer starts with this line, followed by the found files one per line, the server closes the connection after
+# anything else means the server could not answer
+OK_LINE = b"ok\n"
+
+
+# socket of the query server, per user so one user cannot read another users history
+def resolve_query_socket_path():
+    path = os.getenv(QUERY_SOCKET_ENV)
+    if path:
+        return path
+    runtime_dir = os.getenv("XDG_RUNTIME_DIR") or "/tmp"
+    return os.path.join(runtime_dir, "file-history-query-%d.sock" % os.getuid())
+
+
+def encode_query(history_file, filter, max_results, smart_case, select=False):
+    fields = [history_file, str(max_results), "1" if smart_case else "0", "1" if select else "0", filter or ""]
+    return FIELD_SEPARATOR.join(field.encode("utf-8", "surrogateescape") for field in fields)
+
+
+# returns (history_file, filter, max_results, smart_case, select) or None if request is malformed
+# filter is None if the search is not filtered
+def decode_query(data):
+    fields = data.split(FIELD_SEPARATOR, 4)
+    if len(fields) != 5:
+        return None
+    history_file, max_results, smart_case, select, filter = (field.decode("utf-8", "surrogateescape")
+                                                             for field in fields)
+    try:
+        max_results = int(max_results)
+    except ValueError:
+        return None
+    return history_file, filter or None, max_results, smart_case == "1", select == "1"
+
+
+def encode_files(files):
+    return OK_LINE + "".join(file + "\n" for file in files).encode("utf-8", "surrogateescape")
+
+
+# returns None if the answer is no answer of a server that found files
+def decode_files(data):
+    if not data.startswith(OK_LINE):
+        return None
+    # each file ends with a line break, splitlines() would also split at other breaks paths may contain
+    return data[len(OK_LINE):].decode("utf-8", "surrogateescape").split("\n")[:-1]
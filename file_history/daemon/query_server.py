@@ -0,0 +1,112 @@
+import os
+import socket
+import threading
+
+from file_history.daemon.history_index import HistoryIndex
+from file_history.daemon.own_socket import bind_own_socket
+from file_history.daemon.query_protocol import MAX_REQUEST_SIZE, decode_query, encode_files
+from file_history.existence_cache import provide_existence_cache, provide_select_ttl
+from file_history.logging_config import configure_logger
+
+# seconds a client may take to send its query or read the answer, queries are answered one after another
+CLIENT_TIMEOUT = 1.0
+
+
+# long running process, that answers queries of QueryClient's over a unix socket from a HistoryIndex per history file
+# searching does not require a fresh interpreter reading the whole history then
+class QueryServer:
+
+    def __init__(self, socket_path):
+        self.logger = configure_logger(self.__class__.__name__)
+        self.socket_path = socket_path
+        self.sock = None
+        # history file -> HistoryIndex
+        self.indexes = {}
+        self.stop_event = threading.Event()
+        self.ready_event = threading.Event()
+
+    def is_running(self):
+        probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            probe.connect(self.socket_path)
+            return True
+        except OSError:
+            return False
+        finally:
+            probe.close()
+
+    def bind(self):
+        if self.is_running():
+            raise Exception("query server already running at %s" % self.socket_path)
+        try:
+            # stale socket of a server that did not shut down properly
+            os.unlink(self.socket_path)
+        except FileNotFoundError:
+            pass
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        bind_own_socket(self.sock, self.socket_path)
+        self.sock.listen()
+        self.logger.debug("listening on %s" % self.socket_path)
+
+    def serve_forever(self):
+        self.bind()
+        self.ready_event.set()
+        try:
+            while not self.stop_event.is_set():
+                connection, _ = self.sock.accept()
+                with connection:
+                    self.answer(connection)
+        finally:
+            self.close()
+
+    # can be called from any thread or signal handler
+    def stop(self):
+        self.stop_event.set()
+        # wake up blocking accept with a connection
+        waker = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            waker.connect(self.socket_path)
+        except OSError:
+            pass
+        finally:
+            waker.close()
+
+    def close(self):
+        if self.sock:
+            self.sock.close()
+            self.sock = None
+        try:
+            os.unlink(self.socket_path)
+        except FileNotFoundError:
+            pass
+        self.logger.debug("query server stopped")
+
+    # a client that fails or is too slow gets no answer and searches itself
+    def answer(self, connection):
+        connection.settimeout(CLIENT_TIMEOUT)
+        try:
+            query = decode_query(self.receive_request(connection))
+            if query is None:
+                return
+            history_file, filter, max_results, smart_case, select = query
+            files = self.get_index(history_file).query(filter, max_results, smart_case, select)
+            connection.sendall(encode_files(files))
+        except Exception as e:
+            self.logger.error("could not answer query: %s" % e)
+
+    # the client shuts down its sending side after the request
+    @staticmethod
+    def receive_request(connection):
+        data = b""
+        while len(data) <= MAX_REQUEST_SIZE:
+            chunk = connection.recv(MAX_REQUEST_SIZE)
+            if not chunk:
+                return data
+            data += chunk
+        raise Exception("request too long")
+
+    def get_index(self, history_file):
+        if history_file not in self.indexes:
+            self.indexes[history_file] = HistoryIndex(history_file, provide_existence_cache(history_file),
+                                                      provide_select_ttl())
+        return self.indexes[history_file]
@@ -0,0 +1,33 @@
+import os
+import signal
+import sys
+
+from file_history.args import HISTORY_FILE_ENV
+from file_history.daemon.query_protocol import resolve_query_socket_path
+from file_history.daemon.query_server import QueryServer
+
+
+class ServeApp:
+
+    def __init__(self):
+        self.server = None
+
+    def exit(self, code):
+        exit(code)
+
+    def on_signal(self, signum, frame):
+        self.server.stop()
+
+    def start(self):
+        try:
+            self.server = QueryServer(resolve_query_socket_path())
+            # the history of this user is read right away, other histories on their first query
+            history_file = os.getenv(HISTORY_FILE_ENV)
+            if history_file:
+                self.server.get_index(os.path.abspath(history_file)).refresh()
+            signal.signal(signal.SIGTERM, self.on_signal)
+            signal.signal(signal.SIGINT, self.on_signal)
+            self.server.serve_forever()
+        except Exception as e:
+            print(e, file=sys.stderr)
+            self.exit(1)
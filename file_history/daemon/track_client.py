@@ -0,0 +1,35 @@
+import socket
+
+from file_history.daemon.own_socket import is_own_socket
+from file_history.daemon.track_protocol import MAX_MESSAGE_SIZE, encode_track_message
+from file_history.logging_config import configure_logger
+
+
+# hands commands over to a running TrackDaemon
+# never blocks: if the daemon is not running or busy, the caller needs to track the command itself
+class TrackClient:
+
+    def __init__(self, socket_path):
+        self.logger = configure_logger(self.__class__.__name__)
+        self.socket_path = socket_path
+
+    # returns True if the daemon took the command, False otherwise
+    def send(self, history_file, curr_dir, cmd):
+        message = encode_track_message(history_file, curr_dir, cmd)
+        if len(message) > MAX_MESSAGE_SIZE:
+            self.logger.debug("command too long for track daemon")
+            return False
+        if not is_own_socket(self.socket_path):
+            self.logger.debug("no track daemon of this user at %s" % self.socket_path)
+            return False
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        try:
+            sock.setblocking(False)
+            sock.sendto(message, self.socket_path)
+            return True
+        except OSError as e:
+            # no socket, stale socket or full receive queue
+            self.logger.debug("track daemon not reachable at %s: %s" % (self.socket_path, e))
+            return False
+        finally:
+            sock.close()
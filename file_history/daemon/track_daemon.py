@@ -0,0 +1,157 @@
+import os
+import socket
+import threading
+
+from file_history.caching_command_parser import CachingCommandParser
+from file_history.clean.clean_scheduler import provide_clean_scheduler
+from file_history.clean.file_history_cleaner import provide_cleaner
+from file_history.command_cache import provide_command_cache
+from file_history.command_parser import CommandParser
+from file_history.daemon.own_socket import bind_own_socket
+from file_history.daemon.track_protocol import MAX_MESSAGE_SIZE, decode_track_message
+from file_history.dir_listing_cache import DirListingCache
+from file_history.dir_sanitizer import sanitize_dir
+from file_history.file_checker import FileChecker
+from file_history.file_history_manager import FileHistoryManager
+from file_history.logging_config import configure_logger
+from file_history.track.file_history_appender import FileHistoryAppender
+
+# commands received in one go are tracked together and the history is cleaned once afterwards, if a clean is due
+MAX_BATCH_SIZE = 64
+
+
+# long running process, that tracks the commands sent by TrackClient's over a unix socket
+# keeps command parser, appenders and cleaners resident, so tracking a command does not require
+# a fresh interpreter loading the whole analysis code
+class TrackDaemon:
+
+    def __init__(self, socket_path):
+        self.logger = configure_logger(self.__class__.__name__)
+        self.socket_path = socket_path
+        self.sock = None
+        self.dir_listing = DirListingCache(FileChecker())
+        self.command_parser = CommandParser(self.dir_listing)
+        self.appenders = {}
+        self.cleaners = {}
+        self.clean_schedulers = {}
+        # history file -> command parser answering repeated commands from the history files command cache
+        self.caching_parsers = {}
+        self.stop_event = threading.Event()
+        self.ready_event = threading.Event()
+
+    def is_running(self):
+        probe = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        try:
+            probe.connect(self.socket_path)
+            return True
+        except OSError:
+            return False
+        finally:
+            probe.close()
+
+    def bind(self):
+        if self.is_running():
+            raise Exception("track daemon already running at %s" % self.socket_path)
+        try:
+            # stale socket of a daemon that did not shut down properly
+            os.unlink(self.socket_path)
+        except FileNotFoundError:
+            pass
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        bind_own_socket(self.sock, self.socket_path)
+        self.logger.debug("listening on %s" % self.socket_path)
+
+    def serve_forever(self):
+        self.bind()
+        self.ready_event.set()
+        try:
+            while not self.stop_event.is_set():
+                self.track_batch(self.receive_batch())
+        finally:
+            self.close()
+
+    # can be called from any thread or signal handler
+    def stop(self):
+        self.stop_event.set()
+        # wake up blocking receive with an empty message
+        waker = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        try:
+            waker.sendto(b"", self.socket_path)
+        except OSError:
+            pass
+        finally:
+            waker.close()
+
+    def close(self):
+        for caching_parser in self.caching_parsers.values():
+            caching_parser.command_cache.save()
+        if self.sock:
+            self.sock.close()
+            self.sock = None
+        try:
+            os.unlink(self.socket_path)
+        except FileNotFoundError:
+            pass
+        self.logger.debug("track daemon stopped")
+
+    # blocks until a message arrives, then takes all messages already queued
+    def receive_batch(self):
+        self.sock.setblocking(True)
+        batch = [self.sock.recv(MAX_MESSAGE_SIZE)]
+        self.sock.setblocking(False)
+        try:
+            while len(batch) < MAX_BATCH_SIZE:
+                batch.append(self.sock.recv(MAX_MESSAGE_SIZE))
+        except BlockingIOError:
+            pass
+        return batch
+
+    def track_batch(self, batch):
+        # commands of one batch share the directory listings
+        self.dir_listing.clear()
+        touched_history_files = []
+        for data in batch:
+            message = decode_track_message(data)
+            if message is None:
+                continue
+            history_file, curr_dir, cmd = message
+            try:
+                self.track(history_file, curr_dir, cmd)
+            except Exception as e:
+                self.logger.error("could not track cmd '%s': %s" % (cmd, e))
+                continue
+            if history_file not in touched_history_files:
+                touched_history_files.append(history_file)
+        for history_file in touched_history_files:
+            self.clean(history_file)
+
+    def track(self, history_file, curr_dir, cmd):
+        self.logger.debug("tracking cmd '%s' in dir %s" % (cmd, curr_dir))
+        if history_file not in self.appenders:
+            FileHistoryManager(history_file).create_if_missing()
+            self.appenders[history_file] = FileHistoryAppender(history_file)
+        files = self.get_command_parser(history_file).find_files_in_command(cmd, [sanitize_dir(curr_dir)])
+        self.appenders[history_file].append_all(files)
+
+    def get_command_parser(self, history_file):
+        if history_file not in self.caching_parsers:
+            command_cache = provide_command_cache(history_file)
+            if command_cache is None:
+                return self.command_parser
+            self.caching_parsers[history_file] = CachingCommandParser(self.command_parser, command_cache)
+        return self.caching_parsers[history_file]
+
+    def clean(self, history_file):
+        if history_file not in self.cleaners:
+            self.cleaners[history_file] = provide_cleaner(history_file)
+            self.clean_schedulers[history_file] = provide_clean_scheduler(history_file)
+        scheduler = self.clean_schedulers[history_file]
+        try:
+            if not scheduler.acquire():
+                return
+            self.cleaners[history_file].clean()
+            scheduler.mark_cleaned()
+        except Exception as e:
+            self.logger.error("could not clean %s: %s" % (history_file, e))
+        finally:
+            scheduler.release()
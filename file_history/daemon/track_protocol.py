@@ -0,0 +1,31 @@
+import os
+
+from file_history.args import TRACK_SOCKET_ENV
+
+# history file, working dir and command are sent as one datagram, separated by NUL bytes
+FIELD_SEPARATOR = b"\0"
+# commands longer than this are tracked in process, datagrams of this size are accepted by default on linux
+MAX_MESSAGE_SIZE = 64 * 1024
+
+
+# socket of the track daemon, per user so one user cannot write into another users history
+def resolve_track_socket_path():
+    path = os.getenv(TRACK_SOCKET_ENV)
+    if path:
+        return path
+    runtime_dir = os.getenv("XDG_RUNTIME_DIR") or "/tmp"
+    return os.path.join(runtime_dir, "file-history-%d.sock" % os.getuid())
+
+
+def encode_track_message(history_file, curr_dir, cmd):
+    fields = [history_file, curr_dir, cmd]
+    return FIELD_SEPARATOR.join(field.encode("utf-8", "surrogateescape") for field in fields)
+
+
+# returns (history_file, curr_dir, cmd) or None if message is malformed
+def decode_track_message(data):
+    fields = data.split(FIELD_SEPARATOR, 2)
+    if len(fields) != 3:
+        return None
+    history_file, curr_dir, cmd = (field.decode("utf-8", "surrogateescape") for field in fields)
+    return history_file, curr_dir, cmd
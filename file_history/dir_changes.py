@@ -0,0 +1,87 @@
+import fcntl
+import json
+import os
+
+from file_history.logging_config import configure_logger
+
+DIR_CHANGES_FILE_SUFFIX = ".dir-changes"
+# changes kept, entries of the command cache older than these are invalidated as before
+MAX_CHANGES = 32
+
+
+# mtimes the history dir went through because the cleaner created, renamed or removed its own files there,
+# so the CommandCache does not drop its entries for commands run in the history dir (usually ~) on every clean
+# a change is recorded as the mtimes right before and right after the syscall, a change by anyone else
+# in between two recorded changes breaks the chain and still invalidates the entries
+# stored next to the history as json, rewritten in place, renaming would change the dir again
+class DirChanges:
+
+    def __init__(self, path):
+        self.logger = configure_logger(self.__class__.__name__)
+        self.path = path
+        # [dir, mtime_ns before, mtime_ns after]
+        self.changes = []
+        self.new_changes = []
+
+    @staticmethod
+    def read_mtime(dir):
+        try:
+            return os.stat(dir).st_mtime_ns
+        except OSError:
+            return None
+
+    # creating the file changes the dir, so it is created before the first change is recorded
+    def create_if_missing(self):
+        try:
+            os.close(os.open(self.path, os.O_RDWR | os.O_CREAT, 0o666))
+        except OSError as e:
+            self.logger.debug("could not create %s: %s" % (self.path, e))
+
+    # calls operation, that changes dir, and records the change
+    def record(self, dir, operation):
+        before = self.read_mtime(dir)
+        result = operation()
+        after = self.read_mtime(dir)
+        if before is not None and after is not None and before != after:
+            self.new_changes.append([dir, before, after])
+        return result
+
+    # returns the mtime dir had after the recorded changes following mtime
+    def follow(self, dir, mtime):
+        for changed_dir, before, after in self.changes:
+            if changed_dir == dir and before == mtime:
+                mtime = after
+        return mtime
+
+    def load(self):
+        try:
+            with open(self.path, 'r') as file:
+                fcntl.flock(file, fcntl.LOCK_SH)
+                self.changes = self.read_changes(file)
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            self.logger.debug("ignoring unreadable dir changes %s: %s" % (self.path, e))
+
+    def read_changes(self, file):
+        try:
+            return [[dir, before, after] for dir, before, after in json.loads(file.read() or "[]")]
+        except (ValueError, TypeError):
+            # broken file only costs some command cache entries
+            return []
+
+    # appends the recorded changes to the ones of other cleaners
+    def save(self):
+        changes, self.new_changes = self.new_changes, []
+        if not changes:
+            return
+        try:
+            fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o666)
+            with open(fd, 'r+') as file:
+                fcntl.flock(file, fcntl.LOCK_EX)
+                self.changes = (self.read_changes(file) + changes)[-MAX_CHANGES:]
+                file.seek(0)
+                file.truncate()
+                json.dump(self.changes, file)
+        except OSError as e:
+            self.logger.debug("could not save dir changes %s: %s" % (self.path, e))
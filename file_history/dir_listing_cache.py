@@ -0,0 +1,73 @@
+import os
+
+from file_history.logging_config import configure_logger
+
+# a directory is listed once it is asked for this many times, a single stat is cheaper than a listing
+LIST_AFTER_LOOKUPS = 2
+# listings of bigger directories are not kept, asking the file checker is cheaper then
+MAX_LISTED_ENTRIES = 4096
+
+
+# answers isfile for many candidate files by listing each parent directory once with os.scandir,
+# instead of asking the file checker for every candidate
+# abs and relative candidates are grouped by their parent dir the same way
+# falls back to the file checker for directories that cannot be listed (missing, no read permission, too big)
+# listings are snapshots: keep an instance for one batch of commands only, or clear it in between
+class DirListingCache:
+
+    def __init__(self, file_checker):
+        self.logger = configure_logger(self.__class__.__name__)
+        self.file_checker = file_checker
+        self.lookups = {}
+        # dir -> (file names, symlink names) or None if dir can't be listed
+        self.listings = {}
+
+    def clear(self):
+        self.lookups.clear()
+        self.listings.clear()
+
+    def isfile(self, path):
+        parent, name = os.path.split(path)
+        if not name:
+            return self.file_checker.isfile(path)
+        listing = self.get_listing(parent or ".")
+        if listing is None:
+            return self.file_checker.isfile(path)
+        files, symlinks = listing
+        if name in symlinks:
+            # target might be inaccessible, let the file checker decide
+            return self.file_checker.isfile(path)
+        return name in files
+
+    def isdir(self, path):
+        return self.file_checker.isdir(path)
+
+    def get_listing(self, dir):
+        if dir in self.listings:
+            return self.listings[dir]
+        lookups = self.lookups.get(dir, 0) + 1
+        self.lookups[dir] = lookups
+        if lookups < LIST_AFTER_LOOKUPS:
+            return None
+        self.listings[dir] = self.list_dir(dir)
+        return self.listings[dir]
+
+    def list_dir(self, dir):
+        files = set()
+        symlinks = set()
+        try:
+            with os.scandir(dir) as entries:
+                for count, entry in enumerate(entries):
+                    if count >= MAX_LISTED_ENTRIES:
+                        self.logger.debug("too many entries to list dir: %s" % dir)
+                        return None
+                    if entry.is_symlink():
+                        symlinks.add(entry.name)
+                    elif not entry.is_dir(follow_symlinks=False):
+                        # same as the file checker, anything but a dir counts as file
+                        files.add(entry.name)
+        except OSError as e:
+            self.logger.debug("cant list dir %s: %s" % (dir, e))
+            return None
+        self.logger.debug("listed dir: %s" % dir)
+        return files, symlinks
@@ -0,0 +1,161 @@
+import fcntl
+import os
+import time
+
+from file_history.args import CACHE_NEGATIVE_TTL_ENV, CACHE_SELECT_TTL_ENV, CACHE_TTL_ENV, \
+    DEFAULT_CACHE_NEGATIVE_TTL, DEFAULT_CACHE_SELECT_TTL, DEFAULT_CACHE_TTL, NO_CACHE_ENV
+from file_history.logging_config import configure_logger
+
+CACHE_FILE_SUFFIX = ".exists-cache"
+# entries kept when the log is compacted, it is compacted once it holds twice as many records
+MAX_ENTRIES = 4096
+TOMBSTONE = "-"
+
+
+# remembers which files exist, so consecutive searches do not stat the same recent files again
+# existing files are trusted for ttl seconds, missing files for negative_ttl seconds,
+# missing files are only expected to come back if they are tracked again, which invalidates them
+# stored next to the history as an append only log of 'checked_at exists mtime path' records,
+# the most recent record of a path wins, tombstones written by the appender drop the entry
+class ExistenceCache:
+
+    def __init__(self, path, ttl=DEFAULT_CACHE_TTL, negative_ttl=DEFAULT_CACHE_NEGATIVE_TTL):
+        self.logger = configure_logger(self.__class__.__name__)
+        self.path = path
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        # path -> (exists or None for tombstones, checked_at, mtime)
+        self.entries = {}
+        # records not yet written, appended to by file check threads
+        self.new_records = []
+        self.log_records = 0
+
+    # returns whether the file exists or None if there is no fresh entry
+    # ttl: overrides the ttl of existing files for this lookup
+    def lookup(self, path, ttl=None):
+        entry = self.entries.get(path)
+        if entry is None:
+            return None
+        exists, checked_at, _ = entry
+        if exists is None:
+            return None
+        if not exists:
+            ttl = self.negative_ttl
+        elif ttl is None:
+            ttl = self.ttl
+        if time.time() - checked_at >= ttl:
+            return None
+        return exists
+
+    def store(self, path, exists, mtime):
+        record = (path, exists, time.time(), mtime)
+        self.entries[path] = record[1:]
+        self.new_records.append(record)
+
+    # drops the entries of the paths in memory, the next lookup checks them on disk
+    def forget(self, paths):
+        for path in paths:
+            self.entries.pop(path, None)
+
+    @staticmethod
+    def format_record(path, exists, checked_at, mtime):
+        exists = TOMBSTONE if exists is None else "1" if exists else "0"
+        mtime = TOMBSTONE if mtime is None else "%.6f" % mtime
+        return "%.6f\t%s\t%s\t%s\n" % (checked_at, exists, mtime, path)
+
+    @staticmethod
+    def parse_record(line):
+        checked_at, exists, mtime, path = line.rstrip('\n').split('\t', 3)
+        exists = None if exists == TOMBSTONE else exists == "1"
+        mtime = None if mtime == TOMBSTONE else float(mtime)
+        return path, exists, float(checked_at), mtime
+
+    def load(self):
+        try:
+            with open(self.path, 'r', encoding='utf-8', errors='surrogateescape') as file:
+                fcntl.flock(file, fcntl.LOCK_SH)
+                self.read_records(file)
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            self.logger.debug("ignoring unreadable existence cache %s: %s" % (self.path, e))
+
+    def read_records(self, file):
+        self.log_records = 0
+        for line in file:
+            try:
+                path, exists, checked_at, mtime = self.parse_record(line)
+            except ValueError:
+                # torn or garbled record
+                continue
+            self.log_records += 1
+            entry = self.entries.get(path)
+            if entry is None or entry[1] <= checked_at:
+                self.entries[path] = (exists, checked_at, mtime)
+
+    # appends the records of this process, compacts the log once it is too long
+    def save(self):
+        records, self.new_records = self.new_records, []
+        if not records:
+            return
+        try:
+            fd = os.open(self.path, os.O_RDWR | os.O_APPEND | os.O_CREAT, 0o666)
+            with open(fd, 'r+', encoding='utf-8', errors='surrogateescape') as file:
+                fcntl.flock(file, fcntl.LOCK_EX)
+                if self.log_records + len(records) <= 2 * MAX_ENTRIES:
+                    file.write("".join(self.format_record(*record) for record in records))
+                    self.log_records += len(records)
+                else:
+                    self.compact(file)
+        except OSError as e:
+            self.logger.debug("could not save existence cache %s: %s" % (self.path, e))
+
+    # merges with the records written by others and keeps only the most recently checked entries
+    def compact(self, file):
+        self.read_records(file)
+        entries = sorted(((checked_at, path, exists, mtime)
+                          for path, (exists, checked_at, mtime) in self.entries.items()
+                          if exists is not None), reverse=True)[:MAX_ENTRIES]
+        self.entries = {path: (exists, checked_at, mtime) for checked_at, path, exists, mtime in entries}
+        file.seek(0)
+        file.truncate()
+        file.write("".join(self.format_record(path, exists, checked_at, mtime)
+                           for checked_at, path, exists, mtime in reversed(entries)))
+        self.log_records = len(entries)
+
+    # called when files are tracked again, they may have been created since they were found missing
+    # does nothing if there is no cache yet
+    @staticmethod
+    def invalidate(cache_path, paths):
+        now = time.time()
+        data = "".join(ExistenceCache.format_record(path, None, now, None) for path in paths)
+        try:
+            fd = os.open(cache_path, os.O_WRONLY | os.O_APPEND)
+        except OSError:
+            return
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX)
+            os.write(fd, data.encode('utf-8', 'surrogateescape'))
+        finally:
+            os.close(fd)
+
+
+# cache stored next to the history file, None if disabled via flag or env var
+# select: files are listed for the user to select one, existing files are trusted only briefly then,
+# otherwise a file deleted right before the search would still be offered
+def provide_existence_cache(history_file, no_cache=False, select=False):
+    if no_cache or os.getenv(NO_CACHE_ENV):
+        return None
+    cache = ExistenceCache(history_file + CACHE_FILE_SUFFIX, provide_select_ttl() if select else provide_ttl(),
+                           float(os.getenv(CACHE_NEGATIVE_TTL_ENV, DEFAULT_CACHE_NEGATIVE_TTL)))
+    cache.load()
+    return cache
+
+
+def provide_ttl():
+    return float(os.getenv(CACHE_TTL_ENV, DEFAULT_CACHE_TTL))
+
+
+# ttl of existing files, when the user selects one of them
+def provide_select_ttl():
+    return min(provide_ttl(), float(os.getenv(CACHE_SELECT_TTL_ENV, DEFAULT_CACHE_SELECT_TTL)))
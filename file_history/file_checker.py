@@ -1,35 +1,88 @@
+import errno
 import os
+import stat
 
+from file_history.missing_dir_trie import MissingDirTrie
 
+# stat fails with these if a parent dir is not searchable, the path may well exist
+INACCESSIBLE_ERRNOS = (errno.EACCES, errno.EPERM)
+MISSING_ERRNOS = (errno.ENOENT, errno.ENOTDIR)
+
+
+# answers with a single stat per path, never opens or lists anything,
+# so fifos and devices do not block and atimes are left alone
 class FileChecker:
 
+    # existence_cache: optional ExistenceCache consulted before touching the file system
+    # missing_dirs: optional MissingDirTrie, files below a dir found missing are rejected without a syscall
+    # trust_missing: whether files the cache knows as missing are taken as missing without a stat
+    # cache_ttl: optional, seconds existing files are trusted instead of the ttl of the cache
+    def __init__(self, existence_cache=None, missing_dirs=None, trust_missing=True, cache_ttl=None):
+        self.existence_cache = existence_cache
+        self.missing_dirs = missing_dirs
+        self.trust_missing = trust_missing
+        self.cache_ttl = cache_ttl
+        # parents of missing files, that do exist
+        self.existing_dirs = set()
+
     def isfile(self, path):
-        if os.path.isfile(path):
-            return True
-        # isfile might return false if file is just inaccessible
-        # so performing another sneaky check
-        try:
-            with open(path, 'r'):
-                return True
-        except PermissionError:
-            # file exists but user can't read
-            return True
-        except FileNotFoundError:
+        if self.existence_cache is not None:
+            exists = self.existence_cache.lookup(path, self.cache_ttl)
+            if exists or (exists is not None and self.trust_missing):
+                return exists
+        if self.missing_dirs is not None and self.missing_dirs.covers(path):
             return False
+        exists, file_stat = self.stat_file(path)
+        if self.existence_cache is not None:
+            self.existence_cache.store(path, exists, None if file_stat is None else file_stat.st_mtime)
+        return exists
 
-    def isdir(self, path):
-        isdir = os.path.isdir(path)
-        if isdir:
-            return True
-        # isdir might return false if dir is just inaccessible
-        # so performing another sneaky check
+    # returns (exists, stat_result or None if missing or inaccessible), callers can reuse the stat for size,
+    # mtime or inode. anything but a dir counts as file, fifos, sockets and devices are tracked as well
+    def stat_file(self, path):
         try:
-            os.listdir(path)
-            return True
-        except PermissionError:
-            # dir exists but user cant read
-            return True
-        except FileNotFoundError:
-            return False
+            file_stat = os.stat(path)
+        except OSError as e:
+            if e.errno in MISSING_ERRNOS:
+                self.find_missing_dir(path)
+            return e.errno in INACCESSIBLE_ERRNOS, None
+        except ValueError:
+            # embedded null byte
+            return False, None
+        return not stat.S_ISDIR(file_stat.st_mode), file_stat
+
+    # climbs up from the parent of a missing file to the topmost missing dir and remembers it
+    # a file in place of a dir counts as missing dir as well
+    def find_missing_dir(self, path):
+        if self.missing_dirs is None:
+            return
+        missing_dir = None
+        dir = os.path.dirname(path)
+        while dir not in self.existing_dirs and dir != os.path.dirname(dir):
+            try:
+                if stat.S_ISDIR(os.stat(dir).st_mode):
+                    self.existing_dirs.add(dir)
+                else:
+                    missing_dir = dir
+                break
+            except OSError as e:
+                if e.errno not in MISSING_ERRNOS:
+                    break
+                missing_dir = dir
+                dir = os.path.dirname(dir)
+        if missing_dir is not None:
+            self.missing_dirs.add(missing_dir)
 
+    def forget_dirs(self):
+        if self.missing_dirs is not None:
+            self.missing_dirs = MissingDirTrie()
+        self.existing_dirs.clear()
 
+    # a dir below an unsearchable parent can't be told apart from a file, it counts as dir
+    def isdir(self, path):
+        try:
+            return stat.S_ISDIR(os.stat(path).st_mode)
+        except OSError as e:
+            return e.errno in INACCESSIBLE_ERRNOS
+        except ValueError:
+            return False
@@ -1,36 +1,53 @@
-import re
-
 from file_history.file_checker import FileChecker
+from file_history.filter_matcher import FilterMatcher
 from file_history.logging_config import configure_logger
+from file_history.search_results import SearchResults
 
 
 class FileFilter:
 
-    def __init__(self, filter):
+    def __init__(self, filter, results=None, file_checker=None, smart_case=False):
         self.logger = configure_logger(self.__class__.__name__)
-        self.files_read = []
+        self.results = SearchResults() if results is None else results
         self.filter = filter
         self.filter_active = filter is not None and filter.strip() is not None
-        self.file_checker = FileChecker()
+        self.matcher = FilterMatcher(filter, smart_case) if self.filter_active else None
+        # FilterMatchers added while searching, files must match all of them
+        self.narrowing = []
+        self.file_checker = FileChecker() if file_checker is None else file_checker
 
     def accept(self, file):
-        self.logger.debug("checking file: %s" % file)
-        if self.already_seen(file):
-            self.logger.debug("file already seen: %s" % file)
+        if not self.is_candidate(file):
+            return False
+        if not self.is_existing_file(file):
+            self.logger.debug("file is not an existing directory: %s", file)
             return False
-        self.files_read.append(file)
+        return True
+
+    # everything but the existence check, which is left to the caller
+    # files ignored by the filter are not remembered, they are ignored again anyway
+    def is_candidate(self, file):
         if self.filter_active and self.is_ignored_by_filter(file):
             return False
-        if not self.is_existing_file(file):
-            self.logger.debug("file is not an existing directory: %s" % file)
+        if not self.matches_narrowing(file):
+            return False
+        if not self.results.mark_seen(file):
+            self.logger.debug("file already seen: %s", file)
             return False
         return True
 
-    def already_seen(self, file):
-        return file in self.files_read
+    def narrow(self, matcher):
+        # replaced instead of appended to, the search thread may be iterating it
+        self.narrowing = self.narrowing + [matcher]
+
+    def matches_narrowing(self, file):
+        for matcher in self.narrowing:
+            if not matcher.matches(file):
+                return False
+        return True
 
     def is_ignored_by_filter(self, file):
-        return not re.search(self.filter, file)
+        return not self.matcher.matches(file)
 
     def is_existing_file(self, file):
         return self.file_checker.isfile(file)
@@ -1,16 +1,31 @@
+import re
 import threading
 
-from file_read_backwards import FileReadBackwards
-
+from file_history.filter_matcher import FilterMatcher
 from file_history.logging_config import configure_logger
+from file_history.reverse_line_reader import ReverseLineReader
+
+# whitespace bytes.strip() removes around a line, except the newline
+LINE_PADDING = re.compile(rb"^[ \t\r\x0b\x0c]+|[ \t\r\x0b\x0c]+$", re.MULTILINE)
 
 
 class FileHistoryReader:
 
-    def __init__(self, file, max_lines_to_read, callback):
+    # filter: optional regex, only matching lines are passed to the callback
+    # smart_case: the filter ignores case unless it contains an uppercase letter
+    # start: offset of a line start in the history, lines before it are not read
+    def __init__(self, file, max_lines_to_read, callback, filter=None, smart_case=False, start=0):
         self.file = file
+        self.start = start
         self.max_lines_to_read = max_lines_to_read
         self.callback = callback
+        self.filter = filter
+        self.smart_case = smart_case
+        # amount of lines read before the line passed to the callback
+        self.position = 0
+        # generator of (position, file), kept between reads, so a stopped reader can be resumed
+        self.found_files = None
+        self.eof = False
         self.exit_event = threading.Event()
         self.logger = configure_logger(self.__class__.__name__)
 
@@ -18,29 +33,112 @@ class FileHistoryReader:
         self.logger.debug("stopping reader")
         self.exit_event.set()
 
+    def is_stopped(self):
+        return self.exit_event.is_set()
+
+    # another read() goes on right after the last file passed to the callback
+    def resume(self):
+        self.logger.debug("resuming reader")
+        self.exit_event.clear()
+
+    def is_eof(self):
+        return self.eof
+
+    # releases the history file, must not be called while reading
+    def close(self):
+        if self.found_files is not None:
+            self.found_files.close()
+
     # finds n most recent dirs from cd_history file (end to start)
     # may return less than n dirs, if eof is reached before
     # output can be filtered
     def read(self):
-        read_lines = 0
-        with FileReadBackwards(self.file) as file:
-            while read_lines < self.max_lines_to_read or self.max_lines_to_read == -1:
-                read_lines += 1
-                if self.exit_event.is_set():
-                    self.logger.debug("exit event set")
-                    break
-                dir = file.readline()
-                if dir == "":
-                    self.logger.debug("eof")
-                    break
-                dir = dir.strip()
-                if not dir:
-                    continue
-                self.send_file_to_callback(dir)
-            file.close()
+        if self.found_files is None:
+            self.found_files = self.find_files()
+        for found in self.found_files:
+            if found is None:
+                self.logger.debug("exit event set")
+                break
+            self.position, dir = found
+            self.send_file_to_callback(dir)
+        else:
+            self.eof = True
         self.logger.debug("done reading cd history")
 
+    # yields (position, file) and None whenever the reader is stopped, iterating on resumes the reader
+    def find_files(self):
+        filter = FilterMatcher(self.filter, self.smart_case) if self.filter else None
+        with ReverseLineReader(self.file, start=self.start) as file:
+            if filter is None or filter.uses_string_anchors:
+                yield from self.read_lines(file, filter)
+            else:
+                yield from self.read_matching_lines(file, filter)
+
+    def read_lines(self, file, filter=None):
+        read_lines = 0
+        for line in file.lines():
+            if self.read_enough_lines(read_lines):
+                return
+            read_lines += 1
+            while self.exit_event.is_set():
+                yield None
+            # blank lines are skipped before decoding
+            dir = line.strip()
+            if not dir:
+                continue
+            dir = dir.decode('utf-8', 'surrogateescape')
+            if filter is not None and not filter.matches(dir):
+                continue
+            yield read_lines - 1, dir
+        self.logger.debug("eof")
+
+    # the filter is run over whole blocks, so lines that do not match never turn into python strings
+    def read_matching_lines(self, file, filter):
+        read_lines = 0
+        for block in file.blocks():
+            # lines are matched stripped, ^ and $ must not miss a line with leading or trailing whitespace
+            if filter.uses_line_anchors:
+                block = LINE_PADDING.sub(b"", block)
+            text = block.decode('utf-8', 'surrogateescape')
+            block_lines, matches = self.find_matching_lines(text, filter)
+            for line_number, dir in matches:
+                if self.read_enough_lines(read_lines + line_number):
+                    return
+                while self.exit_event.is_set():
+                    yield None
+                yield read_lines + line_number, dir
+            read_lines += block_lines
+            if self.read_enough_lines(read_lines):
+                return
+        self.logger.debug("eof")
+
+    # returns the amount of lines in text and the matching lines, most recent first,
+    # each with its number counted from the end of text
+    # a match may span lines, so each line is checked on its own again and the search goes on with the next line
+    @staticmethod
+    def find_matching_lines(text, filter):
+        matches = []
+        pos = 0
+        line_number = 0
+        while pos <= len(text):
+            match_start = filter.find(text, pos)
+            if match_start == -1:
+                break
+            line_start = max(pos, text.rfind('\n', pos, match_start) + 1)
+            line_end = text.find('\n', match_start)
+            if line_end == -1:
+                line_end = len(text)
+            line_number += text.count('\n', pos, line_start)
+            dir = text[line_start:line_end].strip()
+            if dir and filter.matches(dir):
+                matches.append((line_number, dir))
+            pos = line_end + 1
+            line_number += 1
+        block_lines = text.count('\n') + 1
+        return block_lines, [(block_lines - 1 - line_number, dir) for line_number, dir in reversed(matches)]
+
+    def read_enough_lines(self, read_lines):
+        return self.max_lines_to_read != -1 and read_lines >= self.max_lines_to_read
+
     def send_file_to_callback(self, dir):
-        self.logger.debug(f"callback dir: {dir}")
         self.callback(dir)
-
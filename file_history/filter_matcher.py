@@ -0,0 +1,66 @@
+import re
+
+REGEX_METACHARS = set(".^$*+?{}[]\\|()")
+# anchors to the start or end of the whole string, they only work on single lines
+STRING_ANCHORS = ("\\A", "\\Z")
+# anchors to the start or end of a line, single lines are matched stripped
+LINE_ANCHORS = ("^", "$")
+ESCAPE_SEQUENCE = re.compile(r"\\.")
+
+
+# classifies a filter regex once and picks the cheapest way to match it
+# a plain word is matched with str.find, alternatives of plain words like foo|bar with 'in' per line,
+# everything else with the regex, which is compiled only once
+# smart_case: ignore case unless the filter contains an uppercase letter, single lines are matched by the regex
+# ignoring case instead of lowercasing each of them, whole ascii blocks are lowercased once to find a plain word
+class FilterMatcher:
+
+    def __init__(self, filter, smart_case=False):
+        self.filter = filter
+        self.ignore_case = smart_case and not self.has_uppercase(filter)
+        self.pattern = re.compile(filter, re.MULTILINE | (re.IGNORECASE if self.ignore_case else 0))
+        self.literals = self.find_literals(filter)
+        self.uses_string_anchors = any(anchor in filter for anchor in STRING_ANCHORS)
+        self.uses_line_anchors = any(anchor in filter for anchor in LINE_ANCHORS)
+        # last block passed to find and its lowercase version
+        self.block = None
+        self.lowercase_block = None
+
+    # escapes like \D or \S are no uppercase letters
+    @staticmethod
+    def has_uppercase(filter):
+        return any(char.isupper() for char in ESCAPE_SEQUENCE.sub("", filter))
+
+    # returns the alternatives of the filter if all of them are plain words, None otherwise
+    @staticmethod
+    def find_literals(filter):
+        literals = filter.split("|")
+        if any(not literal or REGEX_METACHARS.intersection(literal) for literal in literals):
+            return None
+        return literals
+
+    def matches(self, line):
+        if self.literals is None or self.ignore_case:
+            return self.pattern.search(line) is not None
+        for literal in self.literals:
+            if literal in line:
+                return True
+        return False
+
+    # returns the index of the first match in text at or after pos or -1,
+    # the match may span lines, callers check the line it starts in with matches()
+    def find(self, text, pos=0):
+        if self.literals is not None and len(self.literals) == 1:
+            if not self.ignore_case:
+                return text.find(self.literals[0], pos)
+            # lowercasing keeps the indexes of ascii text only
+            if text.isascii():
+                return self.lowercase(text).find(self.literals[0], pos)
+        match = self.pattern.search(text, pos)
+        return -1 if match is None else match.start()
+
+    def lowercase(self, text):
+        if text is not self.block:
+            self.block = text
+            self.lowercase_block = text.lower()
+        return self.lowercase_block
@@ -0,0 +1,115 @@
+import math
+import re
+
+# fzf like scores, a matched char is worth SCORE_MATCH plus the bonus of its position
+SCORE_MATCH = 16
+PENALTY_GAP_START = 3
+PENALTY_GAP_EXTENSION = 1
+# char right after a path separator
+BONUS_SEPARATOR = 9
+# char at the start of the path or after a non word char like _ - .
+BONUS_BOUNDARY = 8
+# uppercase char after a lowercase char or digit
+BONUS_CAMEL = 7
+# a run of consecutive matches is worth at least this per char
+BONUS_CONSECUTIVE = PENALTY_GAP_START + PENALTY_GAP_EXTENSION
+BONUS_FIRST_CHAR_MULTIPLIER = 2
+# matches within the file name beat matches spread over the dirs
+BONUS_BASENAME = 2 * SCORE_MATCH
+# points lost per doubling of the amount of lines read before the file
+RECENCY_WEIGHT = 2
+
+
+# scores how well a path matches a query typed as subsequence, like cfgpars for config_parser.py
+# the query ignores case unless it contains an uppercase letter
+# the shortest window of the path containing the query is scored, preferring a window within the file name
+class FuzzyScorer:
+
+    def __init__(self, query):
+        self.query = query
+        self.ignore_case = query == query.lower()
+        self.pattern = self.create_pattern(query, self.ignore_case)
+
+    # regex finding lines that contain the query as subsequence, without backtracking:
+    # each char class stops at the first occurrence of the next char, and no class crosses line breaks
+    @staticmethod
+    def create_pattern(query, ignore_case):
+        if not query:
+            return ""
+        parts = [re.escape(query[0])]
+        for char in query[1:]:
+            parts.append("[^%s\\n]*%s" % (re.escape(char), re.escape(char)))
+        return ("(?i)" if ignore_case else "") + "".join(parts)
+
+    # returns None if the path does not contain the query, the more recent the path the higher the score
+    # position: amount of history lines read before the path
+    def score(self, path, position=0):
+        text = self.lower_per_char(path) if self.ignore_case else path
+        basename_start = path.rfind('/') + 1
+        score = self.score_from(path, text, basename_start)
+        if score is not None:
+            score += BONUS_BASENAME
+        elif basename_start > 0:
+            score = self.score_from(path, text, 0)
+        if score is None:
+            return None
+        return score - RECENCY_WEIGHT * math.log2(1 + position)
+
+    # str.lower() may turn one char into several, like İ, indices into text must stay valid for path
+    @staticmethod
+    def lower_per_char(path):
+        lowered = path.lower()
+        if len(lowered) == len(path):
+            return lowered
+        return "".join(char if len(char.lower()) != 1 else char.lower() for char in path)
+
+    def score_from(self, path, text, begin):
+        window = self.find_window(text, begin)
+        if window is None:
+            return None
+        return self.score_window(path, text, window)
+
+    # shortest window starting at or after begin that contains the query, fzf v1:
+    # the first occurrence ends the window, going back from there gives its latest start
+    def find_window(self, text, begin):
+        pos = begin - 1
+        for char in self.query:
+            pos = text.find(char, pos + 1)
+            if pos == -1:
+                return None
+        end = pos + 1
+        pos = end
+        for char in reversed(self.query):
+            pos = text.rfind(char, begin, pos)
+        return pos, end
+
+    def score_window(self, path, text, window):
+        start, end = window
+        score = 0
+        previous = -1
+        for index, char in enumerate(self.query):
+            pos = text.find(char, previous + 1 if previous != -1 else start, end)
+            bonus = self.boundary_bonus(path, pos)
+            if previous != -1:
+                if pos == previous + 1:
+                    bonus = max(bonus, BONUS_CONSECUTIVE)
+                else:
+                    score -= PENALTY_GAP_START + PENALTY_GAP_EXTENSION * (pos - previous - 2)
+            if index == 0:
+                bonus *= BONUS_FIRST_CHAR_MULTIPLIER
+            score += SCORE_MATCH + bonus
+            previous = pos
+        return score
+
+    @staticmethod
+    def boundary_bonus(path, pos):
+        if pos == 0:
+            return BONUS_BOUNDARY
+        before = path[pos - 1]
+        if before == '/':
+            return BONUS_SEPARATOR
+        if not before.isalnum():
+            return BONUS_BOUNDARY
+        if path[pos].isupper() and (before.islower() or before.isdigit()):
+            return BONUS_CAMEL
+        return 0
@@ -1,9 +1,14 @@
+import queue
 import sys
 import tkinter as tk
 from tkinter import Toplevel, simpledialog
 
 from file_history.logging_config import configure_logger
 
+# files found by the search are queued and added to the listbox by the tk main loop every DRAIN_INTERVAL_MS,
+# tk must not be touched from the search thread and inserting all files queued in a frame at once keeps it smooth
+DRAIN_INTERVAL_MS = 16
+
 
 class Gui:
     def __init__(self, parent):
@@ -12,8 +17,14 @@ class Gui:
         self.child = None
         self.listbox = None
         self.size = 20
-        self.files = []
+        # files in the listbox, the results of the search may already hold a newer ranking not drained yet
+        self.shown_files = []
         self.selected_index = 0
+        # last ranking shown, replacing it by the same one would reset the selection
+        self.shown_ranking = None
+        # (files, replaces shown files) put by the search thread, drained by the tk main loop
+        self.pending = queue.Queue()
+        self.drain_id = None
         self.file_selected_callback = None
         self.escape_callback = None
 
@@ -22,6 +33,9 @@ class Gui:
 
     def close_window(self):
         self.logger.debug("closing child window")
+        if self.drain_id is not None:
+            self.child.after_cancel(self.drain_id)
+            self.drain_id = None
         self.child.quit()
         self.child.destroy()
 
@@ -35,11 +49,11 @@ class Gui:
             print("no file selected", file=sys.stderr)
             return
         try:
-            selected_file = self.files[self.selected_index]
+            selected_file = self.shown_files[self.selected_index]
             self.logger.debug(f"Selected file: {selected_file}")
             self.file_selected_callback(selected_file)
         except IndexError as e:
-            if len(self.files) == 0:
+            if len(self.shown_files) == 0:
                 self.escape_callback()
                 return
             self.logger.error("Selected index is out of range", e)
@@ -69,18 +83,48 @@ class Gui:
         max_items = self.child.winfo_screenheight() // self.size
         self.listbox.config(height=max_items)
         self.listbox.pack()
+        self.drain_id = self.child.after(DRAIN_INTERVAL_MS, self.drain_pending)
 
-    # adds files to gui
+    # adds files to gui, called from the search thread
     def show_file(self, file):
         self.logger.debug("showing file in gui: %s" % file)
+        self.shown_ranking = None
+        self.pending.put(([file], False))
+
+    # replaces all files in the gui by the new ranking, called from the search thread
+    def show_ranking(self, files):
+        if files == self.shown_ranking:
+            return
+        self.shown_ranking = files
+        self.logger.debug("showing %d ranked files in gui" % len(files))
+        self.pending.put((files, True))
 
-        def add_file_to_gui(file):
-            self.listbox.insert("end", file)
+    # runs on the tk main loop, adds all queued files in one go and schedules the next drain
+    def drain_pending(self):
+        replace = False
+        batch = []
+        while True:
+            try:
+                files, replaces = self.pending.get_nowait()
+            except queue.Empty:
+                break
+            if replaces:
+                replace = True
+                batch = list(files)
+            else:
+                batch.extend(files)
+        was_empty = self.listbox.size() == 0
+        if replace:
+            self.listbox.delete(0, "end")
+            self.shown_files = []
+            self.selected_index = 0
+        if batch:
+            self.listbox.insert("end", *batch)
+            self.shown_files.extend(batch)
+        if replace or (was_empty and batch):
             self.listbox.select_set(0)
             self.listbox.focus_set()
-            self.files.append(file)
-        # run on main gui thread
-        self.child.after(0, add_file_to_gui(file))
+        self.drain_id = self.child.after(DRAIN_INTERVAL_MS, self.drain_pending)
 
     # on user focuses file -> update current selection index
     def on_focus_file(self, event):
@@ -47,6 +47,9 @@ class GuiApp(App):
     def show_file(self, file):
         self.ui.show_file(file)
 
+    def show_ranking(self, files, final):
+        self.ui.show_ranking(files)
+
     def on_end_search(self):
         pass
 
@@ -59,7 +62,8 @@ class GuiApp(App):
         # needs to be done here
         self.search = Search(self.options,
                              file_found_callback=self.show_file,
-                             end_search_callback=self.on_end_search)
+                             end_search_callback=self.on_end_search,
+                             ranking_callback=self.show_ranking)
         self.wait_for_start_event()
 
         if self.options.popup:
@@ -0,0 +1,55 @@
+import fcntl
+import os
+
+from file_history.logging_config import configure_logger
+
+LOCK_FILE_SUFFIX = ".lock"
+
+
+# exclusive advisory lock every writer of the history file takes
+# the lock lives in a separate <history>.lock file, because the cleaner swaps in a new history file
+# and a lock on the old inode would not exclude appenders that already opened the new one
+# if the lock file can neither be created nor opened, the history file itself is locked,
+# writers must then rewrite the history in place instead of replacing it
+# shared locks are taken by readers that must not see the history shrink, they never create the lock file
+class HistoryLock:
+
+    def __init__(self, history_file, shared=False):
+        self.logger = configure_logger(self.__class__.__name__)
+        self.history_file = history_file
+        self.lock_file = history_file + LOCK_FILE_SUFFIX
+        self.shared = shared
+        self.locks_history_file = False
+        self.fd = None
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.release()
+
+    def acquire(self):
+        self.fd = self.open_lock_file()
+        try:
+            fcntl.flock(self.fd, fcntl.LOCK_SH if self.shared else fcntl.LOCK_EX)
+        except OSError:
+            self.release()
+            raise
+
+    def release(self):
+        if self.fd is not None:
+            # closing drops the lock
+            os.close(self.fd)
+            self.fd = None
+
+    def open_lock_file(self):
+        # flock does not care whether the file was opened for reading or writing
+        for flags in [os.O_RDONLY] if self.shared else [os.O_RDWR | os.O_CREAT, os.O_RDONLY]:
+            try:
+                return os.open(self.lock_file, flags, 0o666)
+            except OSError:
+                pass
+        self.logger.debug("cannot open lock file %s, locking history file instead" % self.lock_file)
+        self.locks_history_file = True
+        return os.open(self.history_file, os.O_RDONLY)
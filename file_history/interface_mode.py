@@ -4,3 +4,4 @@ from enum import Enum
 class InterfaceMode(Enum):
     GUI = "gui"
     TERMINAL = "terminal"
+    TUI = "tui"
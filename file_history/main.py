@@ -1,32 +1,48 @@
 import sys
 
-from file_history.app_launcher import DefaultAppLauncher
-from file_history.clean.clean_app import CleanApp
 from file_history.mode import Mode
 from file_history.mode_parser import eval_mode
-from file_history.track.track_app import TrackApp
+
+
+# each mode imports only what it needs inside its start function
+# track and clean run on every bash command, so they must not pay for the ui, clipboard or argparse imports
 
 
 def start_default_app():
+    from file_history.app_launcher import DefaultAppLauncher
     launcher = DefaultAppLauncher()
     launcher.start()
 
 
 def start_track_app():
+    from file_history.track.track_app import TrackApp
     app = TrackApp()
     app.start()
 
 
 def start_clean_app():
+    from file_history.clean.clean_app import CleanApp
     app = CleanApp()
     app.start()
 
 
+def start_daemon_app():
+    from file_history.daemon.daemon_app import DaemonApp
+    app = DaemonApp()
+    app.start()
+
+
+def start_serve_app():
+    from file_history.daemon.serve_app import ServeApp
+    app = ServeApp()
+    app.start()
+
+
 def main():
     mode = eval_mode()
     if mode is None:
-        err = "unknown first arg, use either 'file-history clean', 'file-history track dir cmd' "
-        "or default mode (type 'file-history -h' for instructions for default mode)"
+        err = ("unknown first arg, use either 'file-history clean', 'file-history track dir cmd', 'file-history daemon', "
+               "'file-history serve' or default mode (type 'file-history -h' for instructions for default mode)")
         print(err, file=sys.stderr)
         exit(1)
     if mode is Mode.DEFAULT:
@@ -35,6 +51,10 @@ def main():
         start_track_app()
     elif mode is Mode.CLEAN:
         start_clean_app()
+    elif mode is Mode.DAEMON:
+        start_daemon_app()
+    elif mode is Mode.SERVE:
+        start_serve_app()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,34 @@
+# marks a node whose dir is missing, never a path component
+MISSING = ""
+
+
+# prefix trie of dirs known to be missing, so files below them can be rejected without a syscall
+# populated by FileChecker when a file check fails, one trie lives as long as a search or clean
+class MissingDirTrie:
+
+    def __init__(self):
+        self.root = {}
+
+    @staticmethod
+    def split(path):
+        return [part for part in path.split('/') if part]
+
+    def add(self, dir):
+        node = self.root
+        for part in self.split(dir):
+            if MISSING in node:
+                # an ancestor is missing already
+                return
+            node = node.setdefault(part, {})
+        node[MISSING] = True
+
+    # whether path is below a missing dir or is a missing dir itself
+    def covers(self, path):
+        node = self.root
+        for part in self.split(path):
+            node = node.get(part)
+            if node is None:
+                return False
+            if MISSING in node:
+                return True
+        return False
@@ -5,3 +5,5 @@ class Mode(Enum):
     DEFAULT = "default"
     TRACK = "track"
     CLEAN = "clean"
+    DAEMON = "daemon"
+    SERVE = "serve"
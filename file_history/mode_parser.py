@@ -13,6 +13,10 @@ def eval_mode():
         return Mode.TRACK
     if mode_arg == Mode.CLEAN.value:
         return Mode.CLEAN
+    if mode_arg == Mode.DAEMON.value:
+        return Mode.DAEMON
+    if mode_arg == Mode.SERVE.value:
+        return Mode.SERVE
     else:
         return None
 
@@ -5,7 +5,8 @@ class Options:
 
     def __init__(self, mode=None, action=None, max_results=None, filter=None,
                  editor=None, file_history=None, popup=False, max_scanned=None,
-                 debug=False
+                 debug=False, bloom=False, no_cache=False, smart_case=False, fuzzy=False,
+                 null_separated=False
                  ):
         self.mode = InterfaceMode(mode) if mode else None
         self.action = Action(action) if action else None
@@ -16,6 +17,11 @@ class Options:
         self.file_history = file_history
         self.popup = popup
         self.debug = debug
+        self.bloom = bloom
+        self.no_cache = no_cache
+        self.smart_case = smart_case
+        self.fuzzy = fuzzy
+        self.null_separated = null_separated
 
     def validate(self):
         if self.mode is None:
@@ -26,13 +32,18 @@ class Options:
             raise Exception(MISSING_FILE_HISTORY_ENV_VAR_MSG)
         if self.action == Action.EDIT and self.editor is None:
             raise Exception("Editor is required for for edit action")
+        if self.bloom and (self.action != Action.SHOW or self.mode != InterfaceMode.TERMINAL):
+            raise Exception("%s requires terminal mode and show action" % BLOOM_ARG)
+        if self.null_separated and (self.action != Action.SHOW or self.mode == InterfaceMode.GUI):
+            raise Exception("%s requires show action and no gui" % NULL_ARG)
 
     def __str__(self):
         return (f"Options(mode={self.mode}, action={self.action}, max_result_files={self.max_results}, "
                 "filter={self.filter}, "
                 f"editor={self.editor}, max_scanned_files={self.max_scanned}, "
                 f"file_history={self.file_history}, "
-                f"popup={self.popup}, debug={self.debug})")
+                f"popup={self.popup}, debug={self.debug}, bloom={self.bloom}, no_cache={self.no_cache}, "
+                f"smart_case={self.smart_case}, fuzzy={self.fuzzy}, null_separated={self.null_separated})")
 
     def __eq__(self, other):
         if not isinstance(other, Options):
@@ -17,6 +17,18 @@ class OptionsFactory:
         parser.add_argument(FILTER_ARG, type=str, help="Filter regex or 'popup' for prompting user")
         parser.add_argument(MAX_SCANNED_FILES_ARG, type=int, help="Maximum number of files to search through (file_history)")
         parser.add_argument("--debug", action="store_true", help="Enable debug logging")
+        parser.add_argument(BLOOM_ARG, action="store_true",
+                            help="Remember seen files in constant memory for long scans with --action=show, "
+                                 "about 1 in 10000 files may be skipped by mistake")
+        parser.add_argument(NO_CACHE_ARG, action="store_true",
+                            help="Check every file on disk instead of trusting recent checks")
+        parser.add_argument(SMART_CASE_ARG, action="store_true",
+                            help="Filter ignores case unless it contains an uppercase letter")
+        parser.add_argument(FUZZY_ARG, action="store_true",
+                            help="Rank files by how well they match the filter typed as subsequence, "
+                                 "like cfgpars for config_parser.py, reads the whole history")
+        parser.add_argument(NULL_ARG, NULL_LONG_ARG, dest="null_separated", action="store_true",
+                            help="Separate shown files by NUL instead of newline, for xargs -0")
         args = parser.parse_args()
 
         mode = args.mode or os.getenv(MODE_ENV, DEFAULT_MODE)
@@ -34,6 +46,11 @@ class OptionsFactory:
             file_history=os.getenv(HISTORY_FILE_ENV),
             popup=popup,
             debug=args.debug,
+            bloom=args.bloom,
+            no_cache=args.no_cache,
+            smart_case=args.smart_case,
+            fuzzy=args.fuzzy,
+            null_separated=args.null_separated,
         )
 
         return options
@@ -1,5 +1,4 @@
-import re
-
+from file_history.filter_matcher import FilterMatcher
 from file_history.logging_config import configure_logger
 
 
@@ -10,22 +9,28 @@ class Parser:
     # recent_dirs must not end with /
     # /path/to/dir is good
     # /path/to/dir/ is not
-    def __init__(self, recent_dirs, n, command_parser):
+    # dir_listing: optional DirListingCache command_parser checks files with, so the recent dirs are listed once
+    # for all commands of a find_files call, it is cleared before each call
+    def __init__(self, recent_dirs, n, command_parser, dir_listing=None):
         self.recent_dirs = recent_dirs
         self.n = n
         self.command_parser = command_parser
+        self.dir_listing = dir_listing
         self.logger = configure_logger(self.__class__.__name__)
         self.files = []
         self.cmds_seen = []
 
     def find_files(self, history_lines, callback, filter=None):
+        matcher = FilterMatcher(filter) if filter else None
+        if self.dir_listing is not None:
+            self.dir_listing.clear()
         for cmd in history_lines:
             if self.skip_cmd(cmd):
                 continue
             self.cmds_seen.append(cmd)
             files_in_cmd = self.command_parser.find_files_in_command(cmd, self.recent_dirs)
             # only add valid, unfiltered and unseen files into result set
-            filtered = self.filter_files(self.files, files_in_cmd, filter)
+            filtered = self.filter_files(self.files, files_in_cmd, matcher)
             self.process_files(filtered, callback)
 
     def skip_cmd(self, cmd):
@@ -45,14 +50,14 @@ class Parser:
         else:
             return False
 
-    def filter_files(self, already_seen, files, filter_pattern):
+    def filter_files(self, already_seen, files, matcher):
         result = []
         for file in files:
             # Don't add files twice
             if file in already_seen:
                 continue
             # apply filter
-            if filter_pattern and not re.search(filter_pattern, file):
+            if matcher is not None and not matcher.matches(file):
                 continue
             result.append(file)
         return result
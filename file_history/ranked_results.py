@@ -0,0 +1,49 @@
+import heapq
+
+from file_history.search_results import SearchResults
+
+
+# results of a fuzzy search, only the max_results best scored files are kept in a min heap,
+# so ranking n files costs O(n log k) instead of sorting all of them
+# the ui looks files up in the ranking it showed last, which is taken with publish()
+class RankedResults(SearchResults):
+
+    def __init__(self, max_results, seen=None):
+        super().__init__(seen)
+        self.max_results = max_results
+        # (score, -read order, file), the root is the worst ranked file, older ones lose ties
+        self.heap = []
+        self.changed = False
+
+    # whether a file with this score would make it into the ranking, files that won't need no existence check
+    def could_rank(self, score):
+        return len(self.heap) < self.max_results or score > self.heap[0][0]
+
+    def rank(self, file, score):
+        self.count += 1
+        entry = (score, -self.count, file)
+        if len(self.heap) < self.max_results:
+            heapq.heappush(self.heap, entry)
+        elif entry > self.heap[0]:
+            heapq.heapreplace(self.heap, entry)
+        else:
+            return
+        self.changed = True
+
+    def add(self, file):
+        # unscored files rank by the order they are found in
+        self.rank(file, 0)
+
+    def narrow(self, matcher):
+        self.heap = [entry for entry in self.heap if matcher.matches(entry[2])]
+        heapq.heapify(self.heap)
+        self.changed = True
+
+    # returns the current ranking, best first, and keeps it for lookups by index
+    def publish(self):
+        self.files = [file for _, _, file in sorted(self.heap, reverse=True)]
+        self.changed = False
+        return self.files
+
+    def __len__(self):
+        return len(self.heap)
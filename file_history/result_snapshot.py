@@ -0,0 +1,81 @@
+import hashlib
+import os
+
+from file_history.history_lock import HistoryLock
+
+# the bytes right before size must still be the same, otherwise the history was rewritten behind our back
+FINGERPRINT_SIZE = 4096
+
+
+# files found by a search and the state of the history they were found in
+# query: (filter, smart_case, max_results) of the search
+# inode, device, size, mtime: of the history when the search started, the files were found in its first size bytes
+# fingerprint: hash of the bytes right before size
+class ResultSnapshot:
+
+    def __init__(self, query, inode, device, size, mtime, fingerprint, files=()):
+        self.query = tuple(query)
+        self.inode = inode
+        self.device = device
+        self.size = size
+        self.mtime = mtime
+        self.fingerprint = fingerprint
+        self.files = list(files)
+
+    # snapshot of the current history without files, None if the history can't be read
+    # the size is taken under the lock, appenders finish their records while holding it
+    @staticmethod
+    def of_history(hist_file, query):
+        try:
+            with open(hist_file, 'rb') as file:
+                with HistoryLock(hist_file, shared=True):
+                    hist_stat = os.fstat(file.fileno())
+                fingerprint = ResultSnapshot.read_fingerprint(file, hist_stat.st_size)
+        except OSError:
+            return None
+        return ResultSnapshot(query, hist_stat.st_ino, hist_stat.st_dev, hist_stat.st_size, hist_stat.st_mtime,
+                              fingerprint)
+
+    @staticmethod
+    def read_fingerprint(file, size):
+        start = max(0, size - FINGERPRINT_SIZE)
+        file.seek(start)
+        return hashlib.blake2b(file.read(size - start), digest_size=16).hexdigest()
+
+    def with_files(self, files):
+        return ResultSnapshot(self.query, self.inode, self.device, self.size, self.mtime, self.fingerprint, files)
+
+    # whether the files are still what the query finds in the first size bytes of the history,
+    # i.e. it is the same file and it is either unchanged or only grew since
+    # history: snapshot of the current history
+    def holds_for(self, history, hist_file):
+        if self.query != history.query or self.inode != history.inode or self.device != history.device:
+            return False
+        if self.size > history.size:
+            return False
+        if self.size == history.size:
+            return self.mtime == history.mtime and self.fingerprint == history.fingerprint
+        try:
+            with open(hist_file, 'rb') as file:
+                return self.fingerprint == self.read_fingerprint(file, self.size)
+        except OSError:
+            return False
+
+    def is_unchanged(self, history):
+        return self.size == history.size and self.mtime == history.mtime
+
+    def to_dict(self):
+        return {
+            "query": list(self.query),
+            "inode": self.inode,
+            "device": self.device,
+            "size": self.size,
+            "mtime": self.mtime,
+            "fingerprint": self.fingerprint,
+            "files": self.files,
+        }
+
+    @staticmethod
+    def from_dict(data):
+        return ResultSnapshot(data["query"], data["inode"], data["device"], data["size"], data["mtime"],
+                              data["fingerprint"], data["files"])
@@ -0,0 +1,74 @@
+import fcntl
+import json
+import os
+
+from file_history.action import Action
+from file_history.args import NO_CACHE_ENV
+from file_history.logging_config import configure_logger
+from file_history.result_snapshot import ResultSnapshot
+
+SNAPSHOT_FILE_SUFFIX = ".snapshot"
+# snapshots of different queries kept, the least recently saved ones are dropped
+MAX_SNAPSHOTS = 16
+# the store is read on every search start, searches for more files than a screen shows are not snapshotted
+MAX_SNAPSHOT_FILES = 100
+
+
+# keeps the ResultSnapshots of the last searches next to the history, one per query
+# stored as a json list, most recently saved first
+class ResultSnapshotStore:
+
+    def __init__(self, path):
+        self.logger = configure_logger(self.__class__.__name__)
+        self.path = path
+
+    # returns None if there is no snapshot for the query
+    def find(self, query):
+        try:
+            with open(self.path, 'rb') as file:
+                fcntl.flock(file, fcntl.LOCK_SH)
+                snapshots = self.read_snapshots(file)
+        except FileNotFoundError:
+            return None
+        except OSError as e:
+            self.logger.debug("ignoring unreadable snapshots %s: %s" % (self.path, e))
+            return None
+        for snapshot in snapshots:
+            if snapshot.query == tuple(query):
+                return snapshot
+        return None
+
+    def read_snapshots(self, file):
+        try:
+            return [ResultSnapshot.from_dict(data) for data in json.loads(file.read() or b"[]")]
+        except (ValueError, KeyError, TypeError) as e:
+            # broken snapshots only cost a search
+            self.logger.debug("ignoring broken snapshots %s: %s" % (self.path, e))
+            return []
+
+    # replaces the snapshot of the same query
+    def save(self, snapshot):
+        try:
+            fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o666)
+            with open(fd, 'r+b') as file:
+                fcntl.flock(file, fcntl.LOCK_EX)
+                snapshots = [snapshot] + [other for other in self.read_snapshots(file)
+                                          if other.query != snapshot.query]
+                file.seek(0)
+                file.truncate()
+                file.write(json.dumps([other.to_dict() for other in snapshots[:MAX_SNAPSHOTS]]).encode())
+        except OSError as e:
+            self.logger.debug("could not save snapshots %s: %s" % (self.path, e))
+
+
+# store next to the history file, None if caching is disabled via flag or env var
+# snapshots only hold for plain searches of the whole history
+# --action=show only prints the final files, showing a snapshot first gains nothing there
+def provide_result_snapshot_store(options):
+    if options.no_cache or os.getenv(NO_CACHE_ENV):
+        return None
+    if options.fuzzy or options.bloom or options.max_scanned != -1:
+        return None
+    if options.action is Action.SHOW or options.max_results > MAX_SNAPSHOT_FILES:
+        return None
+    return ResultSnapshotStore(options.file_history + SNAPSHOT_FILE_SUFFIX)
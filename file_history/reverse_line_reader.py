@@ -0,0 +1,93 @@
+import mmap
+import os
+
+from file_history.history_lock import HistoryLock
+from file_history.logging_config import configure_logger
+
+# bytes copied out of the mapping at once
+WINDOW_SIZE = 1 << 20
+
+
+# yields the lines of a file from last to first as bytes without line breaks, a trailing line break adds no line
+# the file is mapped once and walked in big windows, each window is split into lines in one go,
+# so python code runs once per line instead of once per small chunk
+# only the size at open is read, lines appended later are not seen
+# start: offset of a line start, lines before it are not read
+# windows are copied out of the mapping under a shared history lock: a cleaner rewriting the history in place
+# truncates it, touching the mapping beyond the end of the file would kill the process with SIGBUS
+class ReverseLineReader:
+
+    def __init__(self, path, window_size=WINDOW_SIZE, start=0):
+        self.logger = configure_logger(self.__class__.__name__)
+        self.path = path
+        self.window_size = window_size
+        self.start = start
+        self.lock = HistoryLock(path, shared=True)
+        self.fd = None
+        self.mapping = None
+        self.size = 0
+
+    def __enter__(self):
+        self.open()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def open(self):
+        self.fd = os.open(self.path, os.O_RDONLY)
+        self.size = os.fstat(self.fd).st_size
+        if self.size > 0:
+            self.mapping = mmap.mmap(self.fd, self.size, access=mmap.ACCESS_READ)
+
+    def close(self):
+        if self.mapping is not None:
+            self.mapping.close()
+            self.mapping = None
+        if self.fd is not None:
+            os.close(self.fd)
+            self.fd = None
+
+    # yields the file in windows from last to first, cut at line breaks, so each block holds complete lines only
+    # the line breaks the blocks are cut at and a trailing line break are dropped
+    def blocks(self):
+        end = self.size
+        # start of the line that continues in the block after the current one
+        carry = b""
+        while end > self.start:
+            start = max(self.start, end - self.window_size)
+            window = self.read_window(start, end)
+            if window is None:
+                self.logger.debug("%s shrank while reading, it was rewritten" % self.path)
+                return
+            if end == self.size and window.endswith(b'\n'):
+                window = window[:-1]
+            block = window + carry
+            end = start
+            if start > self.start:
+                cut = block.find(b'\n')
+                if cut == -1:
+                    carry = block
+                    continue
+                carry = block[:cut]
+                block = block[cut + 1:]
+            yield block
+
+    def lines(self):
+        for block in self.blocks():
+            yield from reversed(block.split(b'\n'))
+
+    # returns None if the file got shorter than the mapping
+    def read_window(self, start, end):
+        self.advise_next_window(start)
+        with self.lock:
+            if os.fstat(self.fd).st_size < self.size:
+                return None
+            return self.mapping[start:end]
+
+    # readahead only works forwards, let the kernel fetch the window before this one in the meantime
+    def advise_next_window(self, start):
+        if start <= self.start or not hasattr(os, "posix_fadvise"):
+            return
+        next_start = max(self.start, start - self.window_size)
+        os.posix_fadvise(self.fd, next_start, start - next_start, os.POSIX_FADV_WILLNEED)
@@ -1,31 +1,87 @@
+import re
 import threading
+import time
+from collections import deque
 
+from file_history.action import Action
+from file_history.batch_file_checker import provide_batch_file_checker
+from file_history.daemon.query_client import provide_query_client
 from file_history.exception_thread import ExceptionThread
+from file_history.existence_cache import provide_existence_cache
 from file_history.file_checker import FileChecker
 from file_history.file_filter import FileFilter
 from file_history.file_history_reader import FileHistoryReader
+from file_history.filter_matcher import FilterMatcher
+from file_history.fuzzy_scorer import FuzzyScorer
 from file_history.logging_config import configure_logger
+from file_history.missing_dir_trie import MissingDirTrie
+from file_history.result_snapshot import ResultSnapshot
+from file_history.result_snapshot_store import provide_result_snapshot_store
+from file_history.search_results import provide_search_results
+
+
+# reads the history from most to least recent and reports files matching the filter, that still exist
+# existence checks may run in parallel, files are still reported in the order they were read
+# a fuzzy search reads the whole history and ranks the files instead, the ranking is passed to
+# ranking_callback(files, final) while reading, at most every RANKING_INTERVAL seconds, and once it is final
+# a resumable search only pauses once enough files are found, it keeps reading if narrow() leaves too few
+# found files are saved as a snapshot, the same search on the same or a grown history shows them right away
+# and only revalidates them in the background, the snapshot is published like a ranking
+# if a query server is running, it answers the search from its index and the history is not read at all
+RANKING_INTERVAL = 0.1
 
 
 class Search:
 
-    def __init__(self, options, file_found_callback, end_search_callback):
+    def __init__(self, options, file_found_callback, end_search_callback, ranking_callback=None,
+                 resumable=False):
         self.logger = configure_logger(self.__class__.__name__)
         self.options = options
         self.search_thread = ExceptionThread(target=self.run)
         self.file_found_callback = file_found_callback
         self.end_search_callback = end_search_callback
-        self.files_read = []
+        self.ranking_callback = ranking_callback
+        self.resumable = resumable
+        # ended for good, not just paused
+        self.ended = False
+        # guards the results against narrowing while files are found
+        self.lock = threading.RLock()
+        self.results = provide_search_results(options)
         self.reader = self.create_reader()
-        self.file_checker = FileChecker()
+        self.existence_cache = provide_existence_cache(options.file_history, options.no_cache,
+                                                       select=options.action is not Action.SHOW)
+        self.file_checker = FileChecker(self.existence_cache, MissingDirTrie())
+        self.batch_checker = provide_batch_file_checker(self.file_checker)
+        # (file, score, future of existence check) in read order, only touched by the search thread
+        self.pending = deque()
         self.started = False
         self.filter = None
+        self.scorer = None
+        self.ranking_published_at = 0.0
+        # snapshots are shown as rankings, without a ranking callback there is no way to show them
+        self.snapshots = provide_result_snapshot_store(options) if ranking_callback else None
+        # the history when the search started, saved along with the found files
+        self.history = None
+        # snapshot of an earlier search shown on start, revalidated by the search thread
+        self.snapshot = None
+        self.query_client = provide_query_client(options)
+        # files the query server found, reported by the search thread
+        self.served_files = None
 
     def create_reader(self):
         return FileHistoryReader(self.options.file_history,
                                  self.options.max_scanned,
                                  callback=self.on_file_found)
 
+    # reads only what is after start, used to find files without the callbacks of the search
+    def create_filtered_reader(self, start=0):
+        return FileHistoryReader(self.options.file_history,
+                                 self.options.max_scanned,
+                                 callback=None,
+                                 filter=self.options.filter,
+                                 smart_case=self.options.smart_case,
+                                 start=start)
+
     def is_started(self):
         return self.started
 
@@ -41,33 +97,247 @@ class Search:
     def start(self):
         # needs to be done here bc of some timing issues
         # -> options.filter can change but this constructor needs to be called early
-        self.filter = FileFilter(self.options.filter)
+        # the reader applies the filter to whole blocks, only matching files are deduped and checked
+        if self.options.fuzzy:
+            self.scorer = FuzzyScorer(self.options.filter or "")
+            self.reader.filter = self.scorer.pattern
+        else:
+            self.reader.filter = self.options.filter
+            self.reader.smart_case = self.options.smart_case
+        self.filter = FileFilter(None, self.results, self.file_checker)
+        if self.query_client is not None:
+            self.served_files = self.query_client.query(self.options.file_history, self.options.filter,
+                                                        self.options.max_results, self.options.smart_case,
+                                                        select=self.options.action is not Action.SHOW)
+        if self.served_files is None and self.snapshots is not None:
+            self.show_snapshot()
         self.logger.debug("starting search thread")
         self.search_thread.start()
         self.started = True
 
     # this code is executed on thread starting
     def run(self):
-        self.reader.read()
+        try:
+            if self.served_files is not None:
+                self.report_served_files()
+            elif self.snapshot is not None:
+                self.revalidate_snapshot()
+            else:
+                self.resubmit_cancelled()
+                self.reader.read()
+                self.deliver(max_pending=0)
+                if self.scorer is not None:
+                    self.publish_ranking(final=True)
+                self.save_snapshot()
+        finally:
+            self.cancel_pending()
+            if self.existence_cache:
+                self.existence_cache.save()
+            if self.ended or not self.resumable:
+                self.reader.close()
         self.end_search_callback()
 
+    def query(self):
+        return self.options.filter or "", self.options.smart_case, self.options.max_results
+
+    # shows the files of the last search with the same query if they still hold for the history
+    def show_snapshot(self):
+        self.history = ResultSnapshot.of_history(self.options.file_history, self.query())
+        if self.history is None:
+            return
+        snapshot = self.snapshots.find(self.query())
+        if snapshot is None or not snapshot.holds_for(self.history, self.options.file_history):
+            return
+        self.logger.debug("showing %d files of the last search" % len(snapshot.files))
+        self.snapshot = snapshot
+        with self.lock:
+            self.results.files = list(snapshot.files)
+            self.results.count = len(snapshot.files)
+            self.ranking_callback(list(snapshot.files), False)
+
+    # the server already checked the files, a resumed search reads the history for more
+    def report_served_files(self):
+        files, self.served_files = self.served_files, None
+        self.logger.debug("query server found %d files" % len(files))
+        for file in files:
+            if self.reader.is_stopped():
+                return
+            if self.filter.is_candidate(file):
+                self.on_existing_file_found(file)
+
+    # files appended to the history since the snapshot are read and put in front of the snapshot files,
+    # files that are gone are dropped, the history is only searched again if too few files are left
+    def revalidate_snapshot(self):
+        snapshot, self.snapshot = self.snapshot, None
+        max_results = self.options.max_results
+        files = []
+        if not snapshot.is_unchanged(self.history):
+            files = self.collect_files(self.create_filtered_reader(start=snapshot.size), max_results)
+        appended = set(files)
+        kept = [file for file in snapshot.files if file not in appended]
+        files += self.check_candidates(kept)
+        # the snapshot is cut off at max_results, older files may have to take the place of the missing ones
+        if len(files) < max_results <= len(snapshot.files):
+            self.logger.debug("files of the last search are gone, searching again")
+            files = self.collect_files(self.create_filtered_reader(), max_results)
+        if self.reader.is_stopped():
+            return
+        files = files[:max_results]
+        with self.lock:
+            self.results.files = []
+            self.results.count = 0
+            # the search may have been narrowed in the meantime
+            for file in files:
+                self.results.mark_seen(file)
+                if self.filter.matches_narrowing(file):
+                    self.results.add(file)
+            self.ranking_callback(list(self.results.files), True)
+        if files != snapshot.files or not snapshot.is_unchanged(self.history):
+            self.snapshots.save(self.history.with_files(files))
+
+    # returns the first limit existing files reader finds, deduped and most recent first
+    def collect_files(self, reader, limit):
+        files = []
+        candidates = []
+        seen = set()
+        found_files = reader.find_files()
+        try:
+            for _, file in found_files:
+                if self.reader.is_stopped():
+                    return files
+                if file in seen:
+                    continue
+                seen.add(file)
+                candidates.append(file)
+                # no more checks than files still needed
+                if len(candidates) >= limit - len(files):
+                    files += self.check_candidates(candidates)
+                    candidates = []
+                    if len(files) >= limit:
+                        return files
+            return files + self.check_candidates(candidates)
+        finally:
+            found_files.close()
+
+    def check_candidates(self, candidates):
+        return [file for file, exists in zip(candidates, self.batch_checker.check_all(candidates)) if exists]
+
+    # only complete results of the query are saved, not narrowed ones or those of an ended search
+    def save_snapshot(self):
+        if self.snapshots is None or self.history is None or self.filter.narrowing:
+            return
+        if not (self.reader.is_eof() or self.read_enough_files()):
+            return
+        self.snapshots.save(self.history.with_files(self.results.files))
+
     def end(self):
+        self.ended = True
         if self.is_done():
-            # already ended
+            # already ended or paused, a paused search still holds the history file
+            self.reader.close()
             return
         self.logger.debug("ending search")
         self.reader.stop()
 
+    def pause(self):
+        self.logger.debug("enough files found, pausing search")
+        self.reader.stop()
+
+    def can_resume(self):
+        return (self.is_done() and not self.ended and not self.reader.is_eof()
+                and self.count_files_left_to_find() > 0)
+
+    def resume(self):
+        self.logger.debug("resuming search")
+        self.reader.resume()
+        self.search_thread = ExceptionThread(target=self.run)
+        self.search_thread.start()
+
+    # keeps only the found files that match filter as well, files read from now on have to match it too
+    # narrowed_callback gets the remaining files, reading resumes if a paused search has too few left
+    # files already checked are not checked again
+    # returns False if filter is no valid regex, the search is left as it is then
+    def narrow(self, filter, narrowed_callback):
+        try:
+            matcher = FilterMatcher(filter, self.options.smart_case)
+        except re.error as e:
+            self.logger.debug("invalid filter %s: %s" % (filter, e))
+            return False
+        with self.lock:
+            self.filter.narrow(matcher)
+            self.results.narrow(matcher)
+            narrowed_callback(self.results.publish() if self.scorer is not None else list(self.results.files))
+        if self.resumable and self.can_resume():
+            self.resume()
+        return True
+
     def on_file_found(self, file):
-        if not self.filter.accept(file):
+        score = None
+        if self.scorer is not None:
+            score = self.scorer.score(file, self.reader.position)
+            # files that would not make it into the ranking are neither remembered nor checked
+            if score is None or not self.results.could_rank(score):
+                return
+        if not self.filter.is_candidate(file):
             return
-        if self.read_enough_files():
-            self.end()
-        else:
+        self.pending.append((file, score, self.batch_checker.submit(file)))
+        # no more checks in flight than files still needed, so no stats are wasted once enough are found
+        self.deliver(max_pending=self.count_files_left_to_find() - 1)
+
+    # reports checked files in read order, waits for pending checks while more than max_pending are left
+    def deliver(self, max_pending):
+        while self.pending and not self.reader.is_stopped():
+            file, score, exists = self.pending[0]
+            if len(self.pending) <= max_pending and not exists.done():
+                return
+            self.pending.popleft()
+            # the search may have been narrowed since the file was read
+            if exists.result() and self.filter.matches_narrowing(file):
+                self.on_existing_file_found(file, score)
+                max_pending = min(max_pending, self.count_files_left_to_find() - 1)
+
+    def on_existing_file_found(self, file, score=None):
+        with self.lock:
+            if self.scorer is not None:
+                self.results.rank(file, score)
+                self.publish_ranking()
+                return
+            # ui may look up the file by index as soon as it is shown
+            self.results.add(file)
             self.file_found_callback(file)
-        self.files_read.append(file)
+        if self.read_enough_files():
+            if self.resumable:
+                self.pause()
+            else:
+                self.end()
 
-    def read_enough_files(self):
-        files_left_to_find = self.options.max_results - len(self.files_read)
-        return files_left_to_find <= 0
+    # files read but not delivered stay pending, a resumed search checks them again if their check was cancelled
+    def cancel_pending(self):
+        for _, _, exists in self.pending:
+            exists.cancel()
+        self.batch_checker.shutdown()
+
+    def resubmit_cancelled(self):
+        self.pending = deque((file, score, self.batch_checker.submit(file) if exists.cancelled() else exists)
+                             for file, score, exists in self.pending
+                             if self.filter.matches_narrowing(file))
 
+    # provisional rankings are only published if they changed and the last one is old enough
+    def publish_ranking(self, final=False):
+        now = time.monotonic()
+        if not final and (not self.results.changed or now - self.ranking_published_at < RANKING_INTERVAL):
+            return
+        self.ranking_published_at = now
+        with self.lock:
+            files = self.results.publish()
+            if self.ranking_callback:
+                self.ranking_callback(files, final)
+
+    def count_files_left_to_find(self):
+        if self.scorer is not None:
+            # better scored files may still come, the whole history is read
+            return self.options.max_results
+        return self.options.max_results - len(self.results)
+
+    def read_enough_files(self):
+        return self.count_files_left_to_find() <= 0
@@ -0,0 +1,45 @@
+from file_history.bloom_filter import BloomFilter
+
+
+# files seen and found during one search, shared by Search, FileFilter and the ui
+# found files are the same string objects as in the seen set, so every path is stored once
+class SearchResults:
+
+    def __init__(self, seen=None, keep_files=True):
+        self.seen = set() if seen is None else seen
+        self.keep_files = keep_files
+        self.files = []
+        self.count = 0
+
+    # returns False if the file was seen before, hashes the file only once
+    def mark_seen(self, file):
+        seen_before = len(self.seen)
+        self.seen.add(file)
+        return len(self.seen) != seen_before
+
+    def add(self, file):
+        self.count += 1
+        if self.keep_files:
+            self.files.append(file)
+
+    # keeps the found files matching the FilterMatcher
+    def narrow(self, matcher):
+        self.files = [file for file in self.files if matcher.matches(file)]
+        self.count = len(self.files)
+
+    def get(self, index):
+        return self.files[index]
+
+    def __len__(self):
+        return self.count
+
+
+def provide_search_results(options):
+    # imported here, the ranked results build on this module
+    from file_history.ranked_results import RankedResults
+    if options.fuzzy:
+        return RankedResults(options.max_results, seen=BloomFilter() if options.bloom else None)
+    if options.bloom:
+        # constant memory for unlimited scans, printed files are never selected, so they need not be kept
+        return SearchResults(seen=BloomFilter(), keep_files=False)
+    return SearchResults()
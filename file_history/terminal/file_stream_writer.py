@@ -0,0 +1,114 @@
+import os
+import threading
+import time
+
+from file_history.args import DEFAULT_FLUSH_INTERVAL, DEFAULT_FLUSH_SIZE, FLUSH_INTERVAL_ENV, FLUSH_SIZE_ENV
+from file_history.logging_config import configure_logger
+
+
+# writes the files of --action=show to a stream in large chunks instead of one write per file
+# buffered files are written once flush_size characters are buffered or the oldest one waited flush_interval seconds,
+# a flusher thread takes care of the latter, so files of a slow search still show up in a pipe right away
+# once the reading end of the pipe is gone (| head), broken_pipe_callback is called and all further files are dropped
+class FileStreamWriter:
+
+    def __init__(self, stream, separator="\n", flush_size=DEFAULT_FLUSH_SIZE, flush_interval=DEFAULT_FLUSH_INTERVAL,
+                 broken_pipe_callback=None):
+        self.logger = configure_logger(self.__class__.__name__)
+        self.stream = stream
+        # sys.stdout is written to as bytes, files that are no valid utf-8 are written as they are in the history
+        self.binary_stream = getattr(stream, "buffer", None)
+        self.separator = separator
+        self.flush_size = flush_size
+        self.flush_interval = flush_interval
+        self.broken_pipe_callback = broken_pipe_callback
+        # guards the buffer and the stream, notified once the buffer is no longer empty or the writer is closed
+        self.condition = threading.Condition()
+        self.buffered = []
+        self.buffered_size = 0
+        self.first_buffered_at = 0.0
+        self.broken = False
+        self.closed = False
+        self.flusher_thread = threading.Thread(target=self.run_flusher, daemon=True)
+        self.flusher_thread.start()
+
+    # returns False once nobody reads the files anymore
+    def write_file(self, file):
+        with self.condition:
+            if self.broken or self.closed:
+                return False
+            if not self.buffered:
+                self.first_buffered_at = time.monotonic()
+                self.condition.notify()
+            self.buffered.append(file)
+            self.buffered.append(self.separator)
+            self.buffered_size += len(file) + len(self.separator)
+            if self.buffered_size >= self.flush_size or self.flush_interval <= 0:
+                self.flush_buffered()
+            return not self.broken
+
+    def flush(self):
+        with self.condition:
+            self.flush_buffered()
+
+    # writes what is left and stops the flusher thread
+    def close(self):
+        with self.condition:
+            self.flush_buffered()
+            self.closed = True
+            self.condition.notify()
+        self.flusher_thread.join()
+
+    def run_flusher(self):
+        with self.condition:
+            while not self.closed and not self.broken:
+                if not self.buffered:
+                    self.condition.wait()
+                    continue
+                remaining = self.first_buffered_at + self.flush_interval - time.monotonic()
+                if remaining > 0:
+                    self.condition.wait(remaining)
+                    continue
+                self.flush_buffered()
+
+    # must hold the condition
+    def flush_buffered(self):
+        if not self.buffered or self.broken:
+            return
+        text = "".join(self.buffered)
+        self.buffered = []
+        self.buffered_size = 0
+        try:
+            if self.binary_stream is not None:
+                self.binary_stream.write(text.encode('utf-8', 'surrogateescape'))
+                self.binary_stream.flush()
+            else:
+                self.stream.write(text)
+                self.stream.flush()
+        except BrokenPipeError:
+            self.on_broken_pipe()
+
+    def on_broken_pipe(self):
+        self.logger.debug("reader of the files is gone, stop writing")
+        self.broken = True
+        self.silence_stream()
+        if self.broken_pipe_callback:
+            self.broken_pipe_callback()
+
+    # python flushes stdout on exit and would complain about the broken pipe again
+    def silence_stream(self):
+        try:
+            devnull = os.open(os.devnull, os.O_WRONLY)
+            os.dup2(devnull, self.stream.fileno())
+            os.close(devnull)
+        except (OSError, ValueError, AttributeError):
+            # no real file behind the stream
+            pass
+
+
+def provide_file_stream_writer(stream, null_separated=False, broken_pipe_callback=None):
+    return FileStreamWriter(stream,
+                            separator="\0" if null_separated else "\n",
+                            flush_size=int(os.getenv(FLUSH_SIZE_ENV, DEFAULT_FLUSH_SIZE)),
+                            flush_interval=float(os.getenv(FLUSH_INTERVAL_ENV, DEFAULT_FLUSH_INTERVAL)),
+                            broken_pipe_callback=broken_pipe_callback)
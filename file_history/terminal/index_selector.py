@@ -1,4 +1,5 @@
-import select
+import os
+import selectors
 import sys
 import threading
 
@@ -7,32 +8,37 @@ from file_history.logging_config import configure_logger
 
 
 # non blocking
+# input that is no number narrows the shown files down to the ones matching it, if a narrow callback is given
+# waits for stdin and a self pipe at once, stop_selection writes to the pipe, so neither input nor stopping is polled
 class TerminalIndexSelector:
     def __init__(self):
         self.logger = configure_logger(self.__class__.__name__)
         self.select_index_callback = None
         self.cancel_callback = None
+        self.narrow_callback = None
         self.stop_event = threading.Event()
         self.selection_thread = ExceptionThread(target=self.run)
+        # guards the self pipe against being written to while it is closed
+        self.wakeup_lock = threading.Lock()
+        self.wakeup_read_fd = None
+        self.wakeup_write_fd = None
 
     def run(self):
-        user_input = None
         try:
-            while not self.stop_event.is_set():
-
-                if self.stop_event.wait(timeout=0.1):
-                    return
-
-                # using select here, so I can still terminate the thread via stop event, otherwise its blocking call
-                # and setting the stop event won't shut it down
-                if sys.stdin.readable() and select.select([sys.stdin], [], [], 0.1)[0]:
-                    user_input = input()
-                    break
-
-            if self.stop_event.is_set():
-                self.logger.debug("stop event set")
-                return
+            self.select_index()
+        finally:
+            self.close_wakeup_pipe()
 
+    def select_index(self):
+        user_input = self.read_input()
+        while self.narrow_callback and user_input and not user_input.strip().isdigit():
+            self.logger.debug("narrowing to: %s" % user_input)
+            self.narrow_callback(user_input.strip())
+            user_input = self.read_input()
+        if user_input is None:
+            self.logger.debug("stop event set")
+            return
+        try:
             # Give user option to stop search by pressing enter
             if user_input == "":
                 self.cancel_callback()
@@ -55,13 +61,41 @@ class TerminalIndexSelector:
         self.logger.debug("selected index: %d" % index)
         self.select_index_callback(index)
 
+    # returns None once the stop event is set
+    # input() alone would block until enter is pressed and setting the stop event would not shut the thread down
+    def read_input(self):
+        if self.stop_event.is_set():
+            return None
+        with selectors.DefaultSelector() as selector:
+            selector.register(sys.stdin, selectors.EVENT_READ)
+            selector.register(self.wakeup_read_fd, selectors.EVENT_READ)
+            ready = [key.fileobj for key, _ in selector.select()]
+        if self.wakeup_read_fd in ready or self.stop_event.is_set():
+            return None
+        user_input = input()
+        if self.stop_event.is_set():
+            return None
+        return user_input
+
     def join(self):
         self.selection_thread.join()
 
-    def start_selection(self, cancel_callback, select_index_callback):
+    def start_selection(self, cancel_callback, select_index_callback, narrow_callback=None):
         self.cancel_callback = cancel_callback
         self.select_index_callback = select_index_callback
+        self.narrow_callback = narrow_callback
+        self.wakeup_read_fd, self.wakeup_write_fd = os.pipe()
         self.selection_thread.start()
 
     def stop_selection(self):
         self.stop_event.set()
+        with self.wakeup_lock:
+            if self.wakeup_write_fd is not None:
+                os.write(self.wakeup_write_fd, b"\0")
+
+    def close_wakeup_pipe(self):
+        with self.wakeup_lock:
+            os.close(self.wakeup_read_fd)
+            os.close(self.wakeup_write_fd)
+            self.wakeup_read_fd = None
+            self.wakeup_write_fd = None
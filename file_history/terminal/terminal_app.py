@@ -4,6 +4,7 @@ from file_history.app import App
 from file_history.error_msgs import *
 from file_history.logging_config import configure_logger
 from file_history.search import Search
+from file_history.terminal.file_stream_writer import provide_file_stream_writer
 from file_history.terminal.terminal_popup import TerminalPopup
 from file_history.terminal.terminal_userinput_handler import TerminalUserInputHandler
 from file_history.terminal.terminal_ui import TerminalUi
@@ -14,6 +15,7 @@ class TerminalApp(App):
     def __init__(self, options, delay_start=False):
         super().__init__(options, delay_start=delay_start)
         self.logger = configure_logger(self.__class__.__name__)
+        self.file_writer = None
         self.ui = self.create_ui()
         self.popup = TerminalPopup(self.ui, options)
         self.user_input_handler = TerminalUserInputHandler(self, options)
@@ -22,7 +24,10 @@ class TerminalApp(App):
         if self.options.action == Action.SHOW:
             # files need to be printed to stdout and without numbers to allow interprocess communication like:
             # file-history --action=show | grep foo
-            return TerminalUi(print_file_stream=sys.stdout, print_numbers=False)
+            # once the other program stops reading, like head does, the search is ended right away
+            self.file_writer = provide_file_stream_writer(sys.stdout, self.options.null_separated,
+                                                          broken_pipe_callback=self.close_program)
+            return TerminalUi(print_file_stream=sys.stdout, print_numbers=False, file_writer=self.file_writer)
         else:
             # print result files to stderr
             # set stream explicitly here and not using defaults, bc streams are replaced with buffers in my tests
@@ -41,16 +46,30 @@ class TerminalApp(App):
     def show_file(self, file):
         self.ui.show_file(file)
 
+    def show_ranking(self, files, final):
+        self.ui.show_ranking(files, final)
+
     def let_user_select_file(self):
         # blocking call
         self.ui.select_file(
             cancel_callback=self.user_input_handler.on_cancel_terminal_input,
-            select_file_callback=self.user_input_handler.on_file_selected
+            select_file_callback=self.user_input_handler.on_file_selected,
+            narrow_callback=self.narrow
         )
 
+    # narrows the files found so far down instead of searching again, the search resumes if too few are left
+    # an invalid regex keeps the files shown, the user can type another filter
+    def narrow(self, filter):
+        if not self.search.narrow(filter, lambda files: self.ui.show_narrowed(filter, files)):
+            print("invalid filter: %s" % filter, file=sys.stderr)
+
     def on_end_search(self):
+        if self.options.action is Action.SHOW:
+            # nothing to select, waiting for the selection to start would never return
+            return
         # quit_by_user should not be true if he just stopped the search
-        if self.user_quit or len(self.search.files_read) == 0:
+        # narrowing down to no files does not quit, the resumed search may still find some
+        if self.user_quit or (len(self.search.results) == 0 and not self.search.filter.narrowing):
             # wait here to prevent race condition, that ends up with forever open stdin
             self.ui.wait_until_selection_started()
             self.ui.stop_selection()
@@ -60,7 +79,11 @@ class TerminalApp(App):
         # needs to be done here
         self.search = Search(self.options,
                              file_found_callback=self.show_file,
-                             end_search_callback=self.on_end_search)
+                             end_search_callback=self.on_end_search,
+                             ranking_callback=self.show_ranking,
+                             # files can be narrowed down while selecting
+                             resumable=self.options.action is not Action.SHOW)
+        self.ui.results = self.search.results
         self.wait_for_start_event()
 
         if self.options.popup:
@@ -72,3 +95,5 @@ class TerminalApp(App):
             # wait for input
             self.let_user_select_file()
         self.search.join()
+        if self.file_writer:
+            self.file_writer.close()
@@ -1,8 +1,12 @@
+import math
+import os
 import sys
+import threading
 import time
 
 from file_history.logging_config import configure_logger
 from file_history.terminal.index_selector import TerminalIndexSelector
+from file_history.utils import display_width
 
 
 class TerminalUi:
@@ -10,15 +14,26 @@ class TerminalUi:
     """
     :parameter print_file_stream stream to print file output to (example: 1: /my/file)
                can either be sys.stderr or sys.stdout
+    :parameter file_writer optional FileStreamWriter, files are written through it instead of printed
     """
-    def __init__(self, print_file_stream, print_numbers):
+    def __init__(self, print_file_stream, print_numbers, file_writer=None):
         self.logger = configure_logger(self.__class__.__name__)
-        self.files = []
+        # shared with the search, set once it is created
+        self.results = None
         self.current_index = 1
         self.print_files_stream = print_file_stream
         self.print_numbers = print_numbers
+        self.file_writer = file_writer
         self.terminal_content_reset = False
         self.index_selector = None
+        self.selection_started = threading.Event()
+        # last ranking printed, printing the same ranking again would only flicker
+        self.shown_ranking = None
+        # printed above the files after narrowing, printed again with each new ranking
+        self.header = None
+        # terminal rows taken by the header and the files printed below it, long files wrap over several rows,
+        # a new ranking moves the cursor up by these rows to print over them
+        self.printed_rows = 0
 
     def ask_user_for_string(self, msg):
         self.logger.debug(msg)
@@ -34,10 +49,32 @@ class TerminalUi:
 
     def print_file(self, file):
         to_print = self.get_print_string(file)
-        self.logger.debug(to_print)
-        print(to_print, file=self.print_files_stream)
+        if self.file_writer:
+            self.file_writer.write_file(to_print)
+        else:
+            self.print_line(to_print)
         self.current_index += 1
 
+    def print_line(self, line):
+        print(line, file=self.print_files_stream)
+        self.printed_rows += self.count_rows(line)
+
+    def is_terminal(self):
+        try:
+            return self.print_files_stream.isatty()
+        except (ValueError, AttributeError):
+            return False
+
+    # rows line takes in the terminal, 1 if the stream is no terminal
+    def count_rows(self, line):
+        try:
+            width = os.get_terminal_size(self.print_files_stream.fileno()).columns
+        except (OSError, ValueError, AttributeError):
+            return 1
+        if width <= 0:
+            return 1
+        return max(1, math.ceil(display_width(line) / width))
+
     def get_print_string(self, file):
         if self.print_numbers:
             return "%d: %s" % (self.current_index, file)
@@ -50,23 +87,57 @@ class TerminalUi:
             self.terminal_content_reset = True
 
     def show_file(self, file):
-        self.logger.debug("showing file in terminal: " + file)
-        self.files.append(file)
+        self.shown_ranking = None
         self.print_file(file)
 
+    # replaces the files printed so far by the new ranking
+    # printed files can't be taken back from a pipe, so without numbers only the final ranking is printed
+    # without a terminal the cursor can't be moved either, the final ranking is printed below the files then
+    def show_ranking(self, files, final):
+        if not self.print_numbers and not final:
+            return
+        is_terminal = self.is_terminal()
+        if not is_terminal and not final:
+            return
+        if files == self.shown_ranking:
+            return
+        self.shown_ranking = files
+        if self.printed_rows > 0 and is_terminal:
+            # cursor up to the header or the first printed file and clear everything below
+            print("\033[%dA\033[J" % self.printed_rows, end="", file=self.print_files_stream)
+        self.printed_rows = 0
+        self.current_index = 1
+        if self.header is not None:
+            self.print_line(self.header)
+        for file in files:
+            self.print_file(file)
+
+    # prints the files left after narrowing, files found later are numbered on from there
+    # the input line typed above stays, so the rows are counted from the header on
+    def show_narrowed(self, filter, files):
+        self.header = "files matching %s:" % filter
+        self.printed_rows = 0
+        self.print_line(self.header)
+        self.shown_ranking = None
+        self.current_index = 1
+        for file in files:
+            self.print_file(file)
+
     def wait_until_selection_started(self):
-        while self.index_selector is None:
-            time.sleep(0.05)
+        self.selection_started.wait()
 
     # blocking call that can be interrupted via stop_selection from diff thread
-    def select_file(self, cancel_callback, select_file_callback):
+    # narrow_callback: optional, gets input that is no number
+    def select_file(self, cancel_callback, select_file_callback, narrow_callback=None):
         # if old selector is running, stop
         if self.index_selector:
             self.index_selector.stop_selection()
 
         def on_select_index(index):
             try:
-                file = self.files[index - 1]
+                if index < 1:
+                    raise IndexError(index)
+                file = self.results.get(index - 1)
                 select_file_callback(file)
             except IndexError as e:
                 print("wrong input", file=sys.stderr)
@@ -75,8 +146,10 @@ class TerminalUi:
         self.reset_terminal_content()
         # need to instantiate here to allow for second call of this method
         self.index_selector = TerminalIndexSelector()
-        self.index_selector.start_selection(cancel_callback, on_select_index)
+        self.index_selector.start_selection(cancel_callback, on_select_index, narrow_callback)
+        self.selection_started.set()
         self.index_selector.join()
 
     def stop_selection(self):
         self.index_selector.stop_selection()
+
@@ -1,5 +1,7 @@
 import os
 
+from file_history.existence_cache import CACHE_FILE_SUFFIX, ExistenceCache
+from file_history.history_lock import HistoryLock
 from file_history.logging_config import configure_logger
 
 
@@ -10,30 +12,42 @@ class FileHistoryAppender:
         self.history_file = history_file
 
     def append(self, line):
-        self.logger.debug("adding line to file_history file: %s" % line)
-        with open(self.history_file, 'a') as file:
-            file.write(self.adjust_newlines(line))
-
-    def is_file_empty(self):
-        return os.stat(self.history_file).st_size == 0
-
-    def file_ends_with_newline(self):
-        with open(self.history_file, 'rb') as file:
-            file.seek(-1, 2)  # Move the cursor to the last byte in the file
-            last_char = file.read(1)
-            return last_char == b'\n'
+        self.append_all([line])
+
+    # appends all files found in one command with a single write
+    # the history is opened under the lock, so appends never land in a file the cleaner is about to replace
+    def append_all(self, lines):
+        lines = [line.strip() for line in lines if line.strip()]
+        if not lines:
+            return
+        self.logger.debug("adding lines to file_history file: %s" % lines)
+        payload = ('\n'.join(lines) + '\n').encode('utf-8', 'surrogateescape')
+        with HistoryLock(self.history_file):
+            fd = os.open(self.history_file, os.O_RDWR | os.O_APPEND | os.O_CREAT, 0o666)
+            try:
+                if self.has_torn_last_record(fd):
+                    payload = b'\n' + payload
+                self.write(fd, payload)
+            finally:
+                os.close(fd)
+        # files may have been created since a search found them missing
+        # costs an open, flock and write per tracked command once there is a cache, all files of a command
+        # share one write, the track daemon pays it in its process instead of the shell's
+        ExistenceCache.invalidate(self.history_file + CACHE_FILE_SUFFIX, lines)
 
     # make sure file ends with newline, otherwise prepend newline
     # avoids /my/path/my/path2
     # instead:
     # /my/path
     # /my/path2
-    def needs_prepending_newline(self):
-        return not self.is_file_empty() and not self.file_ends_with_newline()
-
-    def adjust_newlines(self, dir):
-        # make sure ends with new line
-        dir_line = dir.strip() + '\n'
-        if self.needs_prepending_newline():
-            dir_line = '\n' + dir_line
-        return dir_line
+    def has_torn_last_record(self, fd):
+        size = os.fstat(fd).st_size
+        if size == 0:
+            return False
+        return os.pread(fd, 1, size - 1) != b'\n'
+
+    def write(self, fd, payload):
+        written = os.write(fd, payload)
+        # regular files are written in one go, unless the disk is full or a signal interrupts the write
+        while written < len(payload):
+            written += os.write(fd, payload[written:])
@@ -1,13 +1,11 @@
 import sys
 
 from file_history.args import HISTORY_FILE_ENV
-from file_history.command_parser import CommandParser
+from file_history.daemon.track_client import TrackClient
+from file_history.daemon.track_protocol import resolve_track_socket_path
 from file_history.dir_sanitizer import sanitize_dir
 from file_history.env_var_file_validator import read_env_var
-from file_history.file_checker import FileChecker
-from file_history.file_history_manager import FileHistoryManager
 from file_history.logging_config import configure_logger
-from file_history.track.file_history_appender import FileHistoryAppender
 
 USAGE_STRING = "usage: file-history track dir cmd"
 
@@ -33,21 +31,44 @@ class TrackApp:
         exit(code)
 
     def get_file_history(self):
+        from file_history.file_history_manager import FileHistoryManager
         path = read_env_var(HISTORY_FILE_ENV)
         FileHistoryManager(path).create_if_missing()
         return path
 
+    # let running track daemon do the work, returns False if there is none
+    def send_to_daemon(self, curr_dir, cmd):
+        history_file = read_env_var(HISTORY_FILE_ENV)
+        client = TrackClient(resolve_track_socket_path())
+        return client.send(history_file, curr_dir, cmd)
+
+    # analysis code is only imported if there is no daemon doing the work
+    def track(self, curr_dir, cmd):
+        from file_history.caching_command_parser import CachingCommandParser
+        from file_history.command_cache import provide_command_cache
+        from file_history.command_parser import CommandParser
+        from file_history.dir_listing_cache import DirListingCache
+        from file_history.file_checker import FileChecker
+        from file_history.track.file_history_appender import FileHistoryAppender
+        history_file = self.get_file_history()
+        cmd_parser = CommandParser(DirListingCache(FileChecker()))
+        command_cache = provide_command_cache(history_file)
+        if command_cache:
+            cmd_parser = CachingCommandParser(cmd_parser, command_cache)
+        files = cmd_parser.find_files_in_command(cmd, [curr_dir])
+        FileHistoryAppender(history_file).append_all(files)
+        if command_cache:
+            command_cache.save()
+
     def start(self):
         try:
             cmd = self.get_cmd_arg()
             curr_dir = self.get_dir_arg()
             curr_dir = sanitize_dir(curr_dir)
-            history_file = self.get_file_history()
-            cmd_parser = CommandParser(FileChecker())
-            files = cmd_parser.find_files_in_command(cmd, [curr_dir])
-            appender = FileHistoryAppender(history_file)
-            for file in files:
-                appender.append(file)
+            if self.send_to_daemon(curr_dir, cmd):
+                self.logger.debug("cmd handed over to track daemon")
+                return
+            self.track(curr_dir, cmd)
         except Exception as e:
             print(e)
             self.exit(1)
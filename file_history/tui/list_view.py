@@ -0,0 +1,81 @@
+import re
+
+from file_history.filter_matcher import FilterMatcher
+
+
+# the files shown by the tui: all found files, the ones matching the live filter, the cursor and the scroll position
+# files found later are only matched against the filter once, changing the filter matches all files again
+class ListView:
+
+    def __init__(self, smart_case=False):
+        self.smart_case = smart_case
+        self.files = []
+        # files matching the filter, in the order they were found
+        self.visible = []
+        self.filter = ""
+        self.matcher = None
+        # index into visible
+        self.cursor = 0
+        # index of the first visible file on screen
+        self.top = 0
+
+    def add_files(self, files):
+        self.files.extend(files)
+        self.visible.extend(file for file in files if self.matches(file))
+
+    # the cursor goes back to the first file, the files are ranked anew
+    def replace_files(self, files):
+        self.files = list(files)
+        self.refilter()
+
+    # returns False if the filter is no valid regex (yet), the files of the last valid one stay shown then
+    def set_filter(self, filter):
+        self.filter = filter
+        try:
+            self.matcher = FilterMatcher(filter, self.smart_case) if filter else None
+        except re.error:
+            return False
+        self.refilter()
+        return True
+
+    def refilter(self):
+        self.visible = [file for file in self.files if self.matches(file)]
+        self.cursor = 0
+        self.top = 0
+
+    def matches(self, file):
+        return self.matcher is None or self.matcher.matches(file)
+
+    def move(self, delta):
+        if not self.visible:
+            return
+        self.cursor = max(0, min(len(self.visible) - 1, self.cursor + delta))
+
+    def move_to_start(self):
+        self.cursor = 0
+
+    def move_to_end(self):
+        self.cursor = max(0, len(self.visible) - 1)
+
+    # returns None if no file matches the filter
+    def selected(self):
+        if not self.visible:
+            return None
+        return self.visible[self.cursor]
+
+    # returns (file, selected) for each of the height rows shown, scrolled so the cursor stays visible
+    # rows without a file are (None, False)
+    def rows(self, height):
+        if height <= 0:
+            return []
+        if self.cursor < self.top:
+            self.top = self.cursor
+        elif self.cursor >= self.top + height:
+            self.top = self.cursor - height + 1
+        rows = []
+        for index in range(self.top, self.top + height):
+            if index < len(self.visible):
+                rows.append((self.visible[index], index == self.cursor))
+            else:
+                rows.append((None, False))
+        return rows
@@ -0,0 +1,29 @@
+# writes rows of (text, attr) to a curses window, only rows that changed since the last paint are written,
+# so a new file or a moved cursor costs a few rows instead of the whole screen on slow connections
+class RowPainter:
+
+    def __init__(self, window):
+        self.window = window
+        # rows as they are on screen
+        self.painted = []
+
+    # everything is painted again on the next paint, i.e. after the window was resized
+    def invalidate(self):
+        self.painted = []
+
+    # returns the amount of rows written
+    def paint(self, rows):
+        height, width = self.window.getmaxyx()
+        rows = rows[:height]
+        written = 0
+        for y, row in enumerate(rows):
+            if y < len(self.painted) and self.painted[y] == row:
+                continue
+            text, attr = row
+            self.window.move(y, 0)
+            self.window.clrtoeol()
+            # writing the last column of the last row would scroll the window
+            self.window.addnstr(y, 0, text, max(0, width - 1), attr)
+            written += 1
+        self.painted = rows
+        return written
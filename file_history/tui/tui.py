@@ -0,0 +1,242 @@
+import curses
+import os
+import queue
+import selectors
+import signal
+import sys
+import threading
+
+from file_history.logging_config import configure_logger
+from file_history.tui.list_view import ListView
+from file_history.tui.row_painter import RowPainter
+from file_history.utils import display_width
+
+FILTER_PROMPT = "> "
+# milliseconds curses waits for the rest of an escape sequence, before a lone escape counts as escape key
+ESCAPE_DELAY_MS = 25
+CTRL_N = "\x0e"
+CTRL_P = "\x10"
+CTRL_U = "\x15"
+ESCAPE = "\x1b"
+BACKSPACES = (curses.KEY_BACKSPACE, "\x7f", "\b")
+ENTERS = (curses.KEY_ENTER, "\n", "\r")
+
+
+# full screen curses interface: a live filter line, the found files and a status line
+# the search thread queues found files and wakes up the main loop through a self pipe,
+# which waits for keys and files at once, so neither is polled
+# the screen is painted once per batch of keys and files and only changed rows are written
+class Tui:
+
+    # is_search_done: tells the status line whether the search is still reading, it may be resumed by narrowing
+    def __init__(self, smart_case=False, is_search_done=None):
+        self.logger = configure_logger(self.__class__.__name__)
+        self.view = ListView(smart_case)
+        self.is_search_done = is_search_done
+        # (files, replaces shown files) put by the search thread, drained by the main loop
+        self.pending = queue.Queue()
+        # last ranking shown, replacing it by the same one would reset the cursor
+        self.shown_ranking = None
+        self.stop_event = threading.Event()
+        # guards the self pipe against being written to while it is closed
+        self.wakeup_lock = threading.Lock()
+        self.wakeup_read_fd, self.wakeup_write_fd = os.pipe()
+        # a full pipe already holds a wake up, the search thread must not block on it
+        os.set_blocking(self.wakeup_read_fd, False)
+        os.set_blocking(self.wakeup_write_fd, False)
+        self.screen = None
+        self.painter = None
+        self.selected = None
+        self.escape_callback = None
+        self.narrow_callback = None
+        # set by the SIGWINCH handler, the main loop resizes the screen once it is woken up
+        self.resized = False
+
+    # adds a file, called from the search thread
+    def show_file(self, file):
+        self.shown_ranking = None
+        self.pending.put(([file], False))
+        self.wake_up()
+
+    # replaces all files by the new ranking, called from the search thread
+    def show_ranking(self, files):
+        if files == self.shown_ranking:
+            return
+        self.shown_ranking = files
+        self.pending.put((files, True))
+        self.wake_up()
+
+    # the status line is painted again
+    def on_search_done(self):
+        self.wake_up()
+
+    # ends select_file without a selection, can be called from any thread
+    def stop(self):
+        self.stop_event.set()
+        self.wake_up()
+
+    def wake_up(self):
+        with self.wakeup_lock:
+            if self.wakeup_write_fd is None:
+                return
+            try:
+                os.write(self.wakeup_write_fd, b"\0")
+            except BlockingIOError:
+                pass
+
+    def close_wakeup_pipe(self):
+        with self.wakeup_lock:
+            os.close(self.wakeup_read_fd)
+            os.close(self.wakeup_write_fd)
+            self.wakeup_write_fd = None
+
+    # blocking, the select callback is called once the terminal is restored, so the selected file can be edited
+    # narrow_callback: optional, gets each valid filter typed
+    def select_file(self, select_file_callback, escape_callback, narrow_callback=None):
+        self.escape_callback = escape_callback
+        self.narrow_callback = narrow_callback
+        os.environ.setdefault("ESCDELAY", str(ESCAPE_DELAY_MS))
+        try:
+            curses.wrapper(self.run)
+        finally:
+            self.close_wakeup_pipe()
+        if self.selected is not None:
+            self.logger.debug("selected file: %s" % self.selected)
+            select_file_callback(self.selected)
+
+    def run(self, screen):
+        self.screen = screen
+        self.painter = RowPainter(screen)
+        screen.nodelay(True)
+        screen.keypad(True)
+        previous_winch_handler = self.watch_resize()
+        try:
+            with selectors.DefaultSelector() as selector:
+                selector.register(sys.stdin, selectors.EVENT_READ)
+                selector.register(self.wakeup_read_fd, selectors.EVENT_READ)
+                self.drain_pending()
+                self.render()
+                while not self.stop_event.is_set():
+                    selector.select()
+                    self.drain_wakeups()
+                    if self.resized:
+                        self.resize()
+                    self.drain_pending()
+                    self.handle_keys()
+                    if self.selected is not None or self.stop_event.is_set():
+                        break
+                    self.render()
+        finally:
+            if previous_winch_handler is not None:
+                signal.signal(signal.SIGWINCH, previous_winch_handler)
+
+    # the SIGWINCH handler of curses only queues KEY_RESIZE, which is not read before stdin gets ready,
+    # so the main loop is woken up by a handler of its own, returns the replaced handler
+    # signal handlers can only be set from the main thread, elsewhere the resize waits for the next key
+    # the handler of curses is no python handler and can't be restored, the default one is restored instead
+    def watch_resize(self):
+        if threading.current_thread() is not threading.main_thread():
+            return None
+        previous_handler = signal.signal(signal.SIGWINCH, self.on_resize)
+        return signal.SIG_DFL if previous_handler is None else previous_handler
+
+    def on_resize(self, signum, frame):
+        self.resized = True
+        self.wake_up()
+
+    # curses is told the new size itself, its own SIGWINCH handler was replaced
+    def resize(self):
+        self.resized = False
+        try:
+            size = os.get_terminal_size(sys.stdout.fileno())
+        except (OSError, ValueError):
+            return
+        curses.resizeterm(size.lines, size.columns)
+        self.painter.invalidate()
+        self.screen.clear()
+
+    def drain_wakeups(self):
+        try:
+            while os.read(self.wakeup_read_fd, 4096):
+                pass
+        except BlockingIOError:
+            pass
+
+    # adds all queued files in one go
+    def drain_pending(self):
+        while True:
+            try:
+                files, replaces = self.pending.get_nowait()
+            except queue.Empty:
+                return
+            if replaces:
+                self.view.replace_files(files)
+            else:
+                self.view.add_files(files)
+
+    def handle_keys(self):
+        while self.selected is None and not self.stop_event.is_set():
+            try:
+                key = self.screen.get_wch()
+            except curses.error:
+                # no more input
+                return
+            self.handle_key(key)
+
+    def handle_key(self, key):
+        list_height = self.list_height()
+        if key in (curses.KEY_UP, CTRL_P):
+            self.view.move(-1)
+        elif key in (curses.KEY_DOWN, CTRL_N):
+            self.view.move(1)
+        elif key == curses.KEY_PPAGE:
+            self.view.move(-list_height)
+        elif key == curses.KEY_NPAGE:
+            self.view.move(list_height)
+        elif key == curses.KEY_HOME:
+            self.view.move_to_start()
+        elif key == curses.KEY_END:
+            self.view.move_to_end()
+        elif key in ENTERS:
+            self.selected = self.view.selected()
+        elif key == ESCAPE:
+            self.escape_callback()
+        elif key in BACKSPACES:
+            self.set_filter(self.view.filter[:-1])
+        elif key == CTRL_U:
+            self.set_filter("")
+        elif key == curses.KEY_RESIZE:
+            self.painter.invalidate()
+            self.screen.clear()
+        elif isinstance(key, str) and key.isprintable():
+            self.set_filter(self.view.filter + key)
+
+    def set_filter(self, filter):
+        if self.view.set_filter(filter) and self.narrow_callback:
+            self.narrow_callback(filter)
+
+    # rows between the filter and the status line
+    def list_height(self):
+        height, _ = self.screen.getmaxyx()
+        return max(0, height - 2)
+
+    def render(self):
+        rows = [(FILTER_PROMPT + displayable(self.view.filter), curses.A_BOLD)]
+        for file, selected in self.view.rows(self.list_height()):
+            text = "" if file is None else displayable(file)
+            rows.append((text, curses.A_REVERSE if selected else curses.A_NORMAL))
+        rows.append((self.status_line(), curses.A_DIM))
+        self.painter.paint(rows)
+        _, width = self.screen.getmaxyx()
+        self.screen.move(0, min(max(0, width - 1), display_width(rows[0][0])))
+        self.screen.noutrefresh()
+        curses.doupdate()
+
+    def status_line(self):
+        state = "done" if self.is_search_done is None or self.is_search_done() else "searching..."
+        return "%d/%d files, %s" % (len(self.view.visible), len(self.view.files), state)
+
+
+# files that are no valid utf-8 are read with surrogate escapes, which curses can not encode
+def displayable(text):
+    return text.encode('utf-8', 'surrogateescape').decode('utf-8', 'replace')
@@ -0,0 +1,67 @@
+from file_history.app import App
+from file_history.filter_matcher import REGEX_METACHARS
+from file_history.logging_config import configure_logger
+from file_history.search import Search
+from file_history.tui.tui import Tui
+from file_history.tui.tui_userinput_handler import TuiUserInputHandler
+
+
+class TuiApp(App):
+
+    def __init__(self, options, delay_start=False):
+        super().__init__(options, delay_start=delay_start)
+        self.logger = configure_logger(self.__class__.__name__)
+        self.ui = Tui(smart_case=options.smart_case, is_search_done=self.is_search_done)
+        self.user_input_handler = TuiUserInputHandler(self, options)
+        # last filter the search was narrowed by
+        self.narrowed_filter = ""
+
+    def user_quits_program(self):
+        self.user_quit = True
+        self.close_program()
+
+    def close_program(self):
+        super().close_program()
+        self.ui.stop()
+
+    def show_file(self, file):
+        self.ui.show_file(file)
+
+    def show_ranking(self, files, final):
+        self.ui.show_ranking(files)
+
+    # no files found does not quit, the user sees it in the status line
+    def on_end_search(self):
+        self.ui.on_search_done()
+
+    # typing on a plain word makes the filter stricter, the search resumes to find enough files matching it
+    # narrowing can not be undone, a filter not extending the one searched for only filters the files found so far
+    def narrow(self, filter):
+        if filter == self.narrowed_filter or not filter.startswith(self.narrowed_filter):
+            return
+        if not REGEX_METACHARS.isdisjoint(filter):
+            return
+        self.narrowed_filter = filter
+        self.search.narrow(filter, lambda files: None)
+
+    def run(self):
+        self.create_file_history_file_if_missing()
+        # needs to be done here
+        self.search = Search(self.options,
+                             file_found_callback=self.show_file,
+                             end_search_callback=self.on_end_search,
+                             ranking_callback=self.show_ranking,
+                             # the live filter narrows the search
+                             resumable=True)
+        self.wait_for_start_event()
+
+        if self.options.popup:
+            # the filter is typed into the live filter line instead of a popup
+            self.options.filter = None
+
+        self.search.start()
+        # blocking
+        self.ui.select_file(select_file_callback=self.user_input_handler.on_file_selected,
+                            escape_callback=self.user_input_handler.on_escape,
+                            narrow_callback=self.narrow)
+        self.search.join()
@@ -0,0 +1,18 @@
+from file_history.logging_config import configure_logger
+from file_history.user_input_handler import UserInputHandler
+
+
+class TuiUserInputHandler(UserInputHandler):
+
+    def __init__(self, app, options):
+        super().__init__(app, options)
+        self.logger = configure_logger(self.__class__.__name__)
+        self.escape_count = 0
+
+    # the first escape ends a running search, the files found so far can still be selected
+    def on_escape(self):
+        if self.app.is_search_done() or self.escape_count > 0:
+            self.app.user_quits_program()
+        else:
+            self.app.end_search()
+        self.escape_count += 1
@@ -1,3 +1,6 @@
+import unicodedata
+
+
 
 
 # give me a list like this:
@@ -25,3 +28,9 @@ def flatten_strings_list(input_element):
 
     extract_string_lists(input_element)
     return string_lists
+
+
+# columns text takes in a terminal, wide characters like CJK or emoji take two, combining characters none
+def display_width(text):
+    return sum(0 if unicodedata.combining(char) else 2 if unicodedata.east_asian_width(char) in ("W", "F") else 1
+               for char in text)
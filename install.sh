@@ -5,7 +5,7 @@ scope=$2
 
 
 print_usage() {
-    echo "usage: $0 gui|terminal local|system"
+    echo "usage: $0 gui|terminal|tui local|system"
     exit 1
 }
 
@@ -19,6 +19,9 @@ case $interface in
     terminal)
         echo "installing terminal version"
         ;;
+    tui)
+        echo "installing full screen terminal version"
+        ;;
     *)
         print_usage
         ;;
@@ -83,6 +86,27 @@ if $local_installation; then
 else
     [ ! -f "$hist_file" ] && sudo touch "$hist_file"
     sudo chmod a+rw "$hist_file"
+    # all users writing the history take a lock on this file
+    [ ! -f "$hist_file.lock" ] && sudo touch "$hist_file.lock"
+    sudo chmod a+rw "$hist_file.lock"
+    # remembers how far the history has been cleaned
+    [ ! -f "$hist_file.clean-state" ] && sudo touch "$hist_file.clean-state"
+    sudo chmod a+rw "$hist_file.clean-state"
+    # remembers when the history was cleaned last
+    [ ! -f "$hist_file.clean-stamp" ] && sudo touch "$hist_file.clean-stamp"
+    sudo chmod a+rw "$hist_file.clean-stamp"
+    # mtimes the cleaner changed the history dir to, so cached commands stay valid
+    [ ! -f "$hist_file.dir-changes" ] && sudo touch "$hist_file.dir-changes"
+    sudo chmod a+rw "$hist_file.dir-changes"
+    # remembers the files of commands tracked before, shared by all users tracking commands
+    [ ! -f "$hist_file.cmd-cache" ] && sudo touch "$hist_file.cmd-cache"
+    sudo chmod a+rw "$hist_file.cmd-cache"
+    # remembers which files exist, shared by all users searching the history
+    [ ! -f "$hist_file.exists-cache" ] && sudo touch "$hist_file.exists-cache"
+    sudo chmod a+rw "$hist_file.exists-cache"
+    # remembers the files found by the last searches
+    [ ! -f "$hist_file.snapshot" ] && sudo touch "$hist_file.snapshot"
+    sudo chmod a+rw "$hist_file.snapshot"
 fi
 
 
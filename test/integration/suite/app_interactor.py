@@ -6,6 +6,7 @@ import traceback
 from pathlib import Path
 
 from file_history.app_launcher import DefaultAppLauncher
+from file_history.gui.gui import DRAIN_INTERVAL_MS
 from test.integration.suite.file_history_reader_delay_mod import FileHistoryReaderDelayMod
 from test.integration.suite.utils import *
 from test.integration.suite.wait_util import WaitUtil
@@ -46,6 +47,7 @@ class AppInteractor:
         assertEqual(successful, self.app_successful, "apps success status did not match")
 
     def assert_files_displayed(self, expected, strict=True):
+        self.wait_until_gui_drained()
         listbox_items = self.get_displayed_items()
         if strict:
             assertEqual(len(expected), len(listbox_items), "did not display expected amount of files")
@@ -54,6 +56,7 @@ class AppInteractor:
         return listbox_items
 
     def assert_files_not_displayed(self, unexpected):
+        self.wait_until_gui_drained()
         listbox_items = self.get_displayed_items()
         for expected_file in unexpected:
             assertNotIn(expected_file, listbox_items)
@@ -140,6 +143,11 @@ class AppInteractor:
     def wait_until_n_lines_printed(self, n):
         WaitUtil.wait_until(lambda: len(self.stdout_buf.getvalue().splitlines()) >= n, f"print {n} lines")
 
+    # found files are added to the listbox by the tk main loop, some frames after they were found
+    def wait_until_gui_drained(self):
+        WaitUtil.wait_until(lambda: self.app.ui.pending.empty(), "add found files to gui")
+        time.sleep(2 * DRAIN_INTERVAL_MS / 1000)
+
     def get_displayed_items(self):
         return self.root.children['!toplevel'].children['!listbox'].get(0, tk.END)
 
@@ -148,6 +156,10 @@ class AppInteractor:
         WaitUtil.wait_until(lambda: self.app.ui is not None)
         WaitUtil.wait_until(lambda: self.app.ui.is_open())
 
+    def wait_until_selection_started(self):
+        self.wait_until_app_set()
+        WaitUtil.wait_until(lambda: self.app.ui.selection_started.is_set(), "selection start")
+
     def wait_until_search_started(self):
         self.wait_until_app_set()
         WaitUtil.wait_until(lambda: self.app.is_search_started(), "search start")
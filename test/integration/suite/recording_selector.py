@@ -0,0 +1,10 @@
+import selectors
+
+
+# records the timeouts the selector waited with, a timeout means the code under test polls
+class RecordingSelector(selectors.DefaultSelector):
+    timeouts = []
+
+    def select(self, timeout=None):
+        RecordingSelector.timeouts.append(timeout)
+        return super().select(timeout)
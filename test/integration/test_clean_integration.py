@@ -4,8 +4,9 @@ import textwrap
 import unittest
 from unittest.mock import patch
 
-from file_history.args import HISTORY_FILE_ENV, SCRIPT_NAME
+from file_history.args import CLEAN_GROWTH_PERCENT_ENV, HISTORY_FILE_ENV, SCRIPT_NAME
 from file_history.clean.clean_app import CleanApp
+from file_history.clean.clean_state import STATE_FILE_SUFFIX
 
 from test.integration.suite.utils import resolve_test_file_path
 
@@ -15,6 +16,9 @@ class TestCleanIntegration(unittest.TestCase):
     def setUp(self):
         self.file_history_path = resolve_test_file_path("file_history")
         self.default_env = os.environ.copy()
+        # every test starts with a full sweep
+        if os.path.exists(self.file_history_path + STATE_FILE_SUFFIX):
+            os.remove(self.file_history_path + STATE_FILE_SUFFIX)
 
     def tearDown(self):
         os.environ = self.default_env
@@ -317,6 +321,90 @@ class TestCleanIntegration(unittest.TestCase):
         actual_content = self.read_file_history()
         self.assertEqual(expected_content, actual_content)
 
+    def append_to_file_history(self, lines):
+        with open(self.file_history_path, 'a') as f:
+            f.write('\n'.join(lines) + '\n')
+
+    @patch('file_history.file_checker.FileChecker.isfile')
+    def test_clean_script_only_checks_appended_lines(self, mock_isfile):
+        # given
+        existing_files = [
+            self.file_history_path,
+            "/home/user/valid_file1",
+            "/home/user/valid_file2",
+            "/home/user/valid_file3",
+        ]
+        mock_isfile.side_effect = self.create_file_checker_mock(existing_files)
+        self.setup_file_history("/home/user/valid_file1\n/home/user/valid_file2\n")
+        sys.argv = [SCRIPT_NAME, "clean"]
+        CleanApp().start()
+        existing_files.remove("/home/user/valid_file1")
+        self.append_to_file_history(["/home/user/valid_file3", "/home/user/valid_file2"])
+        mock_isfile.reset_mock()
+
+        # when
+        CleanApp().start()
+
+        # then
+        expected_content = [
+            "/home/user/valid_file1",
+            "/home/user/valid_file3",
+            "/home/user/valid_file2",
+        ]
+        self.assertEqual(expected_content, self.read_file_history())
+        checked_files = [call.args[0] for call in mock_isfile.call_args_list]
+        self.assertNotIn("/home/user/valid_file1", checked_files)
+
+    @patch('file_history.file_checker.FileChecker.isfile')
+    def test_clean_script_full_sweep(self, mock_isfile):
+        # given
+        existing_files = [
+            self.file_history_path,
+            "/home/user/valid_file1",
+            "/home/user/valid_file2",
+        ]
+        mock_isfile.side_effect = self.create_file_checker_mock(existing_files)
+        self.setup_file_history("/home/user/valid_file1\n/home/user/valid_file2\n")
+        sys.argv = [SCRIPT_NAME, "clean"]
+        CleanApp().start()
+        existing_files.remove("/home/user/valid_file1")
+
+        # when
+        sys.argv = [SCRIPT_NAME, "clean", "--full"]
+        CleanApp().start()
+
+        # then
+        self.assertEqual(["/home/user/valid_file2"], self.read_file_history())
+
+
+    @patch('file_history.file_checker.FileChecker.isfile')
+    def test_scheduled_clean_waits_for_growth(self, mock_isfile):
+        # given
+        existing_files = [
+            self.file_history_path,
+            "/home/user/valid_file1",
+            "/home/user/valid_file2",
+        ]
+        mock_isfile.side_effect = self.create_file_checker_mock(existing_files)
+        self.setup_file_history("/home/user/valid_file1\n")
+        # small history grows by a large percentage with every line
+        os.environ[CLEAN_GROWTH_PERCENT_ENV] = "1000"
+        sys.argv = [SCRIPT_NAME, "clean"]
+        CleanApp().start()
+        self.append_to_file_history(["/home/user/valid_file2", "/home/user/valid_file2"])
+
+        # when
+        sys.argv = [SCRIPT_NAME, "clean", "--scheduled"]
+        CleanApp().start()
+
+        # then
+        expected_content = [
+            "/home/user/valid_file1",
+            "/home/user/valid_file2",
+            "/home/user/valid_file2",
+        ]
+        self.assertEqual(expected_content, self.read_file_history())
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,177 @@
+import os
+import stat
+import sys
+import tempfile
+import textwrap
+import threading
+import unittest
+from unittest.mock import patch
+
+from file_history.args import CMD_CACHE_SIZE_ENV, HISTORY_FILE_ENV, SCRIPT_NAME, TRACK_SOCKET_ENV
+from file_history.clean.clean_scheduler import STAMP_FILE_SUFFIX
+from file_history.daemon.track_client import TrackClient
+from file_history.daemon.track_daemon import TrackDaemon
+from file_history.track.track_app import TrackApp
+from test.integration.suite.utils import resolve_test_file_path
+from test.integration.suite.wait_util import WaitUtil
+
+
+class TestDaemonIntegration(unittest.TestCase):
+
+    def setUp(self):
+        self.file_history_path = resolve_test_file_path("file_history")
+        self.default_env = os.environ.copy()
+        # file checks are mocked, the real dir mtimes can't tell whether cached results are still valid
+        os.environ[CMD_CACHE_SIZE_ENV] = "0"
+        # every test starts as if the history was never cleaned
+        if os.path.exists(self.file_history_path + STAMP_FILE_SUFFIX):
+            os.remove(self.file_history_path + STAMP_FILE_SUFFIX)
+        self.socket_dir = tempfile.TemporaryDirectory()
+        self.socket_path = os.path.join(self.socket_dir.name, "track.sock")
+        os.environ[TRACK_SOCKET_ENV] = self.socket_path
+        self.daemon = None
+        self.daemon_thread = None
+
+    def tearDown(self):
+        if self.daemon:
+            self.daemon.stop()
+            self.daemon_thread.join()
+        self.socket_dir.cleanup()
+        os.environ = self.default_env
+
+    def create_file_checker_mock(self, existing_files):
+        def mock_isfile(path):
+            return path in existing_files
+
+        return mock_isfile
+
+    def setup_file_history(self, content):
+        path = self.file_history_path
+        with open(path, 'w') as f:
+            f.write(content)
+        os.environ[HISTORY_FILE_ENV] = path
+        return path
+
+    def read_file_history(self):
+        with open(self.file_history_path, 'r') as f:
+            return f.read().splitlines()
+
+    def start_daemon(self):
+        self.daemon = TrackDaemon(self.socket_path)
+        self.daemon_thread = threading.Thread(target=self.daemon.serve_forever)
+        self.daemon_thread.start()
+        self.daemon.ready_event.wait()
+
+    def track(self, dir, cmd):
+        sys.argv = [SCRIPT_NAME, "track", dir, cmd]
+        TrackApp().start()
+
+    @patch('file_history.file_checker.FileChecker.isfile')
+    def test_daemon_tracks_and_cleans(self, mock_isfile):
+        # given
+        file_history = textwrap.dedent("""
+        /home/user/valid_file1
+        /home/user/valid_file2
+        /home/user/deleted_file\n
+        """).strip()
+        existing_files = [
+            self.file_history_path,
+            "/home/user/valid_file1",
+            "/home/user/valid_file2",
+            "/home/user/valid_file3",
+        ]
+        mock_isfile.side_effect = self.create_file_checker_mock(existing_files)
+        self.setup_file_history(file_history)
+        self.start_daemon()
+
+        # when
+        self.track("/home/user", "cat valid_file3 valid_file1")
+
+        # then
+        expected_content = [
+            "/home/user/valid_file2",
+            "/home/user/valid_file3",
+            "/home/user/valid_file1",
+        ]
+        WaitUtil.wait_until(lambda: self.read_file_history() == expected_content, "track cmd in daemon")
+
+    @patch('file_history.track.track_app.TrackApp.track')
+    def test_track_app_hands_cmd_to_daemon(self, mock_track):
+        # given
+        self.setup_file_history("")
+        self.start_daemon()
+
+        # when
+        self.track("/home/user", "cat valid_file1")
+
+        # then
+        mock_track.assert_not_called()
+
+    @patch('file_history.file_checker.FileChecker.isfile')
+    def test_track_in_process_without_daemon(self, mock_isfile):
+        # given
+        existing_files = [
+            self.file_history_path,
+            "/home/user/valid_file1",
+        ]
+        mock_isfile.side_effect = self.create_file_checker_mock(existing_files)
+        self.setup_file_history("")
+
+        # when
+        self.track("/home/user", "cat valid_file1")
+
+        # then
+        self.assertEqual(["/home/user/valid_file1"], self.read_file_history())
+
+    def test_client_fails_on_stale_socket(self):
+        # given
+        self.start_daemon()
+        self.daemon.stop()
+        self.daemon_thread.join()
+        self.daemon = None
+        # leftover socket file nobody listens on
+        open(self.socket_path, 'w').close()
+
+        # when
+        sent = TrackClient(self.socket_path).send(self.file_history_path, "/home/user", "cat foo")
+
+        # then
+        self.assertFalse(sent)
+
+    def test_client_refuses_socket_of_other_user(self):
+        # given
+        self.start_daemon()
+
+        # when
+        with patch('os.getuid', return_value=os.getuid() + 1):
+            sent = TrackClient(self.socket_path).send(self.file_history_path, "/home/user", "cat foo")
+
+        # then
+        self.assertFalse(sent)
+
+    def test_socket_is_private_from_the_start(self):
+        # given
+        previous_umask = os.umask(0)
+        self.addCleanup(os.umask, previous_umask)
+
+        # when
+        self.start_daemon()
+
+        # then
+        self.assertEqual(0o600, stat.S_IMODE(os.lstat(self.socket_path).st_mode))
+        self.assertEqual(0, os.umask(0))
+
+    def test_second_daemon_refuses_to_start(self):
+        # given
+        self.start_daemon()
+
+        # when
+        second = TrackDaemon(self.socket_path)
+
+        # then
+        with self.assertRaises(Exception):
+            second.bind()
+
+
+if __name__ == '__main__':
+    unittest.main()
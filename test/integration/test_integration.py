@@ -10,14 +10,21 @@ from file_history.error_msgs import *
 from test.integration.suite.app_interactor import AppInteractor
 from test.integration.suite.delayed_input import DelayedInput
 from test.integration.suite.history_generator import HistoryGenerator
+from test.integration.suite.recording_selector import RecordingSelector
 from test.integration.suite.app_test_executor import TestExecutor
 from test.integration.suite.utils import *
 
+# seconds from pressing enter to the selected file being opened, only catches hangs,
+# polling is caught by the selector waiting with a timeout
+SELECTION_LATENCY_BUDGET = 2
+
 
 class IntegrationTest(unittest.TestCase):
 
     def setUp(self):
         self.default_env = os.environ.copy()
+        # a query server of the user running the tests must not answer
+        os.environ[QUERY_SOCKET_ENV] = resolve_test_file_path("query.sock")
         self.app = AppInteractor()
         self.executor = TestExecutor(self.app)
 
@@ -82,6 +89,83 @@ class IntegrationTest(unittest.TestCase):
 
         self.executor.start_test_in_process(test)
 
+    @patch('file_history.file_checker.FileChecker.isfile')
+    def test_show_null_separated_files_in_terminal(self, mock_isfile):
+        # given
+        file_history = textwrap.dedent(f"""
+            /home/user/Downloads/my file.txt
+            /home/user/Downloads/dessen.txt
+        """).strip()
+
+        history_file = self.setup_file_history(file_history)
+
+        existing_files = [
+            "/home/user/Downloads/my file.txt",
+            "/home/user/Downloads/dessen.txt",
+            history_file,
+        ]
+
+        mock_isfile.side_effect = self.create_file_checker_mock(existing_files)
+
+        cli_args = [
+            SCRIPT_NAME,
+            MODE_ARG, "terminal",
+            ACTION_ARG, "show",
+            NULL_ARG,
+        ]
+        sys.argv = cli_args
+
+        def test():
+            self.app.wait_until_app_finished()
+
+            # then
+            self.app.assert_app_finished_with_result(successful=True)
+            self.assertEqual("/home/user/Downloads/dessen.txt\0/home/user/Downloads/my file.txt\0",
+                             self.app.stdout_buf.getvalue())
+
+        self.executor.start_test_in_process(test)
+
+    @patch('file_history.file_checker.FileChecker.isfile')
+    def test_show_files_in_terminal_with_bloom_filter(self, mock_isfile):
+        # given
+        file_history = textwrap.dedent(f"""
+            /home/user/Downloads/myfile.txt
+            /home/user/Downloads/dessen.txt
+            /home/user/Downloads/myfile.txt
+            /home/user/Downloads/dessen.txt
+        """).strip()
+
+        history_file = self.setup_file_history(file_history)
+
+        existing_files = [
+            "/home/user/Downloads/myfile.txt",
+            "/home/user/Downloads/dessen.txt",
+            history_file,
+        ]
+
+        mock_isfile.side_effect = self.create_file_checker_mock(existing_files)
+
+        cli_args = [
+            SCRIPT_NAME,
+            MODE_ARG, "terminal",
+            ACTION_ARG, "show",
+            BLOOM_ARG,
+        ]
+        sys.argv = cli_args
+
+        def test():
+            self.app.wait_until_app_finished()
+
+            # then
+            expected_outputs = [
+                "/home/user/Downloads/dessen.txt",
+                "/home/user/Downloads/myfile.txt"
+            ]
+            self.app.assert_app_finished_with_result(successful=True)
+            self.app.assert_printed_to_stdout(expected_outputs)
+
+        self.executor.start_test_in_process(test)
+
     @patch('file_history.file_checker.FileChecker.isfile')
     def test_clip_selected_file_in_terminal(self, mock_isfile):
         # given
@@ -226,6 +310,135 @@ class IntegrationTest(unittest.TestCase):
 
         self.executor.start_test_in_process(test, delayed_input)
 
+    @patch('file_history.terminal.index_selector.selectors.DefaultSelector', RecordingSelector)
+    @patch('file_history.editor.Editor.open')
+    @patch('file_history.file_checker.FileChecker.isfile')
+    def test_selection_latency_in_terminal(self, mock_isfile, mock_open_editor):
+        # given
+        file_history = textwrap.dedent(f"""
+            /home/user/Downloads/myfile.txt
+            /home/user/Downloads/dessen.txt
+        """).strip()
+
+        history_file = self.setup_file_history(file_history)
+
+        existing_files = [
+            "/home/user/Downloads/myfile.txt",
+            "/home/user/Downloads/dessen.txt",
+            history_file,
+        ]
+
+        mock_isfile.side_effect = self.create_file_checker_mock(existing_files)
+        opened_at = []
+        mock_open_editor.side_effect = lambda file: opened_at.append(time.perf_counter())
+
+        cli_args = [
+            SCRIPT_NAME,
+            MODE_ARG, "terminal",
+            ACTION_ARG, "edit",
+        ]
+        sys.argv = cli_args
+
+        # Mock stdin with the input data to be piped later
+        delayed_input = DelayedInput()
+
+        def test():
+            self.app.wait_until_search_done()
+            self.app.wait_until_selection_started()
+
+            # when
+            entered_at = time.perf_counter()
+            delayed_input.release_input("1\n")
+
+            # then
+            self.app.wait_until_app_finished()
+            self.app.assert_app_finished_with_result(successful=True)
+            latency = opened_at[0] - entered_at
+            self.assertLess(latency, SELECTION_LATENCY_BUDGET)
+            self.assertTrue(RecordingSelector.timeouts)
+            self.assertEqual([None], list(set(RecordingSelector.timeouts)))
+
+        self.executor.start_test_in_process(test, delayed_input)
+
+    @patch('file_history.file_checker.FileChecker.isfile')
+    def test_show_no_files_in_terminal(self, mock_isfile):
+        # given
+        history_file = self.setup_file_history("")
+        mock_isfile.side_effect = self.create_file_checker_mock([history_file])
+
+        cli_args = [
+            SCRIPT_NAME,
+            MODE_ARG, "terminal",
+            ACTION_ARG, "show",
+        ]
+        sys.argv = cli_args
+
+        def test():
+            # then
+            self.app.wait_until_app_finished()
+            self.app.assert_app_finished_with_result(successful=True)
+            self.app.assert_nothing_printed_to_stdout()
+
+        self.executor.start_test_in_process(test)
+
+    @patch('file_history.editor.Editor.open')
+    @patch('file_history.file_checker.FileChecker.isfile')
+    def test_narrow_files_then_edit_in_terminal(self, mock_isfile, mock_open_editor):
+        # given
+        file_history = textwrap.dedent(f"""
+            /home/user/Downloads/myfile.txt
+            /home/user/.ssh/config
+            /home/user/Downloads/ssh.txt
+            /home/user/Downloads/dessen.txt
+        """).strip()
+
+        history_file = self.setup_file_history(file_history)
+
+        existing_files = [
+            "/home/user/Downloads/myfile.txt",
+            "/home/user/.ssh/config",
+            "/home/user/Downloads/ssh.txt",
+            "/home/user/Downloads/dessen.txt",
+            history_file,
+        ]
+
+        mock_isfile.side_effect = self.create_file_checker_mock(existing_files)
+
+        cli_args = [
+            SCRIPT_NAME,
+            MODE_ARG, "terminal",
+            ACTION_ARG, "edit",
+        ]
+        sys.argv = cli_args
+
+        # Mock stdin with the input data to be piped later
+        delayed_input = DelayedInput()
+
+        def test():
+            self.app.wait_until_search_done()
+
+            # when narrowing down to ssh files, then selecting the second one
+            delayed_input.release_input("ssh\n")
+            delayed_input.release_input("2\n")
+            # then
+            expected_outputs = [
+                "1: /home/user/Downloads/dessen.txt",
+                "2: /home/user/Downloads/ssh.txt",
+                "3: /home/user/.ssh/config",
+                "4: /home/user/Downloads/myfile.txt",
+                "files matching ssh:",
+                "1: /home/user/Downloads/ssh.txt",
+                "2: /home/user/.ssh/config",
+            ]
+            expected_selection = "/home/user/.ssh/config"
+            self.app.wait_until_app_finished()
+            self.app.print_stderr()
+            self.app.assert_app_finished_with_result(successful=True)
+            self.app.assert_printed_to_stderr(expected_outputs)
+            mock_open_editor.assert_called_with(expected_selection)
+
+        self.executor.start_test_in_process(test, delayed_input)
+
     @patch('file_history.editor.Editor.open')
     @patch('file_history.file_checker.FileChecker.isfile')
     def test_edit_selected_file_with_popup_filter_in_terminal(self, mock_isfile, mock_open_editor):
@@ -0,0 +1,159 @@
+import contextlib
+import io
+import os
+import signal
+import sys
+import tempfile
+import threading
+import textwrap
+import unittest
+from unittest.mock import patch
+
+from file_history.app_launcher import DefaultAppLauncher
+from file_history.args import ACTION_ARG, CACHE_SELECT_TTL_ENV, HISTORY_FILE_ENV, MODE_ARG, QUERY_SOCKET_ENV, \
+    SCRIPT_NAME
+from file_history.daemon.query_client import QueryClient
+from file_history.daemon.query_server import QueryServer
+from file_history.existence_cache import CACHE_FILE_SUFFIX
+from test.integration.suite.utils import resolve_test_file_path
+
+
+class TestServeIntegration(unittest.TestCase):
+
+    def setUp(self):
+        self.file_history_path = resolve_test_file_path("file_history")
+        self.default_env = os.environ.copy()
+        self.socket_dir = tempfile.TemporaryDirectory()
+        self.socket_path = os.path.join(self.socket_dir.name, "query.sock")
+        os.environ[QUERY_SOCKET_ENV] = self.socket_path
+        self.server = None
+        self.server_thread = None
+        self.default_sigint_handler = signal.getsignal(signal.SIGINT)
+
+    def tearDown(self):
+        if self.server:
+            self.server.stop()
+            self.server_thread.join()
+        self.socket_dir.cleanup()
+        signal.signal(signal.SIGINT, self.default_sigint_handler)
+        os.environ = self.default_env
+
+    def create_file_checker_mock(self, existing_files):
+        def mock_isfile(path):
+            return path in existing_files
+
+        return mock_isfile
+
+    def setup_file_history(self, content):
+        with open(self.file_history_path, 'w') as f:
+            f.write(content)
+        os.environ[HISTORY_FILE_ENV] = self.file_history_path
+        return self.file_history_path
+
+    def start_server(self):
+        self.server = QueryServer(self.socket_path)
+        self.server_thread = threading.Thread(target=self.server.serve_forever)
+        self.server_thread.start()
+        self.server.ready_event.wait()
+
+    def query(self, filter, max_results, select=False):
+        return QueryClient(self.socket_path).query(self.file_history_path, filter, max_results, select=select)
+
+    def remove_existence_cache(self):
+        try:
+            os.remove(self.file_history_path + CACHE_FILE_SUFFIX)
+        except FileNotFoundError:
+            pass
+
+    @patch('file_history.file_checker.FileChecker.isfile')
+    def test_server_follows_appended_files(self, mock_isfile):
+        # given
+        self.setup_file_history(textwrap.dedent("""
+        /home/user/foo1
+        /home/user/bar
+        /home/user/foo2
+        """).lstrip())
+        mock_isfile.side_effect = self.create_file_checker_mock(
+            ["/home/user/foo1", "/home/user/bar", "/home/user/foo3"])
+        self.start_server()
+        self.assertEqual(["/home/user/foo1"], self.query("foo", 5))
+
+        # when
+        with open(self.file_history_path, 'a') as f:
+            f.write("/home/user/foo3\n")
+        found = self.query("foo", 5)
+
+        # then
+        self.assertEqual(["/home/user/foo3", "/home/user/foo1"], found)
+
+    def test_check_cached_files_again_when_selecting(self):
+        # given
+        file = os.path.join(self.socket_dir.name, "foo.txt")
+        open(file, 'w').close()
+        self.setup_file_history(file + "\n")
+        self.remove_existence_cache()
+        self.addCleanup(self.remove_existence_cache)
+        # every cached file is older than the select ttl
+        os.environ[CACHE_SELECT_TTL_ENV] = "0"
+        self.start_server()
+        self.assertEqual([file], self.query("foo", 5))
+
+        # when
+        os.remove(file)
+        shown = self.query("foo", 5)
+        selectable = self.query("foo", 5, select=True)
+
+        # then
+        # files only shown may be trusted for the longer ttl
+        self.assertEqual([file], shown)
+        self.assertEqual([], selectable)
+
+    def test_no_answer_without_server(self):
+        # given
+        self.setup_file_history("/home/user/foo\n")
+
+        # when
+        found = self.query("foo", 5)
+
+        # then
+        self.assertIsNone(found)
+
+    def test_no_query_to_socket_of_other_user(self):
+        # given
+        self.setup_file_history("/home/user/foo\n")
+        self.start_server()
+
+        # when
+        with patch('os.getuid', return_value=os.getuid() + 1):
+            found = self.query("foo", 5)
+
+        # then
+        self.assertIsNone(found)
+
+    @patch('file_history.file_history_reader.FileHistoryReader.read')
+    @patch('file_history.file_checker.FileChecker.isfile')
+    def test_show_files_found_by_server(self, mock_isfile, mock_read):
+        # given
+        self.setup_file_history(textwrap.dedent("""
+        /home/user/Downloads/myfile.txt
+        /home/user/Downloads/dessen.txt
+        """).lstrip())
+        mock_isfile.side_effect = self.create_file_checker_mock(
+            ["/home/user/Downloads/myfile.txt", "/home/user/Downloads/dessen.txt", self.file_history_path])
+        # the history must not be read by the app itself
+        mock_read.side_effect = Exception("history read despite running query server")
+        self.start_server()
+        sys.argv = [SCRIPT_NAME, MODE_ARG, "terminal", ACTION_ARG, "show"]
+        stdout = io.StringIO()
+
+        # when
+        with contextlib.redirect_stdout(stdout):
+            DefaultAppLauncher(raise_exceptions=True).start()
+
+        # then
+        self.assertEqual(["/home/user/Downloads/dessen.txt", "/home/user/Downloads/myfile.txt"],
+                         stdout.getvalue().splitlines())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -5,7 +5,7 @@ import textwrap
 import unittest
 from unittest.mock import patch
 
-from file_history.args import HISTORY_FILE_ENV, SCRIPT_NAME
+from file_history.args import CMD_CACHE_SIZE_ENV, HISTORY_FILE_ENV, SCRIPT_NAME
 from file_history.track.track_app import USAGE_STRING, TrackApp
 from test.integration.suite.utils import assert_printed_to_stream, resolve_test_file_path
 
@@ -15,6 +15,8 @@ class TestTrackIntegration(unittest.TestCase):
     def setUp(self):
         self.file_history_path = resolve_test_file_path("file_history")
         self.default_env = os.environ.copy()
+        # file checks are mocked, the real dir mtimes can't tell whether cached results are still valid
+        os.environ[CMD_CACHE_SIZE_ENV] = "0"
         self.stdout_buf = io.StringIO()
 
     def assert_printed_to_stdout(self, expected_outputs, strict=True):
@@ -0,0 +1,63 @@
+import random
+import time
+import unittest
+from unittest.mock import MagicMock
+
+from file_history.batch_file_checker import BatchFileChecker, SLOW_CHECK_SECONDS
+
+
+class TestBatchFileChecker(unittest.TestCase):
+
+    def setUp(self):
+        self.mock_file_checker = MagicMock()
+        self.checker = BatchFileChecker(self.mock_file_checker, max_workers=4)
+
+    def tearDown(self):
+        self.checker.shutdown()
+
+    def files_exist(self, files, delay=0.0):
+        def mock_isfile(path):
+            time.sleep(delay * random.random())
+            return path in files
+        self.mock_file_checker.isfile.side_effect = mock_isfile
+
+    def test_check_inline_while_fast(self):
+        # given
+        self.files_exist(["/some/a"])
+
+        # when
+        exists = self.checker.check_all(["/some/a", "/some/b"])
+
+        # then
+        self.assertEqual([True, False], exists)
+        self.assertFalse(self.checker.is_parallel())
+
+    def test_check_in_parallel_once_slow(self):
+        # given
+        paths = ["/some/%d" % i for i in range(50)]
+        self.mock_file_checker.isfile.side_effect = lambda path: time.sleep(SLOW_CHECK_SECONDS * 2)
+        self.checker.check_all(["/some/slow"])
+        self.assertTrue(self.checker.is_parallel())
+        self.files_exist(paths[::2], delay=SLOW_CHECK_SECONDS * 5)
+
+        # when
+        exists = self.checker.check_all(paths)
+
+        # then
+        # results keep the order of the paths, no matter which check finished first
+        self.assertEqual([i % 2 == 0 for i in range(50)], exists)
+
+    def test_never_parallel_without_workers(self):
+        # given
+        self.checker = BatchFileChecker(self.mock_file_checker, max_workers=0)
+        self.mock_file_checker.isfile.side_effect = lambda path: time.sleep(SLOW_CHECK_SECONDS * 2)
+
+        # when
+        self.checker.check_all(["/some/a", "/some/b"])
+
+        # then
+        self.assertFalse(self.checker.is_parallel())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,126 @@
+import json
+import os
+import tempfile
+import time
+import unittest
+
+from file_history.clean.clean_scheduler import CleanScheduler
+
+
+class TestCleanScheduler(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.history_file = os.path.join(self.tmp_dir.name, ".file_history")
+        self.append(1000)
+        self.scheduler = CleanScheduler(self.history_file, growth_bytes=100, growth_percent=50, interval=60)
+
+    def tearDown(self):
+        self.scheduler.release()
+        self.tmp_dir.cleanup()
+
+    def append(self, size):
+        with open(self.history_file, 'a') as file:
+            file.write("x" * size)
+
+    def clean(self):
+        self.assertTrue(self.scheduler.acquire())
+        self.scheduler.mark_cleaned()
+        self.scheduler.release()
+
+    def set_last_clean_time(self, seconds_ago):
+        with open(self.scheduler.stamp_file) as file:
+            stamp = json.load(file)
+        stamp["time"] = time.time() - seconds_ago
+        with open(self.scheduler.stamp_file, 'w') as file:
+            json.dump(stamp, file)
+
+    def test_due_if_never_cleaned(self):
+        # when
+        due = self.scheduler.acquire()
+
+        # then
+        self.assertTrue(due)
+
+    def test_not_due_without_growth(self):
+        # given
+        self.clean()
+        self.set_last_clean_time(3600)
+
+        # when
+        due = self.scheduler.acquire()
+
+        # then
+        self.assertFalse(due)
+
+    def test_debounce_small_growth(self):
+        # given
+        self.clean()
+        self.append(10)
+
+        # when
+        due = self.scheduler.acquire()
+
+        # then
+        self.assertFalse(due)
+
+    def test_due_after_growth_threshold(self):
+        # given
+        self.clean()
+        self.append(100)
+
+        # when
+        due = self.scheduler.acquire()
+
+        # then
+        self.assertTrue(due)
+
+    def test_due_after_growth_percent(self):
+        # given
+        self.scheduler.growth_bytes = 10 ** 6
+        self.clean()
+        self.append(500)
+
+        # when
+        due = self.scheduler.acquire()
+
+        # then
+        self.assertTrue(due)
+
+    def test_due_after_interval(self):
+        # given
+        self.clean()
+        self.append(10)
+        self.set_last_clean_time(60)
+
+        # when
+        due = self.scheduler.acquire()
+
+        # then
+        self.assertTrue(due)
+
+    def test_elect_single_cleaner(self):
+        # given
+        other_scheduler = CleanScheduler(self.history_file)
+        self.assertTrue(other_scheduler.acquire())
+
+        # when
+        due = self.scheduler.acquire()
+
+        # then
+        other_scheduler.release()
+        self.assertFalse(due)
+
+    def test_unscheduled_clean_always_runs(self):
+        # given
+        self.clean()
+
+        # when
+        due = self.scheduler.acquire(scheduled=False)
+
+        # then
+        self.assertTrue(due)
+
+
+if __name__ == '__main__':
+    unittest.main()
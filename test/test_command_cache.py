@@ -0,0 +1,186 @@
+import os
+import tempfile
+import unittest
+from unittest.mock import MagicMock, patch
+
+from file_history.args import HISTORY_FILE_ENV
+from file_history.caching_command_parser import CachingCommandParser
+from file_history.clean.file_history_cleaner import FileHistoryCleaner
+from file_history.command_cache import CommandCache, provide_command_cache
+from file_history.command_parser import CommandParser
+from file_history.track.track_app import TrackApp
+
+
+class TestCommandCache(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.dir = self.tmp_dir.name
+        self.mock_file_checker = MagicMock()
+        self.mock_file_checker.isfile.side_effect = os.path.isfile
+        self.cache = CommandCache(os.path.join(self.dir, "cmd-cache"), max_entries=2)
+        # only creating the cache file changes the dirs mtime, saving it later does not
+        open(self.cache.path, 'w').close()
+        self.parser = CachingCommandParser(CommandParser(self.mock_file_checker), self.cache)
+        # pretend dirs were modified long ago, so results are not considered racy
+        patch('file_history.command_cache.RACY_MTIME_NS', 0).start()
+        self.addCleanup(patch.stopall)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def create_file(self, name):
+        path = os.path.join(self.dir, name)
+        open(path, 'w').close()
+        return path
+
+    def test_repeated_cmd_is_cached(self):
+        # given
+        file = self.create_file("main.py")
+
+        # when
+        first = self.parser.find_files_in_command("vim main.py", [self.dir])
+        second = self.parser.find_files_in_command("vim main.py", [self.dir])
+
+        # then
+        self.assertEqual([file], first)
+        self.assertEqual([file], second)
+        self.assertEqual(1, self.mock_file_checker.isfile.call_count)
+        self.assertEqual({"hits": 1, "misses": 1, "entries": 1}, self.cache.stats())
+
+    def test_cmd_without_files_is_cached(self):
+        # when
+        self.parser.find_files_in_command("git status", [self.dir])
+        result = self.parser.find_files_in_command("git status", [self.dir])
+
+        # then
+        self.assertEqual([], result)
+        self.assertEqual(1, self.cache.hits)
+
+    def test_entry_invalidated_when_dir_changes(self):
+        # given
+        self.parser.find_files_in_command("vim main.py", [self.dir])
+        file = self.create_file("main.py")
+        # make sure mtime changes, even on file systems with coarse timestamps
+        os.utime(self.dir, ns=(0, 0))
+
+        # when
+        result = self.parser.find_files_in_command("vim main.py", [self.dir])
+
+        # then
+        self.assertEqual([file], result)
+        self.assertEqual(0, self.cache.hits)
+
+    def test_entry_survives_clean_of_history_in_same_dir(self):
+        # given
+        file = self.create_file("main.py")
+        history_file = os.path.join(self.dir, ".file_history")
+        patch.dict(os.environ, {HISTORY_FILE_ENV: history_file}).start()
+        track_app = TrackApp()
+        track_app.track(self.dir, "vim main.py")
+        # the first clean creates the files it keeps next to the history
+        FileHistoryCleaner(history_file).clean(full_sweep=True)
+        track_app.track(self.dir, "vim main.py")
+        track_app.track(self.dir, "vim main.py")
+        hits = provide_command_cache(history_file).hits
+        dir_mtime = os.stat(self.dir).st_mtime_ns
+
+        # when
+        FileHistoryCleaner(history_file).clean(full_sweep=True)
+        track_app.track(self.dir, "vim main.py")
+
+        # then
+        self.assertNotEqual(dir_mtime, os.stat(self.dir).st_mtime_ns)
+        self.assertEqual(hits + 1, provide_command_cache(history_file).hits)
+        with open(history_file) as history:
+            self.assertEqual([file, file], history.read().splitlines())
+
+    def test_entry_invalidated_when_missing_dir_appears(self):
+        # given
+        self.parser.find_files_in_command("vim sub/main.py", [self.dir])
+        os.mkdir(os.path.join(self.dir, "sub"))
+        file = self.create_file("sub/main.py")
+
+        # when
+        result = self.parser.find_files_in_command("vim sub/main.py", [self.dir])
+
+        # then
+        self.assertEqual([file], result)
+
+    def test_recent_dirs_are_part_of_key(self):
+        # given
+        file = self.create_file("main.py")
+        self.parser.find_files_in_command("vim main.py", ["/somewhere/else"])
+
+        # when
+        result = self.parser.find_files_in_command("vim main.py", [self.dir])
+
+        # then
+        self.assertEqual([file], result)
+
+    def test_least_recently_used_entry_is_evicted(self):
+        # given
+        self.parser.find_files_in_command("cat a", [self.dir])
+        self.parser.find_files_in_command("cat b", [self.dir])
+        self.parser.find_files_in_command("cat a", [self.dir])
+
+        # when
+        self.parser.find_files_in_command("cat c", [self.dir])
+
+        # then
+        self.assertIsNotNone(self.cache.lookup("cat a", [self.dir]))
+        self.assertIsNone(self.cache.lookup("cat b", [self.dir]))
+
+    def test_entry_of_other_home_is_not_used(self):
+        # given
+        self.create_file("notes.txt")
+        with patch.dict(os.environ, {"HOME": self.dir}):
+            self.parser.find_files_in_command("vim ~/notes.txt", [self.dir])
+
+        # when
+        with patch.dict(os.environ, {"HOME": "/home/other"}):
+            files = self.cache.lookup("vim ~/notes.txt", [self.dir])
+
+        # then
+        self.assertIsNone(files)
+
+    def test_racy_dir_is_not_cached(self):
+        # given
+        patch('file_history.command_cache.RACY_MTIME_NS', 10 ** 12).start()
+        self.create_file("main.py")
+
+        # when
+        self.parser.find_files_in_command("vim main.py", [self.dir])
+
+        # then
+        self.assertEqual(0, self.cache.stats()["entries"])
+
+    def test_save_and_load(self):
+        # given
+        file = self.create_file("main.py")
+        self.parser.find_files_in_command("vim main.py", [self.dir])
+        self.cache.save()
+
+        # when
+        loaded = CommandCache(self.cache.path)
+        loaded.load()
+
+        # then
+        self.assertEqual([file], loaded.lookup("vim main.py", [self.dir]))
+        self.assertEqual(1, loaded.hits)
+        self.assertEqual(1, loaded.misses)
+
+    def test_load_broken_cache(self):
+        # given
+        with open(self.cache.path, 'w') as file:
+            file.write("{broken")
+
+        # when
+        self.cache.load()
+
+        # then
+        self.assertEqual(0, self.cache.stats()["entries"])
+
+
+if __name__ == '__main__':
+    unittest.main()
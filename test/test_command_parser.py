@@ -192,6 +192,32 @@ class TestCommandParser(unittest.TestCase):
         expected_files = ["/path/dessen"]
         self.assertEqual(expected_files, actual_files)
 
+    def test_stderr_redirect_to_dev_null(self):
+        # given
+        cmd = "make 2>/dev/null"
+        self.files_exist(["/dev/null"])
+        recent_dirs = ["/path"]
+
+        # when
+        actual_files = self.parser.find_files_in_command(cmd, recent_dirs)
+
+        # then
+        expected_files = []
+        self.assertEqual(expected_files, actual_files)
+
+    def test_redirect_to_dev_null_with_fd_duplication(self):
+        # given
+        cmd = "grep foo /etc/hosts >/dev/null 2>&1"
+        self.files_exist(["/etc/hosts", "/dev/null"])
+        recent_dirs = ["/path"]
+
+        # when
+        actual_files = self.parser.find_files_in_command(cmd, recent_dirs)
+
+        # then
+        expected_files = ["/etc/hosts"]
+        self.assertEqual(expected_files, actual_files)
+
     def test_echo_with_pipe(self):
         # echo can never have a file arg
         # given
@@ -2,7 +2,7 @@ import unittest
 from file_history.command_splitter import CommandSplitter
 
 
-# only test stuff I added on top of shlex (subshell, delimiters), dont test shlex
+# quoting follows bash (like shlex did before), focus is on subshells, delimiters and redirects
 class TestCommandSplitter(unittest.TestCase):
 
     def setUp(self):
@@ -141,6 +141,90 @@ class TestCommandSplitter(unittest.TestCase):
         result = self.command_splitter.split_command(cmd)
         self.assertEqual(expected, result)
 
+    def test_unspaced_pipe(self):
+        cmd = "cat myfile|grep foo"
+        expected = [["cat", "myfile"], ["grep", "foo"]]
+        result = self.command_splitter.split_command(cmd)
+        self.assertEqual(expected, result)
+
+    def test_chained_cmd_with_or(self):
+        cmd = "make || cat build.log"
+        expected = [["make"], ["cat", "build.log"]]
+        result = self.command_splitter.split_command(cmd)
+        self.assertEqual(expected, result)
+
+    def test_background_cmd(self):
+        cmd = "gedit notes.txt & ls"
+        expected = [["gedit", "notes.txt"], ["ls"]]
+        result = self.command_splitter.split_command(cmd)
+        self.assertEqual(expected, result)
+
+    def test_newline_separates_cmds(self):
+        cmd = "cd /tmp\nvim notes.txt"
+        expected = [["cd", "/tmp"], ["vim", "notes.txt"]]
+        result = self.command_splitter.split_command(cmd)
+        self.assertEqual(expected, result)
+
+    def test_escaped_newline_continues_cmd(self):
+        cmd = "cat foo \\\n bar"
+        expected = ["cat", "foo", "bar"]
+        result = self.command_splitter.split_command(cmd)
+        self.assertEqual(expected, result)
+
+    def test_unspaced_redirect(self):
+        cmd = "echo foo>bar.txt"
+        expected = ["echo", "foo", ">", "bar.txt"]
+        result = self.command_splitter.split_command(cmd)
+        self.assertEqual(expected, result)
+
+    def test_fd_redirects(self):
+        cmd = "make 2>errors.log >>out.log 2>&1"
+        expected = ["make", ">", "errors.log", ">>", "out.log"]
+        result = self.command_splitter.split_command(cmd)
+        self.assertEqual(expected, result)
+
+    def test_redirect_to_device(self):
+        cmd = "make 2>/dev/null"
+        expected = ["make"]
+        result = self.command_splitter.split_command(cmd)
+        self.assertEqual(expected, result)
+
+    def test_redirect_to_device_with_fd_duplication(self):
+        cmd = "grep foo /etc/hosts >/dev/null 2>&1"
+        expected = ["grep", "foo", "/etc/hosts"]
+        result = self.command_splitter.split_command(cmd)
+        self.assertEqual(expected, result)
+
+    def test_redirect_stdout_and_stderr(self):
+        cmd = "make &> all.log"
+        expected = ["make", ">", "all.log"]
+        result = self.command_splitter.split_command(cmd)
+        self.assertEqual(expected, result)
+
+    def test_quoted_delimiters_are_no_delimiters(self):
+        cmd = "grep 'a;b|c' file.txt"
+        expected = ["grep", "a;b|c", "file.txt"]
+        result = self.command_splitter.split_command(cmd)
+        self.assertEqual(expected, result)
+
+    def test_escaped_space(self):
+        cmd = "cat my\\ file.txt"
+        expected = ["cat", "my file.txt"]
+        result = self.command_splitter.split_command(cmd)
+        self.assertEqual(expected, result)
+
+    def test_comment(self):
+        cmd = "cat file.txt # show file"
+        expected = ["cat", "file.txt"]
+        result = self.command_splitter.split_command(cmd)
+        self.assertEqual(expected, result)
+
+    def test_trailing_escape_char(self):
+        cmd = "cat file.txt \\"
+        expected = []
+        result = self.command_splitter.split_command(cmd)
+        self.assertEqual(expected, result)
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,108 @@
+import os
+import tempfile
+import unittest
+from unittest.mock import MagicMock
+
+from file_history.command_parser import CommandParser
+from file_history.dir_listing_cache import DirListingCache
+
+
+class TestDirListingCache(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.dir = self.tmp_dir.name
+        self.mock_file_checker = MagicMock()
+        self.mock_file_checker.isfile.side_effect = os.path.isfile
+        self.cache = DirListingCache(self.mock_file_checker)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def create_files(self, names):
+        for name in names:
+            open(os.path.join(self.dir, name), 'w').close()
+
+    def path(self, name):
+        return os.path.join(self.dir, name)
+
+    def test_answer_from_listing(self):
+        # given
+        self.create_files(["a", "b", "c"])
+
+        # when
+        results = [self.cache.isfile(self.path(name)) for name in ["a", "b", "c", "missing"]]
+
+        # then
+        self.assertEqual([True, True, True, False], results)
+        # first lookup is asked directly, everything after that is answered from the listing
+        self.mock_file_checker.isfile.assert_called_once_with(self.path("a"))
+
+    def test_dir_is_not_a_file(self):
+        # given
+        self.create_files(["a"])
+        os.mkdir(self.path("subdir"))
+
+        # when
+        self.cache.isfile(self.path("a"))
+        result = self.cache.isfile(self.path("subdir"))
+
+        # then
+        self.assertFalse(result)
+
+    def test_symlink_asks_file_checker(self):
+        # given
+        self.create_files(["a"])
+        os.symlink(self.path("a"), self.path("link"))
+
+        # when
+        self.cache.isfile(self.path("a"))
+        result = self.cache.isfile(self.path("link"))
+
+        # then
+        self.assertTrue(result)
+        self.mock_file_checker.isfile.assert_called_with(self.path("link"))
+
+    def test_missing_dir_asks_file_checker(self):
+        # given
+        missing_dir = self.path("missing")
+        self.mock_file_checker.isfile.side_effect = lambda path: path == missing_dir + "/b"
+
+        # when
+        results = [self.cache.isfile(missing_dir + "/" + name) for name in ["a", "b"]]
+
+        # then
+        self.assertEqual([False, True], results)
+        self.assertEqual(2, self.mock_file_checker.isfile.call_count)
+
+    def test_clear_forgets_listings(self):
+        # given
+        self.create_files(["a", "b"])
+        self.cache.isfile(self.path("a"))
+        self.cache.isfile(self.path("b"))
+        self.create_files(["c"])
+        self.cache.clear()
+
+        # when
+        self.cache.isfile(self.path("a"))
+        result = self.cache.isfile(self.path("c"))
+
+        # then
+        self.assertTrue(result)
+
+    def test_command_parser_lists_recent_dir_once(self):
+        # given
+        self.create_files(["a", "b", "c", "d", "e"])
+        os.mkdir(self.path("dest"))
+        parser = CommandParser(self.cache)
+
+        # when
+        files = parser.find_files_in_command("cp a b c d e dest/", [self.dir])
+
+        # then
+        self.assertEqual([self.path(name) for name in ["a", "b", "c", "d", "e"]], files)
+        self.mock_file_checker.isfile.assert_called_once_with(self.path("a"))
+
+
+if __name__ == '__main__':
+    unittest.main()
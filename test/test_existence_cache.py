@@ -0,0 +1,156 @@
+import os
+import tempfile
+import time
+import unittest
+from unittest.mock import patch
+
+from file_history.args import CACHE_SELECT_TTL_ENV, CACHE_TTL_ENV, NO_CACHE_ENV
+from file_history.existence_cache import CACHE_FILE_SUFFIX, ExistenceCache, provide_existence_cache
+from file_history.file_checker import FileChecker
+from file_history.track.file_history_appender import FileHistoryAppender
+
+
+class TestExistenceCache(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.dir = self.tmp_dir.name
+        self.history_file = os.path.join(self.dir, ".file_history")
+        open(self.history_file, 'w').close()
+        self.cache_file = self.history_file + CACHE_FILE_SUFFIX
+        self.cache = ExistenceCache(self.cache_file, ttl=60, negative_ttl=600)
+        self.file_checker = FileChecker(self.cache)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def create_file(self, name):
+        path = os.path.join(self.dir, name)
+        open(path, 'w').close()
+        return path
+
+    def reload(self):
+        self.cache = ExistenceCache(self.cache_file, ttl=60, negative_ttl=600)
+        self.cache.load()
+        self.file_checker = FileChecker(self.cache)
+
+    def test_answer_from_cache(self):
+        # given
+        file = self.create_file("a")
+        missing = os.path.join(self.dir, "missing")
+        self.file_checker.isfile(file)
+        self.file_checker.isfile(missing)
+        self.cache.save()
+        self.reload()
+        os.remove(file)
+        open(missing, 'w').close()
+
+        # when
+        with patch('os.stat') as mock_stat:
+            results = [self.file_checker.isfile(file), self.file_checker.isfile(missing)]
+
+        # then
+        self.assertEqual([True, False], results)
+        mock_stat.assert_not_called()
+
+    def test_check_again_after_ttl(self):
+        # given
+        file = self.create_file("a")
+        missing = os.path.join(self.dir, "missing")
+        self.file_checker.isfile(file)
+        self.file_checker.isfile(missing)
+        os.remove(file)
+        open(missing, 'w').close()
+
+        # when
+        with patch('time.time', return_value=time.time() + 601):
+            results = [self.file_checker.isfile(file), self.file_checker.isfile(missing)]
+
+        # then
+        self.assertEqual([False, True], results)
+
+    def test_keep_missing_files_longer(self):
+        # given
+        file = self.create_file("a")
+        missing = os.path.join(self.dir, "missing")
+        self.file_checker.isfile(file)
+        self.file_checker.isfile(missing)
+        os.remove(file)
+        open(missing, 'w').close()
+
+        # when
+        with patch('time.time', return_value=time.time() + 61):
+            results = [self.file_checker.isfile(file), self.file_checker.isfile(missing)]
+
+        # then
+        self.assertEqual([False, False], results)
+
+    def test_tracking_file_again_invalidates_entry(self):
+        # given
+        missing = os.path.join(self.dir, "missing")
+        self.file_checker.isfile(missing)
+        self.cache.save()
+        open(missing, 'w').close()
+
+        # when
+        FileHistoryAppender(self.history_file).append(missing)
+        self.reload()
+
+        # then
+        self.assertTrue(self.file_checker.isfile(missing))
+
+    def test_newest_record_wins(self):
+        # given
+        missing = os.path.join(self.dir, "missing")
+        self.file_checker.isfile(self.create_file("a"))
+        self.cache.save()
+        other_cache = ExistenceCache(self.cache_file)
+        # checked before the file was tracked again, but saved after
+        other_cache.store(missing, False, None)
+        FileHistoryAppender(self.history_file).append(missing)
+        other_cache.save()
+
+        # when
+        self.reload()
+
+        # then
+        self.assertIsNone(self.cache.lookup(missing))
+
+    def test_compact_log(self):
+        # given
+        with patch('file_history.existence_cache.MAX_ENTRIES', 10):
+            for i in range(50):
+                self.cache.store("/some/file%d" % i, False, None)
+                self.cache.save()
+
+            # when
+            self.reload()
+
+        # then
+        self.assertLessEqual(len(self.cache.entries), 20)
+        self.assertFalse(self.cache.lookup("/some/file49"))
+
+    def test_disable_cache(self):
+        # when
+        with patch.dict(os.environ, {NO_CACHE_ENV: "1"}):
+            disabled_by_env = provide_existence_cache(self.history_file)
+        disabled_by_flag = provide_existence_cache(self.history_file, no_cache=True)
+
+        # then
+        self.assertIsNone(disabled_by_env)
+        self.assertIsNone(disabled_by_flag)
+
+    def test_trust_existing_files_briefly_when_selecting(self):
+        # when
+        with patch.dict(os.environ, {CACHE_TTL_ENV: "60", CACHE_SELECT_TTL_ENV: "2"}):
+            shown = provide_existence_cache(self.history_file)
+            selected = provide_existence_cache(self.history_file, select=True)
+
+        # then
+        self.assertEqual(60, shown.ttl)
+        self.assertEqual(2, selected.ttl)
+        self.assertEqual(shown.negative_ttl, selected.negative_ttl)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,161 @@
+import errno
+import os
+import shutil
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from file_history.file_checker import FileChecker
+from file_history.missing_dir_trie import MissingDirTrie
+
+
+class TestFileChecker(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.dir = self.tmp_dir.name
+        self.missing_dirs = MissingDirTrie()
+        self.file_checker = FileChecker(missing_dirs=self.missing_dirs)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def path(self, *parts):
+        return os.path.join(self.dir, *parts)
+
+    def count_stats(self, paths):
+        with patch('os.stat', side_effect=os.stat) as mock_stat:
+            results = [self.file_checker.isfile(path) for path in paths]
+        return results, mock_stat.call_count
+
+    def test_reject_files_below_missing_dir_without_syscall(self):
+        # given
+        os.makedirs(self.path("project", "src"))
+        paths = [self.path("project", "src", "file%d" % i) for i in range(100)]
+        for path in paths:
+            open(path, 'w').close()
+        self.assertEqual([True] * 100, self.count_stats(paths)[0])
+        shutil.rmtree(self.path("project"))
+
+        # when
+        results, stats = self.count_stats(paths)
+
+        # then
+        self.assertEqual([False] * 100, results)
+        # file, src, project, tmp dir
+        self.assertEqual(4, stats)
+        self.assertTrue(self.missing_dirs.covers(self.path("project", "other", "file")))
+        self.assertFalse(self.missing_dirs.covers(self.path("other")))
+
+    def test_file_in_place_of_dir(self):
+        # given
+        open(self.path("file"), 'w').close()
+
+        # when
+        results, stats = self.count_stats([self.path("file", "a"), self.path("file", "b")])
+
+        # then
+        self.assertEqual([False, False], results)
+        self.assertEqual(2, stats)
+
+    def test_stat_existing_parent_once(self):
+        # given
+        paths = [self.path("missing%d" % i) for i in range(10)]
+
+        # when
+        results, stats = self.count_stats(paths)
+
+        # then
+        self.assertEqual([False] * 10, results)
+        self.assertEqual(11, stats)
+
+    def test_fifo_counts_as_file_without_opening_it(self):
+        # given
+        fifo = self.path("fifo")
+        os.mkfifo(fifo)
+
+        # when
+        with patch('builtins.open', side_effect=AssertionError("must not open")):
+            exists = self.file_checker.isfile(fifo)
+
+        # then
+        self.assertTrue(exists)
+
+    def test_dir_is_no_file(self):
+        # given
+        os.makedirs(self.path("dir"))
+
+        # when
+        exists, file_stat = self.file_checker.stat_file(self.path("dir"))
+
+        # then
+        self.assertFalse(exists)
+        self.assertTrue(self.file_checker.isdir(self.path("dir")))
+
+    def test_reuse_stat(self):
+        # given
+        file = self.path("file")
+        with open(file, 'w') as f:
+            f.write("content")
+
+        # when
+        with patch('os.stat', side_effect=os.stat) as mock_stat:
+            exists, file_stat = self.file_checker.stat_file(file)
+
+        # then
+        self.assertTrue(exists)
+        self.assertEqual(7, file_stat.st_size)
+        self.assertEqual(os.stat(file).st_ino, file_stat.st_ino)
+        self.assertEqual(1, mock_stat.call_count)
+
+    def test_inaccessible_file_exists(self):
+        # given
+        file = self.path("locked", "file")
+
+        # when
+        with patch('os.stat', side_effect=PermissionError(errno.EACCES, "Permission denied")), \
+                patch('os.listdir', side_effect=AssertionError("must not list")):
+            exists = self.file_checker.isfile(file)
+            isdir = self.file_checker.isdir(self.path("locked", "dir"))
+
+        # then
+        self.assertTrue(exists)
+        self.assertTrue(isdir)
+        self.assertFalse(self.missing_dirs.covers(file))
+
+    def test_forget_dirs(self):
+        # given
+        file = self.path("dir", "file")
+        self.file_checker.isfile(file)
+        os.makedirs(self.path("dir"))
+        open(file, 'w').close()
+
+        # when
+        self.file_checker.forget_dirs()
+
+        # then
+        self.assertTrue(self.file_checker.isfile(file))
+
+
+class TestMissingDirTrie(unittest.TestCase):
+
+    def test_covers_paths_below_missing_dirs(self):
+        # given
+        trie = MissingDirTrie()
+
+        # when
+        trie.add("/home/user/project")
+        trie.add("/home/user/project/src")
+        trie.add("/mnt/usb")
+
+        # then
+        self.assertTrue(trie.covers("/home/user/project"))
+        self.assertTrue(trie.covers("/home/user/project/src/main.py"))
+        self.assertTrue(trie.covers("/mnt/usb/file"))
+        self.assertFalse(trie.covers("/home/user/projects/file"))
+        self.assertFalse(trie.covers("/home/user"))
+        self.assertFalse(trie.covers("/mnt"))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,7 +1,9 @@
 import unittest
 from unittest.mock import MagicMock, patch
 
+from file_history.bloom_filter import BloomFilter
 from file_history.file_filter import FileFilter
+from file_history.search_results import SearchResults
 
 
 class TestFileFilter(unittest.TestCase):
@@ -68,5 +70,36 @@ class TestFileFilter(unittest.TestCase):
         self.assertFalse(result3)
 
 
+    def test_share_seen_files(self):
+        # given
+        results = SearchResults()
+        file_filter = FileFilter("foo", results)
+        self.mock_file_checker.isfile.return_value = True
+
+        # when
+        file_filter.accept("/home/user/foo")
+        file_filter.accept("/home/user/bar")
+
+        # then
+        # files ignored by the filter are not remembered
+        self.assertEqual({"/home/user/foo"}, results.seen)
+        self.assertFalse(FileFilter("foo", results).accept("/home/user/foo"))
+
+    def test_reject_duplicate_file_with_bloom_filter(self):
+        # given
+        file_filter = FileFilter("", SearchResults(seen=BloomFilter(capacity=100)))
+        self.mock_file_checker.isfile.return_value = True
+
+        # when
+        result1 = file_filter.accept("/home/user/documents")
+        result2 = file_filter.accept("/home/user/documents")
+        result3 = file_filter.accept("/home/user/music")
+
+        # then
+        self.assertTrue(result1)
+        self.assertFalse(result2)
+        self.assertTrue(result3)
+
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,100 @@
+import os
+import tempfile
+import unittest
+from multiprocessing import Process
+
+from file_history.track.file_history_appender import FileHistoryAppender
+
+
+def append_many(history_file, prefix, count):
+    appender = FileHistoryAppender(history_file)
+    for i in range(count):
+        appender.append_all(["/%s/%d/a" % (prefix, i), "/%s/%d/b" % (prefix, i)])
+
+
+class TestFileHistoryAppender(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.history_file = os.path.join(self.tmp_dir.name, ".file_history")
+        open(self.history_file, 'w').close()
+        self.appender = FileHistoryAppender(self.history_file)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def read_history(self):
+        with open(self.history_file) as file:
+            return file.read()
+
+    def write_history(self, content):
+        with open(self.history_file, 'w') as file:
+            file.write(content)
+
+    def test_append_all_lines(self):
+        # when
+        self.appender.append_all(["/some/a", " /some/b\n", ""])
+
+        # then
+        self.assertEqual("/some/a\n/some/b\n", self.read_history())
+
+    def test_nothing_to_append(self):
+        # when
+        self.appender.append_all([])
+
+        # then
+        self.assertEqual("", self.read_history())
+
+    def test_repair_torn_last_record(self):
+        # given
+        self.write_history("/some/a\n/some/tor")
+
+        # when
+        self.appender.append("/some/b")
+
+        # then
+        self.assertEqual("/some/a\n/some/tor\n/some/b\n", self.read_history())
+
+    def test_keep_complete_last_record(self):
+        # given
+        self.write_history("/some/a\n")
+
+        # when
+        self.appender.append("/some/b")
+
+        # then
+        self.assertEqual("/some/a\n/some/b\n", self.read_history())
+
+    def test_create_missing_history(self):
+        # given
+        os.remove(self.history_file)
+
+        # when
+        self.appender.append("/some/a")
+
+        # then
+        self.assertEqual("/some/a\n", self.read_history())
+
+    def test_concurrent_appends_do_not_interleave(self):
+        # given
+        count = 200
+        processes = [Process(target=append_many, args=(self.history_file, prefix, count))
+                     for prefix in ["x", "y", "z"]]
+
+        # when
+        for process in processes:
+            process.start()
+        for process in processes:
+            process.join()
+
+        # then
+        lines = self.read_history().split('\n')
+        self.assertEqual('', lines.pop())
+        self.assertEqual(3 * count * 2, len(lines))
+        # lines of one command stay together
+        for a, b in zip(lines[0::2], lines[1::2]):
+            self.assertTrue(a.endswith("/a") and b == a[:-1] + "b", (a, b))
+
+
+if __name__ == '__main__':
+    unittest.main()
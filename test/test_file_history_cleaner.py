@@ -0,0 +1,174 @@
+import os
+import tempfile
+import unittest
+from multiprocessing import Process
+from unittest.mock import patch
+
+from file_history.clean.file_history_cleaner import FileHistoryCleaner
+from file_history.existence_cache import CACHE_FILE_SUFFIX, ExistenceCache
+from file_history.track.file_history_appender import FileHistoryAppender
+
+
+def append_many(history_file, files):
+    appender = FileHistoryAppender(history_file)
+    for file in files:
+        appender.append(file)
+
+
+class TestFileHistoryCleaner(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.dir = self.tmp_dir.name
+        self.history_file = os.path.join(self.dir, ".file_history")
+        open(self.history_file, 'w').close()
+        self.cleaner = FileHistoryCleaner(self.history_file)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def create_files(self, names):
+        paths = []
+        for name in names:
+            path = os.path.join(self.dir, name)
+            open(path, 'w').close()
+            paths.append(path)
+        return paths
+
+    def write_history(self, lines):
+        with open(self.history_file, 'w') as file:
+            file.write('\n'.join(lines) + '\n')
+
+    def read_history(self):
+        with open(self.history_file) as file:
+            return [line for line in file.read().split('\n') if line]
+
+    def test_carry_over_lines_appended_during_clean(self):
+        # given
+        a, b, c = self.create_files(["a", "b", "c"])
+        self.write_history([a, b, a])
+        create_tmp_file = self.cleaner.create_tmp_file
+
+        def append_while_cleaning(*args):
+            FileHistoryAppender(self.history_file).append(c)
+            return create_tmp_file(*args)
+
+        # when
+        with patch.object(self.cleaner, 'create_tmp_file', side_effect=append_while_cleaning):
+            self.cleaner.clean()
+
+        # then
+        self.assertEqual([b, a, c], self.read_history())
+
+    def test_rewrite_in_place_if_history_dir_is_not_writable(self):
+        # given
+        a, b = self.create_files(["a", "b"])
+        self.write_history([a, "/missing", b, a])
+        inode = os.stat(self.history_file).st_ino
+
+        # when
+        with patch('tempfile.mkstemp', side_effect=PermissionError):
+            self.cleaner.clean()
+
+        # then
+        self.assertEqual([b, a], self.read_history())
+        self.assertEqual(inode, os.stat(self.history_file).st_ino)
+
+    def test_keep_file_mode(self):
+        # given
+        a, = self.create_files(["a"])
+        self.write_history([a, a])
+        os.chmod(self.history_file, 0o666)
+
+        # when
+        self.cleaner.clean()
+
+        # then
+        self.assertEqual([a], self.read_history())
+        self.assertEqual(0o666, os.stat(self.history_file).st_mode & 0o777)
+        self.assertEqual([".file_history", ".file_history.clean-state", ".file_history.dir-changes",
+                          ".file_history.lock", "a"], sorted(os.listdir(self.dir)))
+
+    def test_no_appends_lost_while_cleaning_concurrently(self):
+        # given
+        files = self.create_files(["file%d" % i for i in range(300)])
+        processes = [Process(target=append_many, args=(self.history_file, files[i::3])) for i in range(3)]
+
+        # when
+        for process in processes:
+            process.start()
+        while any(process.is_alive() for process in processes):
+            self.cleaner.clean()
+        for process in processes:
+            process.join()
+        self.cleaner.clean()
+
+        # then
+        self.assertEqual(sorted(files), sorted(self.read_history()))
+
+
+    def test_sweep_all_if_history_was_rewritten(self):
+        # given
+        a, b = self.create_files(["a", "b"])
+        self.write_history([a, b])
+        self.cleaner.clean()
+        self.write_history([b, "/missing", a, b])
+
+        # when
+        self.cleaner.clean()
+
+        # then
+        self.assertEqual([a, b], self.read_history())
+
+    def test_keep_files_the_cache_knows_as_missing(self):
+        # given
+        a, = self.create_files(["a"])
+        self.write_history([a])
+        cache = ExistenceCache(self.history_file + CACHE_FILE_SUFFIX)
+        cache.store(a, False, None)
+        cache.save()
+        cleaner = FileHistoryCleaner(self.history_file, existence_cache=cache)
+
+        # when
+        cleaner.clean(full_sweep=True)
+
+        # then
+        self.assertEqual([a], self.read_history())
+        self.assertTrue(cache.lookup(a))
+
+    def test_full_sweep_drops_files_the_cache_knows_as_existing(self):
+        # given
+        a, = self.create_files(["a"])
+        self.write_history([a])
+        cache = ExistenceCache(self.history_file + CACHE_FILE_SUFFIX)
+        cache.store(a, True, None)
+        cache.save()
+        os.remove(a)
+        cleaner = FileHistoryCleaner(self.history_file, existence_cache=cache)
+
+        # when
+        cleaner.clean(full_sweep=True)
+
+        # then
+        self.assertEqual([], self.read_history())
+        self.assertFalse(cache.lookup(a))
+
+    def test_sweep_all_if_state_is_broken(self):
+        # given
+        a, = self.create_files(["a"])
+        self.write_history([a])
+        self.cleaner.clean()
+        with open(self.history_file + ".clean-state", 'ab') as file:
+            file.write(b"garbage")
+        self.write_history([a, "/missing"])
+        os.remove(a)
+
+        # when
+        self.cleaner.clean()
+
+        # then
+        self.assertEqual([], self.read_history())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -17,8 +17,8 @@ class TestFileHistoryReader(unittest.TestCase):
         self.test_history_file.write(bytes(content, "utf-8"))
         self.test_history_file.close()
 
-    def create_reader(self, max_lines):
-        return FileHistoryReader(self.test_history_file.name, max_lines, self.mock_callback)
+    def create_reader(self, max_lines, filter=None):
+        return FileHistoryReader(self.test_history_file.name, max_lines, self.mock_callback, filter)
 
     def tearDown(self):
         # Remove the temporary file after the test
@@ -126,6 +126,86 @@ class TestFileHistoryReader(unittest.TestCase):
         # then
         self.mock_callback.assert_not_called()
 
+    def test_filter_lines(self):
+        # given
+        history = textwrap.dedent(f"""
+            /home/user/foo/a
+            /home/user/bar
+            /home/user/foo/b
+            /home/user/baz
+            /home/user/foo/c
+        """).strip()
+        self.create_test_file(history)
+        reader = self.create_reader(-1, "foo/[ab]$")
+
+        # when
+        reader.read()
+
+        # then
+        self.assertEqual([call('/home/user/foo/b'), call('/home/user/foo/a')], self.mock_callback.call_args_list)
+
+    def test_filter_counts_all_lines_read(self):
+        # given
+        history = textwrap.dedent(f"""
+            /home/user/foo/a
+            /home/user/bar
+            /home/user/foo/b
+            /home/user/baz
+            /home/user/foo/c
+        """).strip()
+        self.create_test_file(history)
+        reader = self.create_reader(4, "foo")
+
+        # when
+        reader.read()
+
+        # then
+        self.assertEqual([call('/home/user/foo/c'), call('/home/user/foo/b')], self.mock_callback.call_args_list)
+
+    def test_filter_string_anchor(self):
+        # given
+        self.create_test_file("/a/foo\n/b/foo\n/a/bar\n")
+        reader = self.create_reader(-1, "\\A/a")
+
+        # when
+        reader.read()
+
+        # then
+        self.assertEqual([call('/a/bar'), call('/a/foo')], self.mock_callback.call_args_list)
+
+    def test_filter_line_anchors_match_stripped_lines(self):
+        # given
+        self.create_test_file("  /a/foo\t\n/b/foo \r\n/a/bar\n/c/a/foo\n")
+        reader = self.create_reader(-1, "^/a/.*o$")
+
+        # when
+        reader.read()
+
+        # then
+        self.assertEqual([call('/a/foo')], self.mock_callback.call_args_list)
+
+    def test_filter_matching_across_lines(self):
+        # given
+        self.create_test_file("/x/a\n/y/ab\n/z\n/a/b\n")
+        reader = self.create_reader(-1, "a[^z]*b")
+
+        # when
+        reader.read()
+
+        # then
+        self.assertEqual([call('/a/b'), call('/y/ab')], self.mock_callback.call_args_list)
+
+    def test_filter_smart_case(self):
+        # given
+        self.create_test_file("/a/Foo\n/b/bar\n/c/foo\n")
+        reader = FileHistoryReader(self.test_history_file.name, -1, self.mock_callback, "foo", smart_case=True)
+
+        # when
+        reader.read()
+
+        # then
+        self.assertEqual([call('/c/foo'), call('/a/Foo')], self.mock_callback.call_args_list)
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,98 @@
+import io
+import os
+import threading
+import time
+import unittest
+
+from file_history.terminal.file_stream_writer import FileStreamWriter
+
+
+class TestFileStreamWriter(unittest.TestCase):
+
+    def test_files_are_written_once_flush_size_is_reached(self):
+        # given
+        stream = io.StringIO()
+        writer = FileStreamWriter(stream, flush_size=8, flush_interval=60)
+
+        # when
+        writer.write_file("/a")
+        written_before = stream.getvalue()
+        writer.write_file("/bcdef")
+
+        # then
+        self.assertEqual("", written_before)
+        self.assertEqual("/a\n/bcdef\n", stream.getvalue())
+        writer.close()
+
+    def test_files_are_written_after_flush_interval(self):
+        # given
+        stream = io.StringIO()
+        writer = FileStreamWriter(stream, flush_size=1024, flush_interval=0.01)
+
+        # when
+        writer.write_file("/a")
+        deadline = time.monotonic() + 5
+        while not stream.getvalue() and time.monotonic() < deadline:
+            time.sleep(0.005)
+
+        # then
+        self.assertEqual("/a\n", stream.getvalue())
+        writer.close()
+
+    def test_null_separated(self):
+        # given
+        stream = io.StringIO()
+        writer = FileStreamWriter(stream, separator="\0")
+
+        # when
+        writer.write_file("/a b")
+        writer.write_file("/c\nd")
+        writer.close()
+
+        # then
+        self.assertEqual("/a b\0/c\nd\0", stream.getvalue())
+
+    def test_broken_pipe_stops_writing(self):
+        # given
+        read_fd, write_fd = os.pipe()
+        os.close(read_fd)
+        broken = threading.Event()
+        with os.fdopen(write_fd, "w") as stream:
+            writer = FileStreamWriter(stream, flush_size=1, broken_pipe_callback=broken.set)
+
+            # when
+            still_read = writer.write_file("/a")
+
+            # then
+            self.assertFalse(still_read)
+            self.assertTrue(broken.is_set())
+            self.assertFalse(writer.write_file("/b"))
+            writer.close()
+
+    def test_many_files_arrive_through_pipe(self):
+        # given
+        files = ["/some/file%d" % i for i in range(10_000)]
+        read_fd, write_fd = os.pipe()
+        read = []
+
+        def drain():
+            with os.fdopen(read_fd, "rb") as pipe:
+                read.append(pipe.read())
+
+        drainer = threading.Thread(target=drain)
+        drainer.start()
+
+        # when
+        with os.fdopen(write_fd, "w") as stream:
+            writer = FileStreamWriter(stream, flush_size=4096)
+            for file in files:
+                writer.write_file(file)
+            writer.close()
+        drainer.join()
+
+        # then
+        self.assertEqual(files, read[0].decode().splitlines())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,62 @@
+import re
+import unittest
+
+from file_history.filter_matcher import FilterMatcher
+
+
+class TestFilterMatcher(unittest.TestCase):
+
+    def test_classify_filters(self):
+        # given
+        filters = {
+            "foo": ["foo"],
+            "foo|bar": ["foo", "bar"],
+            "foo.py": None,
+            "foo|": None,
+            "^/home": None,
+        }
+
+        for filter, literals in filters.items():
+            # when
+            matcher = FilterMatcher(filter)
+
+            # then
+            self.assertEqual(literals, matcher.literals, filter)
+
+    def test_match_like_regex(self):
+        # given
+        lines = ["/home/user/foo.py", "/home/user/bar", "/tmp/Foo", "/tmp/foo|bar", "/foopy"]
+
+        for filter in ["foo", "foo|bar", "foo.py", "foo\\|bar", "^/tmp", "py$"]:
+            # when
+            matcher = FilterMatcher(filter)
+
+            # then
+            self.assertEqual([bool(re.search(filter, line)) for line in lines],
+                             [matcher.matches(line) for line in lines], filter)
+
+    def test_smart_case(self):
+        # given
+        lower = FilterMatcher("foo", smart_case=True)
+        upper = FilterMatcher("Foo", smart_case=True)
+        escape = FilterMatcher("foo\\S", smart_case=True)
+
+        # then
+        self.assertTrue(lower.matches("/tmp/FOO"))
+        self.assertTrue(upper.matches("/tmp/Foo"))
+        self.assertFalse(upper.matches("/tmp/foo"))
+        self.assertTrue(escape.matches("/tmp/FOOx"))
+
+    def test_find_in_block(self):
+        # given
+        text = "/a/bar\n/b/foo\n/c/FOO"
+
+        # then
+        self.assertEqual(10, FilterMatcher("foo").find(text))
+        self.assertEqual(-1, FilterMatcher("foo").find(text, 11))
+        self.assertEqual(17, FilterMatcher("foo", smart_case=True).find(text, 11))
+        self.assertEqual(3, FilterMatcher("foo|bar").find(text))
+
+
+if __name__ == '__main__':
+    unittest.main()
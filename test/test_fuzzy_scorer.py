@@ -0,0 +1,85 @@
+import re
+import unittest
+
+from file_history.fuzzy_scorer import FuzzyScorer
+
+
+class TestFuzzyScorer(unittest.TestCase):
+
+    def rank(self, query, paths):
+        scorer = FuzzyScorer(query)
+        scores = {path: scorer.score(path) for path in paths}
+        return sorted((path for path in paths if scores[path] is not None), key=scores.get, reverse=True)
+
+    def test_match_subsequence(self):
+        # given
+        scorer = FuzzyScorer("cfgpars")
+
+        # then
+        self.assertIsNotNone(scorer.score("/home/user/project/config_parser.py"))
+        self.assertIsNone(scorer.score("/home/user/project/config.py"))
+
+    def test_path_changing_length_when_lowered(self):
+        # given
+        paths = ["İİİa", "/İİİİİİ/ab"]
+
+        # then
+        for query in ["a", "ab", "b"]:
+            for path in paths:
+                if set(query) <= set(path):
+                    self.assertIsNotNone(FuzzyScorer(query).score(path))
+        self.assertEqual(["/İİİİİİ/ab"], self.rank("ab", paths))
+
+    def test_prefer_boundaries_and_file_name(self):
+        # when
+        ranking = self.rank("cfgpars", [
+            "/home/user/cfg/pars/notes.txt",
+            "/home/user/cxfxgxpxaxrxs.txt",
+            "/home/user/project/config_parser.py",
+        ])
+
+        # then
+        self.assertEqual(["/home/user/project/config_parser.py",
+                          "/home/user/cfg/pars/notes.txt",
+                          "/home/user/cxfxgxpxaxrxs.txt"], ranking)
+
+    def test_prefer_camel_case(self):
+        # when
+        ranking = self.rank("fp", ["/src/Filepath.java", "/src/FileParser.java"])
+
+        # then
+        self.assertEqual(["/src/FileParser.java", "/src/Filepath.java"], ranking)
+
+    def test_smart_case(self):
+        # given
+        lower = FuzzyScorer("fp")
+        upper = FuzzyScorer("FP")
+
+        # then
+        self.assertIsNotNone(lower.score("/src/FileParser.java"))
+        self.assertIsNotNone(upper.score("/src/FileParser.java"))
+        self.assertIsNone(upper.score("/src/file_parser.py"))
+
+    def test_prefer_recent_files(self):
+        # given
+        scorer = FuzzyScorer("main")
+
+        # then
+        self.assertGreater(scorer.score("/a/main.py", position=0), scorer.score("/b/main.py", position=100))
+
+    def test_pattern_finds_same_lines(self):
+        # given
+        lines = ["/home/user/config_parser.py", "/cfg.py", "/C/F/G/P/A/R/S", "/c\nfgpars"]
+        scorer = FuzzyScorer("cfgpars")
+
+        # when
+        pattern = re.compile(scorer.pattern, re.MULTILINE)
+
+        # then
+        self.assertEqual([scorer.score(line) is not None for line in lines[:3]],
+                         [pattern.search(line) is not None for line in lines[:3]])
+        self.assertIsNone(pattern.search(lines[3]))
+
+
+if __name__ == '__main__':
+    unittest.main()
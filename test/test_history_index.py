@@ -0,0 +1,106 @@
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from file_history.daemon.history_index import HistoryIndex
+from file_history.existence_cache import CACHE_FILE_SUFFIX, ExistenceCache
+
+
+class TestHistoryIndex(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.history_file = os.path.join(self.tmp_dir.name, ".file_history")
+        self.existing_files = set()
+        self.checked_files = []
+        mock_isfile = patch('file_history.file_checker.FileChecker.isfile').start()
+        mock_isfile.side_effect = self.isfile
+        self.addCleanup(patch.stopall)
+        self.index = HistoryIndex(self.history_file)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def isfile(self, path):
+        self.checked_files.append(path)
+        return path in self.existing_files
+
+    def write_history(self, files, mode='w'):
+        with open(self.history_file, mode) as file:
+            file.write("".join(file + "\n" for file in files))
+
+    def test_query_most_recent_existing_files(self):
+        # given
+        files = ["/some/file%d" % i for i in range(100)] + ["/some/file1"]
+        self.write_history(files)
+        self.existing_files = set(files[:100:2])
+
+        # when
+        found = self.index.query("file[0-9]$", 3)
+
+        # then
+        self.assertEqual(["/some/file8", "/some/file6", "/some/file4"], found)
+        # the file appended again is checked only once, as the most recent one
+        self.assertEqual(["/some/file1", "/some/file9", "/some/file8", "/some/file7", "/some/file6", "/some/file5",
+                          "/some/file4"], self.checked_files)
+        self.assertNotIn("/some/file10", self.checked_files)
+
+    def test_follow_appended_files(self):
+        # given
+        self.write_history(["/a", "/b", "/c"])
+        self.existing_files = {"/a", "/b", "/c", "/d"}
+        self.index.query(None, 10)
+
+        # when
+        self.write_history(["/d", "/a"], 'a')
+        with open(self.history_file, 'a') as file:
+            # record still being written
+            file.write("/e")
+        found = self.index.query(None, 10)
+
+        # then
+        self.assertEqual(["/a", "/d", "/c", "/b"], found)
+
+    def test_find_file_created_and_tracked_again(self):
+        # given
+        patch.stopall()
+        file = os.path.join(self.tmp_dir.name, "file")
+        self.write_history([file])
+        cache = ExistenceCache(self.history_file + CACHE_FILE_SUFFIX)
+        index = HistoryIndex(self.history_file, cache)
+        self.assertEqual([], index.query(None, 10))
+
+        # when
+        open(file, 'w').close()
+        self.write_history([file], 'a')
+        ExistenceCache.invalidate(cache.path, [file])
+        found = index.query(None, 10)
+
+        # then
+        self.assertEqual([file], found)
+
+    def test_read_rewritten_history_again(self):
+        # given
+        self.write_history(["/a", "/b", "/c"])
+        self.existing_files = {"/a", "/b", "/c", "/d"}
+        self.index.query(None, 10)
+
+        # when
+        # like a cleaner rewriting the history in place, it grew again since
+        self.write_history(["/c", "/b", "/d", "/a"])
+        found = self.index.query(None, 10)
+
+        # then
+        self.assertEqual(["/a", "/d", "/b", "/c"], found)
+
+    def test_missing_history(self):
+        # when
+        found = self.index.query(None, 10)
+
+        # then
+        self.assertEqual([], found)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,108 @@
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+
+from file_history.args import HISTORY_FILE_ENV, TRACK_SOCKET_ENV
+
+PROJECT_ROOT = os.path.join(os.path.dirname(__file__), "..")
+
+# track runs on every bash command, none of these may be loaded on its way
+FORBIDDEN_TRACK_MODULES = [
+    "tkinter",
+    "pyperclip",
+    "argparse",
+    "subprocess",
+    "file_history.app_launcher",
+    "file_history.gui.gui_app",
+    "file_history.terminal.terminal_app",
+    "file_history.tui.tui_app",
+    "curses",
+    "file_history.search",
+]
+# modules only needed when there is no track daemon
+IN_PROCESS_TRACK_MODULES = [
+    "file_history.command_parser",
+    "file_history.track.file_history_appender",
+]
+# import time of track on top of a bare interpreter, generous to not fail on slow machines
+TRACK_IMPORT_BUDGET_US = 60_000
+
+RUN_MAIN_AND_PRINT_MODULES = (
+    "import sys\n"
+    "from file_history.main import main\n"
+    "main()\n"
+    "print('\\n'.join(sorted(sys.modules)))\n"
+)
+
+
+class TestImportFootprint(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.history_file = os.path.join(self.tmp_dir.name, "file_history")
+        open(self.history_file, 'w').close()
+        self.env = os.environ.copy()
+        self.env[HISTORY_FILE_ENV] = self.history_file
+        # no daemon listening there -> worst case, track in process
+        self.env[TRACK_SOCKET_ENV] = os.path.join(self.tmp_dir.name, "track.sock")
+        self.env["PYTHONPATH"] = PROJECT_ROOT
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def run_python(self, args):
+        return subprocess.run([sys.executable] + args, env=self.env, cwd=PROJECT_ROOT,
+                              capture_output=True, text=True, timeout=30)
+
+    def loaded_modules(self, mode_args):
+        code = "sys.argv = %r\n" % (["file-history"] + mode_args) + RUN_MAIN_AND_PRINT_MODULES
+        result = self.run_python(["-c", "import sys\n" + code])
+        self.assertEqual(0, result.returncode, result.stderr)
+        return result.stdout.splitlines()
+
+    # sums up the self time of all imports listed by -X importtime
+    def total_import_time_us(self, args):
+        result = self.run_python(["-X", "importtime"] + args)
+        self.assertEqual(0, result.returncode, result.stderr)
+        total = 0
+        for line in result.stderr.splitlines():
+            if not line.startswith("import time:") or "self [us]" in line:
+                continue
+            self_us = line.split(":", 1)[1].split("|")[0]
+            total += int(self_us)
+        return total
+
+    def test_track_does_not_load_ui(self):
+        # when
+        modules = self.loaded_modules(["track", self.tmp_dir.name, "cat foo"])
+
+        # then
+        for module in FORBIDDEN_TRACK_MODULES:
+            self.assertNotIn(module, modules)
+        for module in IN_PROCESS_TRACK_MODULES:
+            self.assertIn(module, modules)
+
+    def test_clean_does_not_load_ui(self):
+        # when
+        modules = self.loaded_modules(["clean"])
+
+        # then
+        for module in FORBIDDEN_TRACK_MODULES:
+            self.assertNotIn(module, modules)
+
+    def test_track_import_time(self):
+        # given
+        bare_interpreter = min(self.total_import_time_us(["-c", "pass"]) for _ in range(3))
+
+        # when
+        track = min(self.total_import_time_us(["-m", "file_history.main", "track", self.tmp_dir.name, "cat foo"])
+                    for _ in range(3))
+
+        # then
+        self.assertLess(track - bare_interpreter, TRACK_IMPORT_BUDGET_US)
+
+
+if __name__ == '__main__':
+    unittest.main()
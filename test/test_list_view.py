@@ -0,0 +1,89 @@
+import unittest
+
+from file_history.tui.list_view import ListView
+
+
+class TestListView(unittest.TestCase):
+
+    def test_filter_found_files(self):
+        # given
+        view = ListView()
+        view.add_files(["/a/foo", "/a/bar"])
+
+        # when
+        view.set_filter("fo")
+        view.add_files(["/b/foo", "/b/baz"])
+
+        # then
+        self.assertEqual(["/a/foo", "/b/foo"], view.visible)
+        self.assertEqual("/a/foo", view.selected())
+
+        # when
+        view.set_filter("")
+
+        # then
+        self.assertEqual(["/a/foo", "/a/bar", "/b/foo", "/b/baz"], view.visible)
+
+    def test_scroll_to_cursor(self):
+        # given
+        view = ListView()
+        view.add_files(["/%d" % i for i in range(10)])
+
+        # when
+        view.move(5)
+
+        # then
+        self.assertEqual([("/3", False), ("/4", False), ("/5", True)], view.rows(3))
+
+        # when
+        view.move(-100)
+
+        # then
+        self.assertEqual([("/0", True), ("/1", False), ("/2", False)], view.rows(3))
+
+        # when
+        view.move_to_end()
+
+        # then
+        self.assertEqual([("/7", False), ("/8", False), ("/9", True)], view.rows(3))
+
+    def test_rows_without_files(self):
+        # given
+        view = ListView()
+        view.add_files(["/a"])
+
+        # when
+        view.move(1)
+
+        # then
+        self.assertEqual([("/a", True), (None, False)], view.rows(2))
+
+    def test_nothing_selected_without_matching_files(self):
+        # given
+        view = ListView()
+        view.add_files(["/a"])
+
+        # when
+        view.set_filter("b")
+        view.move(1)
+
+        # then
+        self.assertIsNone(view.selected())
+        self.assertEqual([(None, False)], view.rows(1))
+
+    def test_ranking_replaces_files(self):
+        # given
+        view = ListView()
+        view.add_files(["/a", "/b"])
+        view.move(1)
+
+        # when
+        view.replace_files(["/b", "/c"])
+
+        # then
+        self.assertEqual(["/b", "/c"], view.visible)
+        self.assertEqual("/b", view.selected())
+
+
+if __name__ == '__main__':
+    unittest.main()
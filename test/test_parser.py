@@ -1,7 +1,11 @@
+import os
+import tempfile
 import unittest
 from unittest.mock import MagicMock, Mock, call
 
 from file_history.command_parser import CommandParser
+from file_history.dir_listing_cache import DirListingCache
+from file_history.file_checker import FileChecker
 from file_history.parser import Parser
 
 
@@ -633,6 +637,27 @@ class TestParserComponent(unittest.TestCase):
         expected_files = []
         self.assert_callback_calls(mock_callback, expected_files)
 
+    def test_list_recent_dir_again_for_each_find_files(self):
+        # given
+        with tempfile.TemporaryDirectory() as recent_dir:
+            for name in ["file1", "file2"]:
+                open(os.path.join(recent_dir, name), 'w').close()
+            dir_listing = DirListingCache(FileChecker())
+            parser = Parser([recent_dir], None, CommandParser(dir_listing), dir_listing)
+            mock_callback = Mock()
+            parser.find_files(["cat file1 file2"], mock_callback)
+            os.remove(os.path.join(recent_dir, "file1"))
+            open(os.path.join(recent_dir, "file3"), 'w').close()
+
+            # when
+            parser.find_files(["cat file1 file3"], mock_callback)
+
+            # then
+            self.assert_callback_calls(mock_callback, [
+                [os.path.join(recent_dir, "file1"), os.path.join(recent_dir, "file2")],
+                [os.path.join(recent_dir, "file3")],
+            ])
+
 
 if __name__ == "__main__":
     unittest.main()
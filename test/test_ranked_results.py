@@ -0,0 +1,37 @@
+import unittest
+
+from file_history.ranked_results import RankedResults
+
+
+class TestRankedResults(unittest.TestCase):
+
+    def test_keep_best_files(self):
+        # given
+        results = RankedResults(max_results=3)
+
+        # when
+        for score, file in [(5, "/e"), (1, "/a"), (9, "/i"), (3, "/c"), (7, "/g")]:
+            if results.could_rank(score):
+                results.rank(file, score)
+
+        # then
+        self.assertEqual(["/i", "/g", "/e"], results.publish())
+        self.assertEqual("/g", results.get(1))
+        self.assertEqual(3, len(results))
+        self.assertFalse(results.could_rank(5))
+
+    def test_older_files_lose_ties(self):
+        # given
+        results = RankedResults(max_results=2)
+
+        # when
+        for file in ["/a", "/b", "/c"]:
+            results.rank(file, 1)
+
+        # then
+        self.assertEqual(["/a", "/b"], results.publish())
+        self.assertFalse(results.changed)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,129 @@
+import os
+import tempfile
+import unittest
+
+from file_history.options import Options
+from file_history.result_snapshot import FINGERPRINT_SIZE, ResultSnapshot
+from file_history.result_snapshot_store import (MAX_SNAPSHOT_FILES, MAX_SNAPSHOTS, ResultSnapshotStore,
+                                                provide_result_snapshot_store)
+
+QUERY = ("foo", False, 10)
+
+
+class TestResultSnapshot(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.history_file = os.path.join(self.tmp_dir.name, ".file_history")
+        self.store = ResultSnapshotStore(self.history_file + ".snapshot")
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def write_history(self, content, mode='w'):
+        with open(self.history_file, mode) as file:
+            file.write(content)
+
+    def take_snapshot(self, files=(), query=QUERY):
+        return ResultSnapshot.of_history(self.history_file, query).with_files(files)
+
+    def test_holds_for_unchanged_history(self):
+        # given
+        self.write_history("/a\n/b\n")
+        snapshot = self.take_snapshot(["/b"])
+
+        # when
+        holds = snapshot.holds_for(self.take_snapshot(), self.history_file)
+
+        # then
+        self.assertTrue(holds)
+        self.assertTrue(snapshot.is_unchanged(self.take_snapshot()))
+
+    def test_holds_for_grown_history(self):
+        # given
+        self.write_history("/a\n" * FINGERPRINT_SIZE)
+        snapshot = self.take_snapshot(["/a"])
+        self.write_history("/b\n", 'a')
+
+        # when
+        history = self.take_snapshot()
+
+        # then
+        self.assertTrue(snapshot.holds_for(history, self.history_file))
+        self.assertFalse(snapshot.is_unchanged(history))
+
+    def test_not_holds_for_rewritten_history(self):
+        # given
+        self.write_history("/a\n/b\n")
+        snapshot = self.take_snapshot(["/b"])
+
+        # when
+        self.write_history("/c\n/b\n/d\n")
+
+        # then
+        self.assertFalse(snapshot.holds_for(self.take_snapshot(), self.history_file))
+
+    def test_not_holds_for_replaced_history(self):
+        # given
+        self.write_history("/a\n")
+        snapshot = self.take_snapshot(["/a"])
+
+        # when
+        replacement = self.history_file + ".tmp"
+        with open(replacement, 'w') as file:
+            file.write("/a\n/b\n")
+        os.replace(replacement, self.history_file)
+
+        # then
+        self.assertFalse(snapshot.holds_for(self.take_snapshot(), self.history_file))
+
+    def test_not_holds_for_other_query(self):
+        # given
+        self.write_history("/a\n")
+        snapshot = self.take_snapshot(["/a"])
+
+        # when
+        history = self.take_snapshot(query=("foo", False, 20))
+
+        # then
+        self.assertFalse(snapshot.holds_for(history, self.history_file))
+
+    def test_store_one_snapshot_per_query(self):
+        # given
+        self.write_history("/a\n/b\n")
+        for i in range(MAX_SNAPSHOTS + 1):
+            self.store.save(self.take_snapshot(["/a"], query=("filter%d" % i, False, 10)))
+
+        # when
+        self.store.save(self.take_snapshot(["/b"], query=("filter5", False, 10)))
+
+        # then
+        self.assertEqual(["/b"], self.store.find(("filter5", False, 10)).files)
+        self.assertEqual(["/a"], self.store.find(("filter%d" % MAX_SNAPSHOTS, False, 10)).files)
+        # least recently saved one is dropped
+        self.assertIsNone(self.store.find(("filter0", False, 10)))
+
+    def test_ignore_broken_store(self):
+        # given
+        with open(self.store.path, 'w') as file:
+            file.write("[{\"query\": ")
+
+        # when
+        snapshot = self.store.find(QUERY)
+
+        # then
+        self.assertIsNone(snapshot)
+
+    def test_no_store_for_show_action_or_many_results(self):
+        # given
+        def options(action, max_results):
+            return Options(action=action, max_results=max_results, file_history=self.history_file, max_scanned=-1)
+
+        # then
+        self.assertIsNotNone(provide_result_snapshot_store(options("edit", MAX_SNAPSHOT_FILES)))
+        self.assertIsNone(provide_result_snapshot_store(options("show", 10)))
+        self.assertIsNone(provide_result_snapshot_store(options("edit", MAX_SNAPSHOT_FILES + 1)))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,100 @@
+import os
+import tempfile
+import unittest
+
+from file_history.reverse_line_reader import ReverseLineReader
+
+
+class TestReverseLineReader(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.file = os.path.join(self.tmp_dir.name, "history")
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def write(self, content, mode='wb'):
+        with open(self.file, mode) as file:
+            file.write(content)
+
+    def read_lines(self, window_size):
+        with ReverseLineReader(self.file, window_size) as reader:
+            return list(reader.lines())
+
+    def test_lines_spanning_windows(self):
+        # given
+        lines = [("/home/user/file%d" % i).encode() * (i % 5) for i in range(200)]
+        self.write(b"\n".join(lines) + b"\n")
+
+        # when
+        for window_size in [1, 2, 7, 64, 1 << 20]:
+            read_lines = self.read_lines(window_size)
+
+            # then
+            self.assertEqual(list(reversed(lines)), read_lines)
+
+    def test_no_trailing_newline(self):
+        # given
+        self.write(b"/a\n\n/b")
+
+        # when
+        read_lines = self.read_lines(2)
+
+        # then
+        self.assertEqual([b"/b", b"", b"/a"], read_lines)
+
+    def test_empty_file(self):
+        # given
+        self.write(b"")
+
+        # when
+        read_lines = self.read_lines(2)
+
+        # then
+        self.assertEqual([], read_lines)
+
+    def test_ignore_lines_appended_while_reading(self):
+        # given
+        self.write(b"/a\n/b\n")
+
+        # when
+        with ReverseLineReader(self.file, 2) as reader:
+            lines = reader.lines()
+            first = next(lines)
+            self.write(b"/c\n", 'ab')
+            read_lines = [first] + list(lines)
+
+        # then
+        self.assertEqual([b"/b", b"/a"], read_lines)
+
+    def test_stop_if_file_shrinks_while_reading(self):
+        # given
+        self.write(b"/a\n/b\n/c\n")
+
+        # when
+        with ReverseLineReader(self.file, 3) as reader:
+            lines = reader.lines()
+            first = next(lines)
+            # like a cleaner rewriting the history in place
+            self.write(b"/c\n")
+            read_lines = [first] + list(lines)
+
+        # then
+        self.assertEqual([b"/c"], read_lines)
+
+    def test_read_only_lines_after_start(self):
+        # given
+        self.write(b"/a\n/b\n/c\n/d\n")
+
+        # when
+        for window_size in [1, 3, 1 << 20]:
+            with ReverseLineReader(self.file, window_size, start=len(b"/a\n/b\n")) as reader:
+                read_lines = list(reader.lines())
+
+            # then
+            self.assertEqual([b"/d", b"/c"], read_lines)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,73 @@
+import unittest
+
+from file_history.tui.row_painter import RowPainter
+
+NORMAL = 0
+REVERSE = 1
+
+
+# records what is written instead of drawing to a terminal
+class FakeWindow:
+
+    def __init__(self, height, width):
+        self.height = height
+        self.width = width
+        self.written = []
+
+    def getmaxyx(self):
+        return self.height, self.width
+
+    def move(self, y, x):
+        pass
+
+    def clrtoeol(self):
+        pass
+
+    def addnstr(self, y, x, text, n, attr):
+        self.written.append((y, text[:n], attr))
+
+
+class TestRowPainter(unittest.TestCase):
+
+    def test_only_changed_rows_are_written(self):
+        # given
+        window = FakeWindow(3, 80)
+        painter = RowPainter(window)
+        painter.paint([("/a", REVERSE), ("/b", NORMAL), ("/c", NORMAL)])
+        window.written = []
+
+        # when
+        written = painter.paint([("/a", NORMAL), ("/b", REVERSE), ("/c", NORMAL)])
+
+        # then
+        self.assertEqual(2, written)
+        self.assertEqual([(0, "/a", NORMAL), (1, "/b", REVERSE)], window.written)
+
+    def test_everything_is_written_after_invalidate(self):
+        # given
+        window = FakeWindow(2, 80)
+        painter = RowPainter(window)
+        rows = [("/a", NORMAL), ("/b", NORMAL)]
+        painter.paint(rows)
+
+        # when
+        painter.invalidate()
+        written = painter.paint(rows)
+
+        # then
+        self.assertEqual(2, written)
+
+    def test_rows_are_cut_to_window(self):
+        # given
+        window = FakeWindow(1, 4)
+        painter = RowPainter(window)
+
+        # when
+        painter.paint([("/abcdef", NORMAL), ("/b", NORMAL)])
+
+        # then
+        self.assertEqual([(0, "/ab", NORMAL)], window.written)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,227 @@
+import os
+import random
+import tempfile
+import time
+import unittest
+from unittest.mock import MagicMock, patch
+
+from file_history.args import QUERY_SOCKET_ENV
+from file_history.batch_file_checker import SLOW_CHECK_SECONDS
+from file_history.options import Options
+from file_history.search import Search
+
+
+class TestSearch(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.history_file = os.path.join(self.tmp_dir.name, ".file_history")
+        self.checked_files = []
+        self.found_files = []
+        self.ended = False
+        self.mock_isfile = patch('file_history.file_checker.FileChecker.isfile').start()
+        # a query server of the user running the tests must not answer
+        patch.dict(os.environ, {QUERY_SOCKET_ENV: os.path.join(self.tmp_dir.name, "query.sock")}).start()
+        self.addCleanup(patch.stopall)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def write_history(self, files):
+        with open(self.history_file, 'w') as file:
+            file.write('\n'.join(files) + '\n')
+
+    # first check is slow, so all others run in parallel and finish in random order
+    def slow_files_exist(self, files):
+        def mock_isfile(path):
+            self.checked_files.append(path)
+            time.sleep(SLOW_CHECK_SECONDS * (5 if len(self.checked_files) == 1 else random.random()))
+            return path in files
+        self.mock_isfile.side_effect = mock_isfile
+
+    def search(self, max_results, filter=None, fuzzy=False, ranking_callback=None, resumable=False, action="show"):
+        options = Options(mode="terminal", action=action, max_results=max_results, max_scanned=-1,
+                          file_history=self.history_file, filter=filter, fuzzy=fuzzy)
+        search = Search(options, file_found_callback=self.found_files.append,
+                        end_search_callback=MagicMock(), ranking_callback=ranking_callback,
+                        resumable=resumable)
+        search.start()
+        search.join()
+        return search
+
+    def test_report_files_in_recency_order(self):
+        # given
+        files = ["/some/file%d" % i for i in range(100)]
+        self.write_history(files)
+        existing_files = files[::3]
+        self.slow_files_exist(existing_files)
+
+        # when
+        search = self.search(max_results=1000)
+
+        # then
+        self.assertEqual(list(reversed(existing_files)), self.found_files)
+        # checker threads are gone once the search is done
+        self.assertFalse(search.batch_checker.is_parallel())
+
+    def test_stop_checking_once_enough_files_are_found(self):
+        # given
+        files = ["/some/file%d" % i for i in range(200)]
+        self.write_history(files)
+        self.slow_files_exist(files)
+
+        # when
+        self.search(max_results=10)
+
+        # then
+        self.assertEqual(list(reversed(files))[:10], self.found_files)
+        # checks in flight never exceed the files still needed
+        self.assertLessEqual(len(self.checked_files), 20)
+
+    def test_dedupe_and_check_only_matching_files(self):
+        # given
+        files = ["/some/file%d" % i for i in range(100)] + ["/some/file1"]
+        self.write_history(files)
+        self.slow_files_exist(files)
+
+        # when
+        self.search(max_results=1000, filter="file1")
+
+        # then
+        expected = ["/some/file1"] + ["/some/file%d" % i for i in reversed(range(10, 20))]
+        self.assertEqual(expected, self.found_files)
+        self.assertCountEqual(expected, self.checked_files)
+
+
+    def test_rank_fuzzy_matches(self):
+        # given
+        files = ["/src/config_parser.py", "/src/cfg/pars.txt", "/src/other.py", "/src/gone_config_parser.py",
+                 "/src/cxfxgxpxaxrxs"]
+        self.write_history(files)
+        self.slow_files_exist([file for file in files if "gone" not in file])
+        rankings = []
+
+        # when
+        search = self.search(max_results=2, filter="cfgpars", fuzzy=True,
+                             ranking_callback=lambda ranking, final: rankings.append((ranking, final)))
+
+        # then
+        expected = ["/src/config_parser.py", "/src/cfg/pars.txt"]
+        self.assertEqual((expected, True), rankings[-1])
+        self.assertEqual(expected, [search.results.get(0), search.results.get(1)])
+        self.assertNotIn("/src/other.py", self.checked_files)
+        self.assertEqual([], self.found_files)
+
+    def test_narrow_and_resume_without_checking_files_again(self):
+        # given
+        files = ["/some/file%d" % i for i in range(100)]
+        self.write_history(files)
+        self.slow_files_exist(files[::2] + ["/some/file95"])
+        search = self.search(max_results=10, resumable=True)
+        self.assertFalse(search.reader.is_eof())
+        narrowed = []
+
+        # when
+        search.narrow("5", narrowed.append)
+        search.join()
+
+        # then
+        self.assertEqual([["/some/file95"]], narrowed)
+        self.assertEqual(["/some/file%d" % i for i in [58, 56, 54, 52, 50]], self.found_files[10:])
+        self.assertTrue(search.reader.is_eof())
+        self.assertEqual(len(self.checked_files), len(set(self.checked_files)))
+        self.assertNotIn("/some/file79", self.checked_files)
+
+    def test_end_paused_search_releases_history(self):
+        # given
+        files = ["/some/file%d" % i for i in range(20)]
+        self.write_history(files)
+        self.slow_files_exist(files)
+        search = self.search(max_results=5, resumable=True)
+        self.assertFalse(search.reader.is_eof())
+        close = patch.object(search.reader, "close", wraps=search.reader.close).start()
+
+        # when
+        search.end()
+
+        # then
+        close.assert_called_once()
+        self.assertIsNone(search.reader.found_files.gi_frame)
+        self.assertFalse(search.can_resume())
+
+    def test_invalid_narrowing_filter_keeps_found_files(self):
+        # given
+        files = ["/some/file%d" % i for i in range(20)]
+        self.write_history(files)
+        self.slow_files_exist(files)
+        search = self.search(max_results=5, resumable=True)
+        narrowed = []
+
+        # when
+        valid = search.narrow("file(", narrowed.append)
+
+        # then
+        self.assertFalse(valid)
+        self.assertEqual([], narrowed)
+        self.assertEqual(["/some/file%d" % i for i in [19, 18, 17, 16, 15]], search.results.files)
+        self.assertEqual([], search.filter.narrowing)
+
+    # files are selected, --action=show searches are not snapshotted
+    def search_twice(self, files, max_results, files_after_first_search):
+        self.write_history(files)
+        self.slow_files_exist(files)
+        self.search(max_results=max_results, ranking_callback=MagicMock(), action="edit")
+        self.checked_files.clear()
+        self.found_files.clear()
+        rankings = []
+        files_after_first_search()
+        search = self.search(max_results=max_results,
+                             ranking_callback=lambda ranking, final: rankings.append((ranking, final)),
+                             action="edit")
+        return search, rankings
+
+    def test_show_snapshot_of_same_search_right_away_and_drop_missing_files(self):
+        # given
+        files = ["/some/file%d" % i for i in range(20)]
+
+        # when
+        search, rankings = self.search_twice(files, 5, lambda: self.slow_files_exist(files[:-1]))
+
+        # then
+        snapshot = ["/some/file%d" % i for i in [19, 18, 17, 16, 15]]
+        expected = ["/some/file%d" % i for i in [18, 17, 16, 15, 14]]
+        self.assertEqual([(snapshot, False), (expected, True)], rankings)
+        self.assertEqual(expected, search.results.files)
+        self.assertEqual([], self.found_files)
+
+    def test_only_read_lines_appended_since_snapshot(self):
+        # given
+        files = ["/some/file%d" % i for i in range(20)]
+
+        def append_files():
+            with open(self.history_file, 'a') as file:
+                file.write("/some/file20\n/some/file17\n")
+            self.slow_files_exist(files + ["/some/file20"])
+
+        # when
+        search, rankings = self.search_twice(files, 5, append_files)
+
+        # then
+        expected = ["/some/file%d" % i for i in [17, 20, 19, 18, 16]]
+        self.assertEqual((expected, True), rankings[-1])
+        self.assertEqual(expected, search.results.files)
+        self.assertNotIn("/some/file14", self.checked_files)
+
+    def test_search_from_scratch_if_history_was_rewritten(self):
+        # given
+        files = ["/some/file%d" % i for i in range(20)]
+
+        # when
+        search, rankings = self.search_twice(files, 5, lambda: self.write_history(files[:10]))
+
+        # then
+        self.assertEqual([], rankings)
+        self.assertEqual(["/some/file%d" % i for i in [9, 8, 7, 6, 5]], self.found_files)
+
+if __name__ == '__main__':
+    unittest.main()
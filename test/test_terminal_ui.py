@@ -0,0 +1,81 @@
+import contextlib
+import io
+import os
+import unittest
+from unittest.mock import MagicMock, patch
+
+from file_history.options import Options
+from file_history.terminal.terminal_app import TerminalApp
+from file_history.terminal.terminal_ui import TerminalUi
+
+TERMINAL_WIDTH = 20
+
+
+@patch('os.get_terminal_size', lambda fd: os.terminal_size((TERMINAL_WIDTH, 24)))
+class TestTerminalUi(unittest.TestCase):
+
+    def setUp(self):
+        self.stream = io.StringIO()
+        self.stream.fileno = lambda: 2
+        self.stream.isatty = lambda: True
+        self.ui = TerminalUi(self.stream, print_numbers=True)
+
+    def test_ranking_moves_up_by_wrapped_rows(self):
+        # given
+        self.ui.show_file("/short")
+        # "2: " and 27 chars take 2 rows
+        self.ui.show_file("/a/very/long/path/to/a/file")
+        printed = len(self.stream.getvalue())
+
+        # when
+        self.ui.show_ranking(["/b"], final=False)
+
+        # then
+        self.assertEqual("\033[3A\033[J1: /b\n", self.stream.getvalue()[printed:])
+
+    def test_ranking_after_narrowing_prints_over_header(self):
+        # given
+        self.ui.show_file("/x/foo")
+        self.ui.show_narrowed("foo", ["/x/foo"])
+        printed = len(self.stream.getvalue())
+
+        # when
+        self.ui.show_ranking(["/y/foo", "/x/foo"], final=False)
+
+        # then
+        self.assertEqual("\033[2A\033[Jfiles matching foo:\n1: /y/foo\n2: /x/foo\n",
+                         self.stream.getvalue()[printed:])
+
+    def test_no_cursor_movement_without_terminal(self):
+        # given
+        self.stream.isatty = lambda: False
+        self.ui.show_file("/x/foo")
+        printed = len(self.stream.getvalue())
+
+        # when
+        self.ui.show_ranking(["/y/foo", "/x/foo"], final=False)
+        self.ui.show_ranking(["/z/foo", "/x/foo"], final=True)
+
+        # then
+        self.assertEqual("1: /z/foo\n2: /x/foo\n", self.stream.getvalue()[printed:])
+
+
+class TestTerminalApp(unittest.TestCase):
+
+    def test_tell_user_about_invalid_narrowing_filter(self):
+        # given
+        app = TerminalApp(Options(mode="terminal", action="edit", max_results=10, file_history="/tmp/history"))
+        app.search = MagicMock()
+        app.search.narrow.return_value = False
+        stderr = io.StringIO()
+
+        # when
+        with contextlib.redirect_stderr(stderr):
+            app.narrow("file(")
+
+        # then
+        self.assertEqual("invalid filter: file(\n", stderr.getvalue())
+
+
+if __name__ == '__main__':
+    unittest.main()
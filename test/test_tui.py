@@ -0,0 +1,178 @@
+import curses
+import os
+import unittest
+from unittest.mock import MagicMock, patch
+
+from file_history.options import Options
+from file_history.tui.row_painter import RowPainter
+from file_history.tui.tui import Tui
+from file_history.tui.tui_app import TuiApp
+
+
+# hands out the keys given, like curses in nodelay mode
+class FakeScreen:
+
+    def __init__(self, keys, height=10, width=80):
+        self.keys = list(keys)
+        self.height = height
+        self.width = width
+        self.cursor = None
+
+    def get_wch(self):
+        if not self.keys:
+            raise curses.error("no input")
+        return self.keys.pop(0)
+
+    def getmaxyx(self):
+        return self.height, self.width
+
+    def move(self, y, x):
+        self.cursor = (y, x)
+
+    def clrtoeol(self):
+        pass
+
+    def addnstr(self, y, x, text, n, attr):
+        pass
+
+    def clear(self):
+        pass
+
+    def noutrefresh(self):
+        pass
+
+
+class TestTui(unittest.TestCase):
+
+    def setUp(self):
+        self.tui = Tui()
+        self.narrowed = []
+        self.escapes = 0
+        self.tui.narrow_callback = self.narrowed.append
+        self.tui.escape_callback = self.on_escape
+
+    def tearDown(self):
+        self.tui.close_wakeup_pipe()
+
+    def on_escape(self):
+        self.escapes += 1
+
+    def press(self, *keys):
+        self.tui.screen = FakeScreen(keys)
+        self.tui.painter = RowPainter(self.tui.screen)
+        self.tui.handle_keys()
+
+    def test_found_files_are_drained_in_order(self):
+        # given
+        self.tui.show_file("/a")
+        self.tui.show_file("/b")
+
+        # when
+        self.tui.drain_pending()
+
+        # then
+        self.assertEqual(["/a", "/b"], self.tui.view.files)
+
+        # when
+        self.tui.show_ranking(["/c", "/a"])
+        self.tui.show_file("/d")
+        self.tui.drain_pending()
+
+        # then
+        self.assertEqual(["/c", "/a", "/d"], self.tui.view.files)
+
+    def test_select_file_matching_typed_filter(self):
+        # given
+        self.tui.show_ranking(["/foo", "/bar", "/foo/baz"])
+        self.tui.drain_pending()
+
+        # when
+        self.press("f", "o", curses.KEY_DOWN, "\n", "x")
+
+        # then
+        self.assertEqual("/foo/baz", self.tui.selected)
+        self.assertEqual(["f", "fo"], self.narrowed)
+        # keys after the selection are left alone
+        self.assertEqual("fo", self.tui.view.filter)
+
+    def test_invalid_filter_keeps_files_shown(self):
+        # given
+        self.tui.show_ranking(["/foo", "/bar"])
+        self.tui.drain_pending()
+
+        # when
+        self.press("f", "(")
+
+        # then
+        self.assertEqual(["/foo"], self.tui.view.visible)
+        self.assertEqual(["f"], self.narrowed)
+
+        # when
+        self.press(curses.KEY_BACKSPACE, curses.KEY_BACKSPACE)
+
+        # then
+        self.assertEqual(["/foo", "/bar"], self.tui.view.visible)
+        self.assertEqual(["f", "f", ""], self.narrowed)
+
+    def test_escape_and_stop(self):
+        # when
+        self.press("\x1b")
+        self.tui.stop()
+        self.press("\x1b")
+
+        # then
+        self.assertEqual(1, self.escapes)
+        self.assertIsNone(self.tui.selected)
+
+    @patch('curses.doupdate')
+    def test_cursor_behind_wide_filter_characters(self, _):
+        # given
+        self.press("日", "本")
+
+        # when
+        self.tui.render()
+
+        # then
+        self.assertEqual((0, len("> ") + 4), self.tui.screen.cursor)
+
+    @patch('curses.resizeterm')
+    def test_resize_wakes_up_main_loop_and_repaints(self, mock_resizeterm):
+        # given
+        self.press()
+        self.tui.painter.painted = [("> ", curses.A_BOLD)]
+
+        # when
+        self.tui.on_resize(None, None)
+
+        # then
+        self.assertEqual(b"\0", os.read(self.tui.wakeup_read_fd, 4096))
+        self.assertTrue(self.tui.resized)
+
+        # when
+        with patch('sys.stdout'), patch('os.get_terminal_size', return_value=os.terminal_size((100, 30))):
+            self.tui.resize()
+
+        # then
+        mock_resizeterm.assert_called_once_with(30, 100)
+        self.assertEqual([], self.tui.painter.painted)
+        self.assertFalse(self.tui.resized)
+
+
+class TestTuiApp(unittest.TestCase):
+
+    def test_narrow_search_while_filter_gets_stricter(self):
+        # given
+        app = TuiApp(Options(mode="tui", action="edit", max_results=10, file_history="/tmp/history"))
+        self.addCleanup(app.ui.close_wakeup_pipe)
+        app.search = MagicMock()
+
+        # when
+        for filter in ["f", "fo", "f", "fx", "fo.", "foo"]:
+            app.narrow(filter)
+
+        # then
+        self.assertEqual(["f", "fo", "foo"], [call.args[0] for call in app.search.narrow.call_args_list])
+
+
+if __name__ == '__main__':
+    unittest.main()